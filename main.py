@@ -1,6 +1,10 @@
 from fastapi import FastAPI
+from pkg.config import config
 from pkg.handlers import router, load_controllers
 from pkg.middleware.handlers import register_error_handler
+from pkg.shared.entity.export.utils import preload_embedding_matrices
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.embedding_query.index import EmbeddingIndexService
 
 
 def create_app():
@@ -10,6 +14,12 @@ def create_app():
     app.include_router(router, prefix="")
     register_error_handler(app)
 
+    # Even when tasks run in worker.py processes, the API joins their results with the corpus and runs embedding and
+    # attribute searches against it, so it keeps its own corpus as up to date as theirs.
+    PeptideCorpusService.get_instance().start_background_refresh()
+    preload_embedding_matrices()
+    EmbeddingIndexService.get_instance().start_preload(config.embedding_index_preload)
+
     return app
 
 
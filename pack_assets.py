@@ -0,0 +1,7 @@
+from pkg.shared.entity.export.utils import pack_resource_assets
+
+
+# Packs the files of every exported resource under ASSETS_LOCATION into a single blob with an offset index, next to
+# their directory. Exports read from the packs when present, run this again whenever the assets change.
+if __name__ == '__main__':
+    pack_resource_assets()
@@ -1,26 +1,101 @@
 import os
+import socket
+from typing import Dict, List
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
+# Variables such as TASK_CONCURRENCY_SINGLE_QUERY override the concurrency of a single task type.
+_TASK_CONCURRENCY_PREFIX = 'TASK_CONCURRENCY_'
+
 
 @dataclass
 class Config:
     redis_uri: str
+    redis_max_connections: int
+    redis_pool_timeout: float
     neo4j_db_uri: str
+    neo4j_max_connections: int
+    neo4j_fetch_size: int
+    neo4j_query_timeout: float
 
     assets_location: str
     temp_artifacts_location: str
 
+    export_io_workers: int
+    export_compression_level: int
+    export_compression_levels: Dict[str, int]
+    export_artifact_cache_size: int
+
+    corpus_refresh_interval: int
+    corpus_max_age: int
+
+    alignment_workers: int
+    alignment_chunk_size: int
+    score_memo_size: int
+    search_progress_interval: float
+    search_partial_result_size: int
+    search_result_view_cache_size: int
+
+    embedding_index_lists: int
+    embedding_index_probes: int
+    embedding_index_preload: List[str]
+
+    task_concurrency: int
+    task_concurrency_overrides: Dict[str, int]
+    task_queue_size: int
+
+    task_execution_mode: str
+    worker_id: str
+    worker_tasks: List[str]
+
+    def get_task_concurrency(self, task_name: str) -> int:
+        return self.task_concurrency_overrides.get(task_name, self.task_concurrency)
+
+    def get_export_compression_level(self, resource: str) -> int:
+        return self.export_compression_levels.get(resource, self.export_compression_level)
+
     @staticmethod
     def from_env() -> 'Config':
         return Config(
             redis_uri=os.getenv('REDIS_URI'),
+            redis_max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 32)),
+            redis_pool_timeout=float(os.getenv('REDIS_POOL_TIMEOUT', 5)),
             neo4j_db_uri=os.getenv('NEO4J_DB_URI'),
+            neo4j_max_connections=int(os.getenv('NEO4J_MAX_CONNECTIONS', 16)),
+            neo4j_fetch_size=int(os.getenv('NEO4J_FETCH_SIZE', 5000)),
+            neo4j_query_timeout=float(os.getenv('NEO4J_QUERY_TIMEOUT', 30)),
             assets_location=os.getenv('ASSETS_LOCATION'),
             temp_artifacts_location=os.getenv('TEMP_ARTIFACTS_LOCATION'),
+            export_io_workers=int(os.getenv('EXPORT_IO_WORKERS', 8)),
+            export_compression_level=int(os.getenv('EXPORT_COMPRESSION_LEVEL', 6)),
+            export_compression_levels={
+                resource.strip(): int(level)
+                for resource, _, level in (entry.partition('=') for entry in os.getenv('EXPORT_COMPRESSION_LEVELS', '').split(',') if entry.strip())
+            },
+            export_artifact_cache_size=int(os.getenv('EXPORT_ARTIFACT_CACHE_SIZE', 10 * 1024)),
+            corpus_refresh_interval=int(os.getenv('CORPUS_REFRESH_INTERVAL', 60 * 5)),
+            corpus_max_age=int(os.getenv('CORPUS_MAX_AGE', 60 * 60 * 24)),
+            alignment_workers=int(os.getenv('ALIGNMENT_WORKERS', os.cpu_count() or 1)),
+            alignment_chunk_size=int(os.getenv('ALIGNMENT_CHUNK_SIZE', 2048)),
+            score_memo_size=int(os.getenv('SCORE_MEMO_SIZE', 64)),
+            search_progress_interval=float(os.getenv('SEARCH_PROGRESS_INTERVAL', 1)),
+            search_partial_result_size=int(os.getenv('SEARCH_PARTIAL_RESULT_SIZE', 100)),
+            search_result_view_cache_size=int(os.getenv('SEARCH_RESULT_VIEW_CACHE_SIZE', 16)),
+            embedding_index_lists=int(os.getenv('EMBEDDING_INDEX_LISTS', 0)),
+            embedding_index_probes=int(os.getenv('EMBEDDING_INDEX_PROBES', 8)),
+            embedding_index_preload=[name.strip() for name in os.getenv('EMBEDDING_INDEX_PRELOAD', '').split(',') if name.strip()],
+            task_concurrency=int(os.getenv('TASK_CONCURRENCY', 2)),
+            task_concurrency_overrides={
+                name[len(_TASK_CONCURRENCY_PREFIX):].lower(): int(value)
+                for name, value in os.environ.items() if name.startswith(_TASK_CONCURRENCY_PREFIX)
+            },
+            task_queue_size=int(os.getenv('TASK_QUEUE_SIZE', 64)),
+            task_execution_mode=os.getenv('TASK_EXECUTION_MODE', 'local'),
+            worker_id=os.getenv('WORKER_ID', socket.gethostname()),
+            worker_tasks=[name.strip() for name in os.getenv('WORKER_TASKS', '').split(',') if name.strip()],
         )
 
 
@@ -0,0 +1,21 @@
+from fastapi import Request
+from pkg.handlers import router
+from pkg.handlers.get_export_artifact.service import get_export_artifact
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException
+from pkg.shared.helpers.http.files import ImmutableFileResponse
+
+
+_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# Archives are content addressed and built with fixed entry dates, the archive of a task can be cached and resumed by
+# clients. Their ETag changes whenever the file is rebuilt, so a resumed download never mixes two builds.
+@router.get('/export/{export_type}/{task_id}/artifact')
+async def get(req: Request, export_type: str, task_id: str):
+    path, name = await get_export_artifact(export_type, task_id)
+
+    try:
+        return ImmutableFileResponse.create(path, name, req.headers, filename=f'StarPep-export-{task_id}.zip', headers={'cache-control': _CACHE_CONTROL})
+    except FileNotFoundError:
+        raise ResourceNotFoundException(f'The archive of export task {task_id} is no longer available.', ErrorCode.NOT_FOUND)
@@ -0,0 +1,36 @@
+import os
+from typing import Optional, Dict, Type, Union, Tuple
+from pkg.shared.entity.export.artifacts import ExportArtifactCache
+from pkg.shared.entity.export.multi_query.async_task import MultiQueryExportAsyncTask
+from pkg.shared.entity.export.single_query.async_task import SingleQueryExportAsyncTask
+from pkg.shared.entity.export.text_query.async_task import TextQueryExportAsyncTask
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException, ConflictException
+
+
+_EXPORT_TASKS: Dict[str, Type[Union[TextQueryExportAsyncTask, SingleQueryExportAsyncTask, MultiQueryExportAsyncTask]]] = {
+    'text-query': TextQueryExportAsyncTask,
+    'single-query': SingleQueryExportAsyncTask,
+    'multi-query': MultiQueryExportAsyncTask
+}
+
+
+# Path of the archive of a finished export and its artifact name, which identifies its content.
+async def get_export_artifact(export_type: str, task_id: str) -> Tuple[str, str]:
+    task_class = _EXPORT_TASKS.get(export_type)
+    status = await task_class.get_status_async(task_id) if task_class is not None else None
+
+    if status is None:
+        raise ResourceNotFoundException(f'Export task {task_id} does not exist.', ErrorCode.NOT_FOUND)
+
+    if not status.success:
+        raise ConflictException(f'Export task {task_id} has not finished successfully.')
+
+    cache = ExportArtifactCache.get_instance()
+    artifact: Optional[str] = status.data.get('artifact')
+    path = cache.get_path(artifact) if artifact is not None else os.path.realpath(cache.get_path(f'export-{task_id}.zip'))
+
+    if not os.path.isfile(path):
+        raise ResourceNotFoundException(f'The archive of export task {task_id} is no longer available.', ErrorCode.NOT_FOUND)
+
+    return path, os.path.basename(path)
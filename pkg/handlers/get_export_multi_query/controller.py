@@ -9,7 +9,7 @@ from pkg.shared.helpers.http.status import HttpStatus
 
 @router.get('/export/multi-query/{task_id}')
 async def get(res: Response, task_id: str):
-    cached_task_status = get_export_multi_query_task(task_id)
+    cached_task_status = await get_export_multi_query_task(task_id)
     if not cached_task_status:
         raise ResourceNotFoundException(f'Multi query export task {task_id} does not exist.', ErrorCode.NOT_FOUND)
 
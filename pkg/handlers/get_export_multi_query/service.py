@@ -3,5 +3,5 @@ from pkg.shared.entity.export.multi_query.async_task import MultiQueryExportAsyn
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_export_multi_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
-    return MultiQueryExportAsyncTask.get_status(task_id)
+async def get_export_multi_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await MultiQueryExportAsyncTask.get_status_async(task_id)
@@ -3,5 +3,5 @@ from pkg.shared.entity.export.single_query.async_task import SingleQueryExportAs
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_export_single_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
-    return SingleQueryExportAsyncTask.get_status(task_id)
+async def get_export_single_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await SingleQueryExportAsyncTask.get_status_async(task_id)
@@ -3,5 +3,5 @@ from pkg.shared.entity.export.text_query.async_task import TextQueryExportAsyncT
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_export_text_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
-    return TextQueryExportAsyncTask.get_status(task_id)
+async def get_export_text_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await TextQueryExportAsyncTask.get_status_async(task_id)
@@ -0,0 +1,13 @@
+from fastapi import Response
+from pkg.handlers import router
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.helpers.http.status import HttpStatus
+from pkg.handlers.get_health_metrics.service import get_metrics
+
+
+@router.get('/health/metrics')
+async def get(res: Response):
+    response = ResponseBuilder().with_status_code(HttpStatus.OK).with_data(get_metrics())
+
+    res.status_code = response.code
+    return response.build()
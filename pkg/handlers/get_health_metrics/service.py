@@ -0,0 +1,5 @@
+from pkg.shared.services.redis.metrics import RedisMetrics
+
+
+def get_metrics() -> object:
+    return {'redis': RedisMetrics.get_instance().to_dict()}
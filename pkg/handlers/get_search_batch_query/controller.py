@@ -0,0 +1,21 @@
+from fastapi import Response
+from pkg.handlers import router
+from pkg.handlers.get_search_batch_query.service import get_search_batch_query_task
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.helpers.http.status import HttpStatus
+
+
+# The status of the batch lists its queries and, once done, how many hits each ranked. Rankings are paginated
+# per query under /search/batch-query/{task_id}/queries/{position}.
+@router.get('/search/batch-query/{task_id}')
+async def get(res: Response, task_id: str):
+    cached_task_status = await get_search_batch_query_task(task_id)
+    if not cached_task_status:
+        raise ResourceNotFoundException(f'Batch query search task {task_id} does not exist.', ErrorCode.NOT_FOUND)
+
+    response = ResponseBuilder().with_status_code(HttpStatus.OK).with_data(cached_task_status)
+
+    res.status_code = response.code
+    return response.build()
@@ -0,0 +1,7 @@
+from typing import Optional
+from pkg.shared.entity.search.batch_query.async_task import BatchQueryAsyncTask
+from pkg.shared.utils.async_task import AsyncTaskStatus
+
+
+async def get_search_batch_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await BatchQueryAsyncTask.get_status_async(task_id)
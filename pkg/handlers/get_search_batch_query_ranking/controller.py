@@ -0,0 +1,37 @@
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pkg.handlers import router
+from pkg.handlers.get_search_batch_query.service import get_search_batch_query_task
+from pkg.handlers.get_search_batch_query_ranking.service import get_search_batch_query_result
+from pkg.shared.entity.search.utils import get_paginated_task_data
+from pkg.shared.entity.search.view import SearchResultQuery
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException, BadRequestException
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.helpers.http.status import HttpStatus
+
+
+@router.get('/search/batch-query/{task_id}/queries/{position}')
+async def get(req: Request, res: Response, task_id: str, position: int):
+    cached_task_status = await get_search_batch_query_task(task_id)
+    if not cached_task_status:
+        raise ResourceNotFoundException(f'Batch query search task {task_id} does not exist.', ErrorCode.NOT_FOUND)
+
+    # Rankings are only stored once the whole batch is done.
+    if not cached_task_status.success:
+        return ResponseBuilder().with_data(cached_task_status).build()
+
+    if not 0 <= position < len(cached_task_status.context['queries']):
+        raise ResourceNotFoundException(f'Batch query search task {task_id} has no query at position {position}.', ErrorCode.NOT_FOUND)
+
+    try:
+        page_param = req.query_params.get('page')
+        query = SearchResultQuery.create_from_params(req.query_params)
+        data = await run_in_threadpool(get_paginated_task_data, cached_task_status, page_param, get_search_batch_query_result(task_id, position), query)
+    except Exception as e:
+        raise BadRequestException(str(e), ErrorCode.INVALID_QUERY_PROVIDED)
+
+    response = ResponseBuilder().with_status_code(HttpStatus.OK).with_data(data)
+
+    res.status_code = response.code
+    return response.build()
@@ -0,0 +1,6 @@
+from pkg.shared.entity.search.result import PackedSearchResult
+from pkg.shared.entity.search.batch_query.async_task import BatchQueryAsyncTask
+
+
+def get_search_batch_query_result(task_id: str, position: int) -> PackedSearchResult:
+    return BatchQueryAsyncTask.get_result(task_id, position)
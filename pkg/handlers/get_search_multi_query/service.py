@@ -1,7 +1,12 @@
 from typing import Optional
+from pkg.shared.entity.search.result import PackedSearchResult
 from pkg.shared.entity.search.multi_query.async_task import MultiQueryAsyncTask
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_search_multi_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
-    return MultiQueryAsyncTask.get_status(task_id)
+async def get_search_multi_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await MultiQueryAsyncTask.get_status_async(task_id)
+
+
+def get_search_multi_query_result(task_id: str) -> PackedSearchResult:
+    return MultiQueryAsyncTask.get_result(task_id)
@@ -0,0 +1,7 @@
+from typing import Optional, AsyncIterator
+from pkg.shared.entity.search.events import stream_search_task_events
+from pkg.shared.entity.search.multi_query.async_task import MultiQueryAsyncTask
+
+
+def stream_search_multi_query_events(task_id: str, page_param: Optional[str]) -> AsyncIterator[str]:
+    return stream_search_task_events(MultiQueryAsyncTask.get_status_async, MultiQueryAsyncTask.get_result, task_id, page_param)
@@ -1,7 +1,12 @@
 from typing import Optional
+from pkg.shared.entity.search.result import PackedSearchResult
 from pkg.shared.entity.search.single_query.async_task import SingleQueryAsyncTask
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_search_single_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
-    return SingleQueryAsyncTask.get_status(task_id)
+async def get_search_single_query_task(task_id: str) -> Optional[AsyncTaskStatus]:
+    return await SingleQueryAsyncTask.get_status_async(task_id)
+
+
+def get_search_single_query_result(task_id: str) -> PackedSearchResult:
+    return SingleQueryAsyncTask.get_result(task_id)
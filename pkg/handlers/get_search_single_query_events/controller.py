@@ -0,0 +1,17 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pkg.handlers import router
+from pkg.handlers.get_search_single_query.service import get_search_single_query_task
+from pkg.handlers.get_search_single_query_events.service import stream_search_single_query_events
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException
+from pkg.shared.helpers.http.headers import CONTENT_TYPE_EVENT_STREAM
+
+
+@router.get('/search/single-query/{task_id}/events')
+async def get(req: Request, task_id: str):
+    if not await get_search_single_query_task(task_id):
+        raise ResourceNotFoundException(f'Single query search task {task_id} does not exist.', ErrorCode.NOT_FOUND)
+
+    events = stream_search_single_query_events(task_id, req.query_params.get('page'))
+    return StreamingResponse(events, media_type=CONTENT_TYPE_EVENT_STREAM, headers={'Cache-Control': 'no-cache'})
@@ -0,0 +1,7 @@
+from typing import Optional, AsyncIterator
+from pkg.shared.entity.search.events import stream_search_task_events
+from pkg.shared.entity.search.single_query.async_task import SingleQueryAsyncTask
+
+
+def stream_search_single_query_events(task_id: str, page_param: Optional[str]) -> AsyncIterator[str]:
+    return stream_search_task_events(SingleQueryAsyncTask.get_status_async, SingleQueryAsyncTask.get_result, task_id, page_param)
@@ -13,8 +13,8 @@ async def post(res: Response, payload: SearchExportRequestPayload):
     if not payload.is_multi_query():
         raise BadRequestException('This endpoint only handles exporting multi-query searches.', ErrorCode.INVALID_BODY_PROVIDED)
 
-    cached_search_task_status = get_export_multi_query_task_status(payload.data)
-    task = create_export_multi_query_task(payload, cached_search_task_status)
+    cached_search_task_status = await get_export_multi_query_task_status(payload.data)
+    task = await create_export_multi_query_task(payload, cached_search_task_status)
     response = ResponseBuilder().with_status_code(HttpStatus.CREATED).with_data(task.get_init_status())
 
     res.status_code = response.code
@@ -7,8 +7,8 @@ from pkg.shared.helpers.http.error import ResourceNotFoundException, ConflictExc
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_export_multi_query_task_status(task_id: str) -> AsyncTaskStatus[Any, List[MultiAlignedPeptide], Exception]:
-    cached_search_task = MultiQueryAsyncTask.get_status(task_id)
+async def get_export_multi_query_task_status(task_id: str) -> AsyncTaskStatus[Any, List[MultiAlignedPeptide], Exception]:
+    cached_search_task = await MultiQueryAsyncTask.get_status_async(task_id)
     if cached_search_task is None:
         raise ResourceNotFoundException(f'Multi query search task {task_id} does not exist.')
 
@@ -21,8 +21,8 @@ def get_export_multi_query_task_status(task_id: str) -> AsyncTaskStatus[Any, Lis
     return cached_search_task
 
 
-def create_export_multi_query_task(payload: SearchExportRequestPayload, cached_task_status: AsyncTaskStatus[Any, List[MultiAlignedPeptide], Exception]) -> MultiQueryExportAsyncTask:
+async def create_export_multi_query_task(payload: SearchExportRequestPayload, cached_task_status: AsyncTaskStatus[Any, List[MultiAlignedPeptide], Exception]) -> MultiQueryExportAsyncTask:
     task = MultiQueryExportAsyncTask(payload, cached_task_status)
-    task.start()
+    await task.start_async()
 
     return task
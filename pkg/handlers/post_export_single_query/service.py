@@ -7,8 +7,8 @@ from pkg.shared.helpers.http.error import ResourceNotFoundException, ConflictExc
 from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def get_export_single_query_task_status(task_id: str) -> AsyncTaskStatus[Any, List[SingleAlignedPeptide], Exception]:
-    cached_search_task = SingleQueryAsyncTask.get_status(task_id)
+async def get_export_single_query_task_status(task_id: str) -> AsyncTaskStatus[Any, List[SingleAlignedPeptide], Exception]:
+    cached_search_task = await SingleQueryAsyncTask.get_status_async(task_id)
     if cached_search_task is None:
         raise ResourceNotFoundException(f'Single query search task {task_id} does not exist.')
 
@@ -21,8 +21,8 @@ def get_export_single_query_task_status(task_id: str) -> AsyncTaskStatus[Any, Li
     return cached_search_task
 
 
-def create_export_single_query_task(payload: SearchExportRequestPayload, cached_task_status: AsyncTaskStatus[Any, List[SingleAlignedPeptide], Exception]) -> SingleQueryExportAsyncTask:
+async def create_export_single_query_task(payload: SearchExportRequestPayload, cached_task_status: AsyncTaskStatus[Any, List[SingleAlignedPeptide], Exception]) -> SingleQueryExportAsyncTask:
     task = SingleQueryExportAsyncTask(payload, cached_task_status)
-    task.start()
+    await task.start_async()
 
     return task
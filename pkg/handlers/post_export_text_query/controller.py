@@ -13,7 +13,7 @@ async def post(res: Response, payload: SearchExportRequestPayload):
     if not payload.is_text():
         raise BadRequestException('This endpoint only handles exporting text-query searches.', ErrorCode.INVALID_BODY_PROVIDED)
 
-    task = create_export_text_query_task(payload)
+    task = await create_export_text_query_task(payload)
     response = ResponseBuilder().with_status_code(HttpStatus.CREATED).with_data(task.get_init_status())
 
     res.status_code = response.code
@@ -0,0 +1,24 @@
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pkg.handlers import router
+from pkg.handlers.post_search_attributes.service import search_attributes
+from pkg.shared.entity.search.attribute_query.model import AttributeQueryPayload
+from pkg.shared.entity.search.view import SearchResultQuery
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import BadRequestException
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.helpers.http.status import HttpStatus
+
+
+@router.post('/search/attributes')
+async def post(req: Request, res: Response, payload: AttributeQueryPayload):
+    try:
+        query = SearchResultQuery.create_from_expressions(payload.sort, payload.filters)
+        data = await run_in_threadpool(search_attributes, query, req.query_params.get('page'))
+    except ValueError as e:
+        raise BadRequestException(str(e), ErrorCode.INVALID_QUERY_PROVIDED)
+
+    response = ResponseBuilder().with_status_code(HttpStatus.OK).with_data(data)
+
+    res.status_code = response.code
+    return response.build()
@@ -0,0 +1,19 @@
+from typing import Optional
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.attribute_query.index import AttributeIndexService
+from pkg.shared.entity.search.view import SearchResultQuery
+from pkg.shared.utils.lang import safe_int
+from pkg.shared.utils.pagination import paginate_slice
+
+
+# The bitmap holds every matching peptide, it can be exported as is through /export/text-query.
+def search_attributes(query: SearchResultQuery, page_param: Optional[str]) -> dict:
+    corpus = PeptideCorpusService.get_instance().get_corpus()
+    index = AttributeIndexService.get_instance().get_index(corpus)
+    rows = index.select(query)
+
+    return {
+        'corpusVersion': corpus.version,
+        'bitmap': index.get_bitmap(rows),
+        'data': paginate_slice(len(rows), lambda start, stop: corpus.store.get_peptides(rows[start:stop].tolist()), safe_int(page_param) or 1)
+    }
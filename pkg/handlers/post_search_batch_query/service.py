@@ -0,0 +1,17 @@
+from Bio import SeqIO
+from typing import List
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.cache import get_search_result_key, start_cached_search_task_async
+from pkg.shared.entity.search.batch_query.model import BatchAlignmentOptions
+from pkg.shared.entity.search.batch_query.async_task import BatchQueryAsyncTask
+from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.utils.async_task import AsyncTaskStatus
+
+
+async def create_search_batch_query_task(query_records: List[SeqIO.SeqRecord], query: str, options: BatchAlignmentOptions) -> AsyncTaskStatus:
+    corpus_version = await PeptideCorpusService.get_instance().get_version_async()
+    fixed_queries = [replace_ambiguous_amino_acids(str(record.seq)) for record in query_records]
+    result_key = get_search_result_key(BatchQueryAsyncTask.TASK_NAME, fixed_queries, options, corpus_version) if corpus_version else None
+
+    task = BatchQueryAsyncTask(query_records, query, options, result_key)
+    return await start_cached_search_task_async(task, result_key)
@@ -0,0 +1,39 @@
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pkg.handlers import router
+from pkg.handlers.post_search_embedding_query.service import search_embedding_query
+from pkg.shared.entity.search.embedding_query.model import EmbeddingSearchOptions
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.bio.fasta import parse_fasta_string, is_multi_fasta_valid
+from pkg.shared.helpers.http.error import BadRequestException
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.helpers.http.status import HttpStatus
+from pkg.shared.helpers.http.headers import CONTENT_TYPE_FASTA
+
+
+@router.post('/search/embedding-query')
+async def post(req: Request, res: Response):
+    content_type = req.headers.get('Content-Type')
+    if content_type != CONTENT_TYPE_FASTA:
+        raise BadRequestException(f'Invalid request body type provided, must be {CONTENT_TYPE_FASTA}', ErrorCode.INVALID_BODY_PROVIDED)
+
+    fasta_query_bytes = await req.body()
+    fasta_query = fasta_query_bytes.decode('utf-8')
+    parsed_fasta = parse_fasta_string(fasta_query)
+    if len(parsed_fasta) < 1 or not is_multi_fasta_valid(parsed_fasta):
+        raise BadRequestException('Request body is not valid FASTA.', ErrorCode.INVALID_BODY_PROVIDED)
+
+    try:
+        options = EmbeddingSearchOptions.create_from_params(dict(req.query_params))
+    except ValueError as e:
+        raise BadRequestException(str(e), ErrorCode.INVALID_QUERY_PROVIDED)
+
+    try:
+        data = await run_in_threadpool(search_embedding_query, parsed_fasta, options)
+    except ValueError as e:
+        raise BadRequestException(str(e), ErrorCode.INVALID_BODY_PROVIDED)
+
+    response = ResponseBuilder().with_status_code(HttpStatus.OK).with_data(data)
+
+    res.status_code = response.code
+    return response.build()
@@ -0,0 +1,28 @@
+import dataclasses
+from typing import List
+from Bio import SeqIO
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.embedding_query.index import EmbeddingIndexService
+from pkg.shared.entity.search.embedding_query.model import EmbeddingSearchOptions
+from pkg.shared.entity.search.embedding_query.search import search_embeddings
+from pkg.shared.helpers.http.error import ConflictException
+
+
+# Embedding searches are answered right away instead of going through a task.
+def search_embedding_query(query_records: List[SeqIO.SeqRecord], options: EmbeddingSearchOptions) -> dict:
+    corpus = PeptideCorpusService.get_instance().get_corpus()
+    index = EmbeddingIndexService.get_instance().get_index(options.embedding, corpus)
+    if index is None:
+        raise ConflictException(f'{options.embedding} embeddings are not packed, they cannot be searched.')
+
+    result = search_embeddings(corpus, index, query_records, options)
+
+    return {
+        'embedding': options.embedding,
+        'exact': result.exact,
+        'rescored': options.rescore,
+        'corpusVersion': corpus.version,
+        'compared': result.compared,
+        'candidates': result.candidates,
+        'peptides': [dataclasses.asdict(peptide) for peptide in result.peptides]
+    }
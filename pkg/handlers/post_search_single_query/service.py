@@ -1,10 +1,16 @@
 from Bio import SeqIO
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.cache import get_search_result_key, start_cached_search_task_async
 from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
 from pkg.shared.entity.search.single_query.async_task import SingleQueryAsyncTask
+from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.utils.async_task import AsyncTaskStatus
 
 
-def create_search_single_query_task(query_record: SeqIO.SeqRecord, query: str, options: SingleAlignmentOptions) -> SingleQueryAsyncTask:
-    task = SingleQueryAsyncTask(query_record, query, options)
-    task.start()
+async def create_search_single_query_task(query_record: SeqIO.SeqRecord, query: str, options: SingleAlignmentOptions) -> AsyncTaskStatus:
+    corpus_version = await PeptideCorpusService.get_instance().get_version_async()
+    fixed_query = replace_ambiguous_amino_acids(str(query_record.seq))
+    result_key = get_search_result_key(SingleQueryAsyncTask.TASK_NAME, [fixed_query], options, corpus_version) if corpus_version else None
 
-    return task
+    task = SingleQueryAsyncTask(query_record, query, options, result_key)
+    return await start_cached_search_task_async(task, result_key)
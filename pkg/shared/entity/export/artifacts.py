@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+import uuid
+from threading import Lock
+from typing import List, Optional
+from pkg.config import config
+from pkg.shared.entity.export.models import SearchExportForm
+
+
+_ARTIFACT_PREFIX = 'artifact-'
+_ARTIFACT_EXTENSION = '.zip'
+
+
+# Archives only depend on the peptides, in the order they are written, and on what is exported of them. The format
+# only matters when embedding resources are exported.
+def get_artifact_key(peptide_ids: List[str], form: SearchExportForm) -> str:
+    selection = {'peptideIds': list(peptide_ids), 'resources': sorted(form.get_exportable_resources())}
+    if form.has_embedding_resources():
+        selection['format'] = form.format
+
+    return hashlib.sha256(json.dumps(selection, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+# Export archives kept in temp_artifacts_location by artifact key, up to max_size bytes in total. Archives are
+# evicted least recently used first, by modification time, which is refreshed whenever an archive is reused.
+# Exports point to their archive through an export-{task_id}.zip link, links left dangling are removed with it.
+class ExportArtifactCache:
+    instance: 'ExportArtifactCache' = None
+    _instance_lock = Lock()
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'ExportArtifactCache':
+        if ExportArtifactCache.instance is None:
+            with ExportArtifactCache._instance_lock:
+                if ExportArtifactCache.instance is None:
+                    ExportArtifactCache.instance = ExportArtifactCache(config.temp_artifacts_location, config.export_artifact_cache_size * 1024 * 1024)
+
+        return ExportArtifactCache.instance
+
+    @staticmethod
+    def get_artifact_name(key: str) -> str:
+        return f'{_ARTIFACT_PREFIX}{key}{_ARTIFACT_EXTENSION}'
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # Each writer gets its own partial file, exports of the same selection may run at once.
+    def get_partial_path(self, key: str) -> str:
+        return self.get_path(f'{ExportArtifactCache.get_artifact_name(key)}.{uuid.uuid4().hex}.part')
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.get_path(ExportArtifactCache.get_artifact_name(key))
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def add(self, key: str, partial_path: str) -> str:
+        path = self.get_path(ExportArtifactCache.get_artifact_name(key))
+        os.replace(partial_path, path)
+
+        self.evict(keep=path)
+        return path
+
+    def link(self, key: str, link_name: str) -> str:
+        link_path = self.get_path(link_name)
+        partial_link_path = f'{link_path}.{uuid.uuid4().hex}.part'
+
+        os.symlink(ExportArtifactCache.get_artifact_name(key), partial_link_path)
+        os.replace(partial_link_path, link_path)
+
+        return link_path
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            artifacts = []
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(_ARTIFACT_PREFIX) and entry.name.endswith(_ARTIFACT_EXTENSION) and entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        artifacts.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_size = sum(size for _, size, _ in artifacts)
+            evicted = False
+
+            for _, size, path in sorted(artifacts):
+                if total_size <= self.max_size:
+                    break
+
+                if path == keep:
+                    continue
+
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+                total_size -= size
+                evicted = True
+                print(f'Evicted export artifact: {path}')
+
+            if evicted:
+                self._remove_dangling_links()
+
+    def _remove_dangling_links(self) -> None:
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,215 @@
+import io
+import os
+import csv
+import time
+import numpy as np
+from threading import Lock
+from typing import List, Dict, Tuple, Optional
+from pkg.shared.entity.export.packs import PeptideAssets
+from pkg.shared.entity.peptide.models import BasePeptide
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+EMBEDDING_FORMAT_CSV = 'csv'
+EMBEDDING_FORMAT_NPY = 'npy'
+EMBEDDING_FORMAT_PARQUET = 'parquet'
+
+# Seconds a matrix is served as it was mapped before its files are checked for a rebuild again.
+_MATRIX_CHECK_INTERVAL = 5
+
+EMBEDDING_FORMATS = [EMBEDDING_FORMAT_CSV, EMBEDDING_FORMAT_NPY, EMBEDDING_FORMAT_PARQUET]
+
+
+# Parquet exports need pyarrow, servers installed without it only offer the other formats.
+def is_parquet_available() -> bool:
+    return pyarrow is not None
+
+
+# The numeric columns of an embedding CSV file, its header followed by a single row.
+def _parse_embedding_csv(content: bytes) -> Tuple[List[str], np.ndarray]:
+    rows = list(csv.reader(io.StringIO(content.decode('utf-8'))))
+    if len(rows) < 2:
+        raise ValueError('Embedding files must hold a header and a row.')
+
+    columns, vector = [], []
+    for name, value in zip(rows[0], rows[1]):
+        try:
+            vector.append(float(value))
+        except ValueError:
+            continue
+
+        columns.append(name)
+
+    return columns, np.array(vector, dtype=np.float32)
+
+
+# The embeddings of a resource as a single float32 matrix, with a row per peptide ordered by peptide number.
+# The peptide numbers are written last, a matrix only exists once they are there.
+class EmbeddingMatrix:
+    def __init__(self, directory: str):
+        self.matrix = np.load(EmbeddingMatrix.get_matrix_path(directory), mmap_mode='r')
+        self.columns: List[str] = np.load(EmbeddingMatrix.get_columns_path(directory)).tolist()
+        self.numbers = np.load(EmbeddingMatrix.get_numbers_path(directory))
+
+    @staticmethod
+    def get_matrix_path(directory: str) -> str:
+        return f'{directory}.npy'
+
+    @staticmethod
+    def get_columns_path(directory: str) -> str:
+        return f'{directory}.columns.npy'
+
+    @staticmethod
+    def get_numbers_path(directory: str) -> str:
+        return f'{directory}.numbers.npy'
+
+    # Rows of the given peptide numbers, -1 for those the matrix does not hold.
+    def get_rows(self, numbers: np.ndarray) -> np.ndarray:
+        rows = np.searchsorted(self.numbers, numbers)
+        rows[rows >= len(self.numbers)] = 0
+
+        return np.where(self.numbers[rows] == numbers, rows, -1)
+
+    @staticmethod
+    def build(assets: PeptideAssets) -> int:
+        files = assets.get_files()
+        if len(files) == 0:
+            return 0
+
+        assets = assets.open()
+        numbers = np.array(sorted(files), dtype=np.int64)
+        matrix_path, columns_path, numbers_path = (path(assets.directory) for path in (EmbeddingMatrix.get_matrix_path, EmbeddingMatrix.get_columns_path, EmbeddingMatrix.get_numbers_path))
+
+        matrix, columns = None, None
+        for row, number in enumerate(numbers):
+            peptide_columns, vector = _parse_embedding_csv(assets.read(files[int(number)][:-len(assets.extension) - 1]))
+
+            if matrix is None:
+                columns = peptide_columns
+                matrix = np.lib.format.open_memmap(f'{matrix_path}.part', mode='w+', dtype=np.float32, shape=(len(numbers), len(columns)))
+            elif peptide_columns != columns:
+                raise ValueError(f'{files[int(number)]} does not have the columns of the other embeddings in {assets.directory}.')
+
+            matrix[row] = vector
+
+        matrix.flush()
+        del matrix
+
+        with open(f'{columns_path}.part', 'wb') as columns_file:
+            np.save(columns_file, np.array(columns, dtype=str))
+
+        with open(f'{numbers_path}.part', 'wb') as numbers_file:
+            np.save(numbers_file, numbers)
+
+        # Without peptide numbers readers fall back to the files until the new matrix is in place.
+        if os.path.exists(numbers_path):
+            os.remove(numbers_path)
+
+        os.replace(f'{matrix_path}.part', matrix_path)
+        os.replace(f'{columns_path}.part', columns_path)
+        os.replace(f'{numbers_path}.part', numbers_path)
+
+        return len(numbers)
+
+
+# Matrices are mapped once per process, at startup, and again after they were rebuilt. A mapping stays readable while
+# its files are replaced, so matrices are only checked for a rebuild every _MATRIX_CHECK_INTERVAL seconds, and reads
+# in between neither stat their files nor take the lock.
+class EmbeddingMatrixService:
+    instance: 'EmbeddingMatrixService' = None
+    _instance_lock = Lock()
+
+    def __init__(self):
+        # Time of the last check, modification time of the numbers file and matrix, None when it was not packed.
+        self._matrices: Dict[str, Tuple[float, Optional[float], Optional[EmbeddingMatrix]]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'EmbeddingMatrixService':
+        if EmbeddingMatrixService.instance is None:
+            with EmbeddingMatrixService._instance_lock:
+                if EmbeddingMatrixService.instance is None:
+                    EmbeddingMatrixService.instance = EmbeddingMatrixService()
+
+        return EmbeddingMatrixService.instance
+
+    def get_matrix(self, directory: str) -> Optional[EmbeddingMatrix]:
+        cached = self._matrices.get(directory)
+        if cached is not None and time.monotonic() - cached[0] < _MATRIX_CHECK_INTERVAL:
+            return cached[2]
+
+        try:
+            modified_at = os.path.getmtime(EmbeddingMatrix.get_numbers_path(directory))
+        except OSError:
+            modified_at = None
+
+        with self._lock:
+            cached = self._matrices.get(directory)
+            matrix = cached[2] if cached is not None and cached[1] == modified_at else None
+            if matrix is None and modified_at is not None:
+                matrix = EmbeddingMatrix(directory)
+
+            self._matrices[directory] = (time.monotonic(), modified_at, matrix)
+            return matrix
+
+    # Maps the matrices of the given asset directories, so the first exports and searches do not wait for them.
+    def preload(self, directories: List[str]) -> None:
+        for directory in directories:
+            try:
+                if self.get_matrix(directory) is None:
+                    print(f'Skipped mapping embedding matrix, none was packed in: {directory}')
+            except Exception as e:
+                print(f'Error mapping embedding matrix of: {directory}')
+                print(e)
+
+
+# Embeddings of the given peptides, in order, and the names of their columns. Rows come from the matrix of the
+# resource when there is one, peptides it does not hold are parsed from their own file.
+def read_embeddings(assets: PeptideAssets, peptide_ids: List[str]) -> Tuple[List[str], np.ndarray]:
+    matrix = EmbeddingMatrixService.get_instance().get_matrix(assets.directory)
+
+    if matrix is not None:
+        rows = matrix.get_rows(np.array([BasePeptide.parse_id(peptide_id) for peptide_id in peptide_ids], dtype=np.int64))
+        found = rows >= 0
+
+        embeddings = np.empty((len(peptide_ids), len(matrix.columns)), dtype=np.float32)
+        embeddings[found] = matrix.matrix[rows[found]]
+        columns = matrix.columns
+    else:
+        found = np.zeros(len(peptide_ids), dtype=bool)
+        embeddings, columns = None, None
+
+    missing = np.flatnonzero(~found)
+    if len(missing) > 0:
+        assets = assets.open()
+
+    for position in missing:
+        peptide_columns, vector = _parse_embedding_csv(assets.read(peptide_ids[position]))
+
+        if embeddings is None:
+            columns = peptide_columns
+            embeddings = np.empty((len(peptide_ids), len(columns)), dtype=np.float32)
+        elif peptide_columns != columns:
+            raise ValueError(f'{peptide_ids[position]} does not have the columns of the other embeddings in {assets.directory}.')
+
+        embeddings[position] = vector
+
+    return columns, embeddings
+
+
+def to_npy(embeddings: np.ndarray) -> bytes:
+    output = io.BytesIO()
+    np.save(output, embeddings)
+    return output.getvalue()
+
+
+def to_parquet(peptide_ids: List[str], columns: List[str], embeddings: np.ndarray) -> bytes:
+    table = pyarrow.table({'id': peptide_ids, **{name: embeddings[:, index] for index, name in enumerate(columns)}})
+    output = pyarrow.BufferOutputStream()
+    pyarrow.parquet.write_table(table, output)
+    return output.getvalue().to_pybytes()
@@ -1,10 +1,14 @@
 from dataclasses import dataclass
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 from pydantic import BaseModel, field_validator
+from pkg.shared.entity.export.embeddings import EMBEDDING_FORMATS, EMBEDDING_FORMAT_CSV, EMBEDDING_FORMAT_PARQUET, is_parquet_available
 
 
 _VALID_PAYLOAD_TYPES = ['text', 'single', 'multi']
 
+# Resources exported in the embedding format of the form.
+EMBEDDING_RESOURCES = ('esmMean', 'iFeatureAac', 'iFeatureDpc')
+
 
 class SearchExportForm(BaseModel):
     attributes: bool = False
@@ -14,9 +18,28 @@ class SearchExportForm(BaseModel):
     iFeatureAac: bool = False
     iFeatureDpc: bool = False
     pdb: bool = False
+    # Format of the embedding resources, the others keep their own.
+    format: str = EMBEDDING_FORMAT_CSV
+
+    @staticmethod
+    def get_resources() -> List[str]:
+        return [k for k, v in SearchExportForm.model_fields.items() if v.annotation is bool]
 
     def get_exportable_resources(self) -> List[str]:
-        return [k for k, v in self.__dict__.items() if v]
+        return [k for k in SearchExportForm.get_resources() if getattr(self, k)]
+
+    def has_embedding_resources(self) -> bool:
+        return any(getattr(self, k) for k in EMBEDDING_RESOURCES)
+
+    @field_validator('format')
+    def _validate_format(cls, export_format: Any) -> str:
+        if export_format not in EMBEDDING_FORMATS:
+            raise ValueError(f'Invalid format, must be one of: {", ".join(EMBEDDING_FORMATS)}')
+
+        if export_format == EMBEDDING_FORMAT_PARQUET and not is_parquet_available():
+            raise ValueError('Parquet exports are not available on this server.')
+
+        return export_format
 
 
 class SearchExportRequestPayload(BaseModel):
@@ -61,6 +84,7 @@ class SearchExportResult:
     total: int
     form: SearchExportForm
     done: List[str]
+    artifact: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {'peptideIds': self.peptideIds, 'total': self.total, 'form': self.form.model_dump(), 'done': self.done}
+        return {'peptideIds': self.peptideIds, 'total': self.total, 'form': self.form.model_dump(), 'done': self.done, 'artifact': self.artifact}
@@ -3,8 +3,9 @@ from typing import Optional, Dict, Any, List
 from pkg.shared.entity.export.redis import get_async_task_redis_client
 from pkg.shared.entity.export.models import SearchExportRequestPayload, SearchExportResult
 from pkg.shared.entity.export.utils import create_zip_archive
+from pkg.shared.entity.search.multi_query.async_task import MultiQueryAsyncTask
 from pkg.shared.entity.search.multi_query.model import MultiAlignedPeptide
-from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus
+from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus, refresh_queue_position, refresh_queue_position_async
 
 
 _TContext = None
@@ -30,28 +31,61 @@ class MultiQueryExportAsyncTask(AsyncTask[_TContext, _TData, Exception]):
         if cached is None or cached['name'] != MultiQueryExportAsyncTask.TASK_NAME:
             return None
 
-        return AsyncTaskStatus(**cached)
+        return refresh_queue_position(AsyncTaskStatus(**cached))
+
+    @staticmethod
+    async def get_status_async(task_id: str) -> Optional[AsyncTaskStatus]:
+        cache = get_async_task_redis_client()
+        cached = await cache.get_task_async(task_id)
+
+        if cached is None or cached['name'] != MultiQueryExportAsyncTask.TASK_NAME:
+            return None
+
+        return await refresh_queue_position_async(AsyncTaskStatus(**cached))
 
     @staticmethod
     def update_status(status: AsyncTaskStatus) -> None:
         cache = get_async_task_redis_client()
         cache.update_task(status.id, dataclasses.asdict(status))
 
-    def handle_archive_progress(self, completed_resource: str) -> None:
+    @staticmethod
+    def from_job(job: Dict[str, Any]) -> 'MultiQueryExportAsyncTask':
+        search_task = MultiQueryAsyncTask.get_status(job['search_task_id'])
+        if search_task is None:
+            raise ValueError(f'Multi query search task {job["search_task_id"]} does not exist anymore.')
+
+        task = MultiQueryExportAsyncTask(SearchExportRequestPayload(**job['payload']), search_task)
+        task.task_id = job['id']
+
+        return task
+
+    def to_job(self) -> Dict[str, Any]:
+        return {'id': self.task_id, 'payload': self.payload.model_dump(), 'search_task_id': self.search_task.id}
+
+    def handle_queued(self, position: Optional[int]) -> None:
+        super().handle_queued(position)
+
+        cache = get_async_task_redis_client()
+        cache.create_task(self.task_id, dataclasses.asdict(self.get_init_status()))
+
+    # Resources are reported as their entries are written, or all at once when the archive is reused. The status
+    # holding the last of them is stored by post_run.
+    def handle_archive_progress(self, completed_resources: List[str]) -> None:
         if self.result:
-            self.result.done.append(completed_resource)
+            self.result.done.extend(completed_resources)
 
-            status = self.create_status(True, False, None, self.result.to_dict())
-            MultiQueryExportAsyncTask.update_status(status)
+            if len(self.result.done) < len(self.payload.form.get_exportable_resources()):
+                status = self.create_status(True, False, None, self.result.to_dict())
+                MultiQueryExportAsyncTask.update_status(status)
 
     def task(self) -> None:
-        peptide_ids = [peptide['id'] for peptide in self.search_task.data]
+        peptide_ids = MultiQueryAsyncTask.get_result(self.search_task.id).get_ids()
 
         if len(peptide_ids) < 1:
             raise ValueError('At least one peptide needs to be exported.')
 
         self.result = SearchExportResult(peptide_ids, len(peptide_ids), self.payload.form, [])
-        create_zip_archive(f'export-{self.task_id}', peptide_ids, self.payload.form, self.handle_archive_progress)
+        self.result.artifact = create_zip_archive(f'export-{self.task_id}', peptide_ids, self.payload.form, self.handle_archive_progress)
 
     def pre_run(self) -> None:
         cache = get_async_task_redis_client()
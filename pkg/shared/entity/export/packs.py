@@ -0,0 +1,152 @@
+import os
+import mmap
+import numpy as np
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, Dict, Tuple
+from pkg.shared.entity.peptide.models import BasePeptide
+
+
+_MISSING_OFFSET = -1
+
+
+# The files of an asset directory concatenated into a single blob, with an index holding the start and end offsets
+# of every file by peptide number (-1 for the numbers without a file). The index is written last, a pack only
+# exists once it is there.
+class AssetPack:
+    def __init__(self, directory: str):
+        with open(AssetPack.get_blob_path(directory), 'rb') as blob:
+            # Empty files cannot be mapped.
+            self.data = mmap.mmap(blob.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(blob.fileno()).st_size > 0 else b''
+
+        self.index = np.load(AssetPack.get_index_path(directory), mmap_mode='r')
+
+    @staticmethod
+    def get_blob_path(directory: str) -> str:
+        return f'{directory}.pack'
+
+    @staticmethod
+    def get_index_path(directory: str) -> str:
+        return f'{directory}.pack.index.npy'
+
+    def read(self, peptide_id: str) -> Optional[bytes]:
+        number = BasePeptide.parse_id(peptide_id)
+        if number >= len(self.index):
+            return None
+
+        start, end = (int(offset) for offset in self.index[number])
+        if start == _MISSING_OFFSET:
+            return None
+
+        return self.data[start:end]
+
+    @staticmethod
+    def build(directory: str, files: Dict[int, str]) -> int:
+        if len(files) == 0:
+            return 0
+
+        index = np.full((max(files) + 1, 2), _MISSING_OFFSET, dtype=np.int64)
+        blob_path, index_path = AssetPack.get_blob_path(directory), AssetPack.get_index_path(directory)
+
+        # Replaced packs stay readable by the processes that opened them, their blob is only unlinked.
+        with open(f'{blob_path}.part', 'wb') as blob:
+            for number in sorted(files):
+                with open(os.path.join(directory, files[number]), 'rb') as input_file:
+                    start = blob.tell()
+                    blob.write(input_file.read())
+                    index[number] = (start, blob.tell())
+
+        with open(f'{index_path}.part', 'wb') as index_file:
+            np.save(index_file, index)
+
+        # Without an index readers fall back to the files until the new blob is in place.
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+        os.replace(f'{blob_path}.part', blob_path)
+        os.replace(f'{index_path}.part', index_path)
+
+        return len(files)
+
+
+# Packs are opened once per process, and again after they were rebuilt.
+class AssetPackService:
+    instance: 'AssetPackService' = None
+    _instance_lock = Lock()
+
+    def __init__(self):
+        self._packs: Dict[str, Tuple[float, AssetPack]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'AssetPackService':
+        if AssetPackService.instance is None:
+            with AssetPackService._instance_lock:
+                if AssetPackService.instance is None:
+                    AssetPackService.instance = AssetPackService()
+
+        return AssetPackService.instance
+
+    def get_pack(self, directory: str) -> Optional[AssetPack]:
+        try:
+            modified_at = os.path.getmtime(AssetPack.get_index_path(directory))
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._packs.get(directory)
+            if cached is None or cached[0] != modified_at:
+                cached = self._packs[directory] = (modified_at, AssetPack(directory))
+
+            return cached[1]
+
+
+# Files of a peptide asset directory, named after the peptide id. Files are read from the pack of the directory
+# when there is one, and from the directory itself otherwise or for the peptides the pack does not hold.
+@dataclass
+class PeptideAssets:
+    directory: str
+    extension: str
+
+    def get_pack(self) -> Optional[AssetPack]:
+        return AssetPackService.get_instance().get_pack(self.directory)
+
+    # Assets to read many peptides from, with the pack looked up once rather than for every peptide.
+    def open(self) -> 'OpenedPeptideAssets':
+        return OpenedPeptideAssets(self.directory, self.extension, self.get_pack())
+
+    def read(self, peptide_id: str) -> bytes:
+        pack = self.get_pack()
+        content = pack.read(peptide_id) if pack is not None else None
+
+        if content is None:
+            with open(os.path.join(self.directory, f'{peptide_id}.{self.extension}'), 'rb') as input_file:
+                content = input_file.read()
+
+        return content
+
+    # File names by peptide number.
+    def get_files(self) -> Dict[int, str]:
+        suffix = f'.{self.extension}'
+        files: Dict[int, str] = {}
+
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(suffix):
+                try:
+                    files[BasePeptide.parse_id(file_name[:-len(suffix)])] = file_name
+                except ValueError:
+                    continue
+
+        return files
+
+    def pack(self) -> int:
+        return AssetPack.build(self.directory, self.get_files())
+
+
+# Assets holding the pack resolved when they were opened, a pack rebuilt meanwhile stays readable through its mapping.
+@dataclass
+class OpenedPeptideAssets(PeptideAssets):
+    pack: Optional[AssetPack] = None
+
+    def get_pack(self) -> Optional[AssetPack]:
+        return self.pack
@@ -1,13 +1,81 @@
 import os
-import shutil
-from typing import List, Callable, Optional
+import time
+import zipfile
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Callable, Optional, Iterator, Deque, IO
 from pkg.config import config
-from pkg.shared.entity.export.models import SearchExportForm
+from pkg.shared.entity.export.models import SearchExportForm, EMBEDDING_RESOURCES
+from pkg.shared.entity.export.artifacts import ExportArtifactCache, get_artifact_key
+from pkg.shared.entity.export.embeddings import EmbeddingMatrix, EmbeddingMatrixService, EMBEDDING_FORMAT_NPY, EMBEDDING_FORMAT_PARQUET, read_embeddings, to_npy, to_parquet
+from pkg.shared.entity.export.packs import PeptideAssets
 
 
 _ARTIFACT_NAME_PREFIX = 'StarPep-exported'
 
+_READ_AHEAD_PER_WORKER = 4
+
+# Entries are stamped with a fixed date, the earliest a ZIP file can hold, so that an archive rebuilt for the same
+# content key has the same bytes.
+_ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+# One file of the archive, made of the files of the given peptides in order. Sources are read on a thread pool by
+# read_source(index, peptide_id), which returns the bytes the source adds to the entry.
+@dataclass
+class _ArchiveEntry:
+    name: str
+    sources: List[str]
+    read_source: Callable[[int, str], bytes]
+
+
+# Text files are written with the newlines they would have been read with in text mode.
+def _to_text(content: bytes) -> str:
+    return content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _read_file(assets: PeptideAssets, index: int, peptide_id: str) -> bytes:
+    return assets.read(peptide_id)
+
+
+def _read_text_file(assets: PeptideAssets, index: int, peptide_id: str) -> bytes:
+    return _to_text(assets.read(peptide_id)).encode('utf-8')
+
+
+def _read_peptide_ids(peptide_ids: List[str], index: int, source: str) -> bytes:
+    return ''.join(f'{peptide_id}\n' for peptide_id in peptide_ids).encode('utf-8')
+
+
+def _read_embedding_columns(assets: PeptideAssets, peptide_ids: List[str], index: int, source: str) -> bytes:
+    columns, _ = read_embeddings(assets, peptide_ids[:1])
+    return ''.join(f'{column}\n' for column in columns).encode('utf-8')
+
+
+def _read_npy_embeddings(assets: PeptideAssets, peptide_ids: List[str], index: int, source: str) -> bytes:
+    _, embeddings = read_embeddings(assets, peptide_ids)
+    return to_npy(embeddings)
+
+
+def _read_parquet_embeddings(assets: PeptideAssets, peptide_ids: List[str], index: int, source: str) -> bytes:
+    columns, embeddings = read_embeddings(assets, peptide_ids)
+    return to_parquet(peptide_ids, columns, embeddings)
+
+
+def _read_csv_row(assets: PeptideAssets, index: int, peptide_id: str) -> bytes:
+    text = _to_text(assets.read(peptide_id))
+    if index == 0:
+        return text.encode('utf-8')
+
+    # Skip the columns header since it was already added before.
+    lines = text.split('\n', 2)
+    if len(lines) < 2:
+        return b''
+
+    return (lines[1] + ('\n' if len(lines) > 2 else '')).encode('utf-8')
+
 
 class _ResourceHandlers:
     class AbstractResourceHandler(ABC):
@@ -16,103 +84,106 @@ class _ResourceHandlers:
             pass
 
         @abstractmethod
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
+        def get_assets(self) -> PeptideAssets:
             pass
 
-    @staticmethod
-    def create_resource_csv_artifact(output_file: str, source_directory: str, peptide_ids: List[str]) -> None:
-        with open(output_file, 'w') as output_file:
-            for index, peptide_id in enumerate(peptide_ids):
-                csv_input_file = os.path.join(source_directory, f'{peptide_id}.csv')
+        @abstractmethod
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            pass
 
-                with open(csv_input_file, 'r') as input_file:
-                    if index == 0:
-                        input_content = input_file.read()
-                    else:
-                        input_file.readline()  # Skip the columns header since it was already added before.
-                        input_content = input_file.readline()
+        def pack_assets(self) -> int:
+            return self.get_assets().pack()
 
-                    output_file.write(input_content)
+    class AbstractCsvResourceHandler(AbstractResourceHandler, ABC):
+        def get_assets(self) -> PeptideAssets:
+            return PeptideAssets(self.get_source_directory(), 'csv')
+
+    # Embeddings are exported as CSV rows, or as a single matrix for the npy and parquet formats, which is sliced out
+    # of the embedding matrix of the resource when it was packed.
+    class AbstractEmbeddingResourceHandler(AbstractCsvResourceHandler, ABC):
+        @abstractmethod
+        def get_archive_name(self) -> str:
+            pass
+
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            name, assets = self.get_archive_name(), self.get_assets().open()
+
+            if export_format == EMBEDDING_FORMAT_NPY:
+                return [
+                    _ArchiveEntry(f'{name}.npy', [name], partial(_read_npy_embeddings, assets, peptide_ids)),
+                    _ArchiveEntry(f'{name}-columns.txt', [name], partial(_read_embedding_columns, assets, peptide_ids)),
+                    _ArchiveEntry(f'{name}-ids.txt', [name], partial(_read_peptide_ids, peptide_ids))
+                ]
+
+            if export_format == EMBEDDING_FORMAT_PARQUET:
+                return [_ArchiveEntry(f'{name}.parquet', [name], partial(_read_parquet_embeddings, assets, peptide_ids))]
+
+            return [_ResourceHandlers.create_resource_csv_entry(f'{name}.csv', assets, peptide_ids)]
+
+        def pack_assets(self) -> int:
+            count = super().pack_assets()
+            EmbeddingMatrix.build(self.get_assets())
+            return count
+
+    @staticmethod
+    def create_resource_csv_entry(name: str, assets: PeptideAssets, peptide_ids: List[str]) -> _ArchiveEntry:
+        return _ArchiveEntry(name, peptide_ids, partial(_read_csv_row, assets))
 
-    class AttributeResourceHandler(AbstractResourceHandler):
+    class AttributeResourceHandler(AbstractCsvResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'csv', 'attributes')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            csv_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}-features.csv')
-            _ResourceHandlers.create_resource_csv_artifact(csv_output_file, self.get_source_directory(), peptide_ids)
-            print(f'Created Attributes CSV file with {len(peptide_ids)} entries: {csv_output_file}')
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            return [_ResourceHandlers.create_resource_csv_entry(f'{_ARTIFACT_NAME_PREFIX}-features.csv', self.get_assets().open(), peptide_ids)]
 
-    class MetadataResourceHandler(AbstractResourceHandler):
+    class MetadataResourceHandler(AbstractCsvResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'csv', 'metadata')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            csv_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}-metadata.csv')
-            _ResourceHandlers.create_resource_csv_artifact(csv_output_file, self.get_source_directory(), peptide_ids)
-            print(f'Created Metadata CSV file with {len(peptide_ids)} entries: {csv_output_file}')
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            return [_ResourceHandlers.create_resource_csv_entry(f'{_ARTIFACT_NAME_PREFIX}-metadata.csv', self.get_assets().open(), peptide_ids)]
 
     class FastaResourceHandler(AbstractResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'fasta')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            fasta_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}.fasta')
+        def get_assets(self) -> PeptideAssets:
+            return PeptideAssets(self.get_source_directory(), 'fasta')
 
-            with open(fasta_output_file, 'w') as output_file:
-                source_directory = self.get_source_directory()
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            return [_ArchiveEntry(f'{_ARTIFACT_NAME_PREFIX}.fasta', peptide_ids, partial(_read_text_file, self.get_assets().open()))]
 
-                for peptide_id in peptide_ids:
-                    fasta_input_file = os.path.join(source_directory, f'{peptide_id}.fasta')
-
-                    with open(fasta_input_file, 'r') as input_file:
-                        input_content = input_file.read()
-                        output_file.write(input_content)
-
-            print(f'Created FASTA file with {len(peptide_ids)} entries: {fasta_output_file}')
-
-    class EsmMeanResourceHandler(AbstractResourceHandler):
+    class EsmMeanResourceHandler(AbstractEmbeddingResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'csv', 'embeddings', 'esm-mean')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            csv_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}-embeddings-esm-mean.csv')
-            _ResourceHandlers.create_resource_csv_artifact(csv_output_file, self.get_source_directory(), peptide_ids)
-            print(f'Created Embeddings ESM-mean CSV file with {len(peptide_ids)} entries: {csv_output_file}')
+        def get_archive_name(self) -> str:
+            return f'{_ARTIFACT_NAME_PREFIX}-embeddings-esm-mean'
 
-    class IFeatureAacResourceHandler(AbstractResourceHandler):
+    class IFeatureAacResourceHandler(AbstractEmbeddingResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'csv', 'embeddings', 'ifeature-aac-20')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            csv_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}-embeddings-ifeature-aac-20.csv')
-            _ResourceHandlers.create_resource_csv_artifact(csv_output_file, self.get_source_directory(), peptide_ids)
-            print(f'Created Embeddings iFeature-AAC CSV file with {len(peptide_ids)} entries: {csv_output_file}')
+        def get_archive_name(self) -> str:
+            return f'{_ARTIFACT_NAME_PREFIX}-embeddings-ifeature-aac-20'
 
-    class IFeatureDpcResourceHandler(AbstractResourceHandler):
+    class IFeatureDpcResourceHandler(AbstractEmbeddingResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'csv', 'embeddings', 'ifeature-dpc-400')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            csv_output_file = os.path.join(output_directory, f'{_ARTIFACT_NAME_PREFIX}-embeddings-ifeature-dpc-400.csv')
-            _ResourceHandlers.create_resource_csv_artifact(csv_output_file, self.get_source_directory(), peptide_ids)
-            print(f'Created Embeddings iFeature-DPC CSV file with {len(peptide_ids)} entries: {csv_output_file}')
+        def get_archive_name(self) -> str:
+            return f'{_ARTIFACT_NAME_PREFIX}-embeddings-ifeature-dpc-400'
 
     class PdbResourceHandler(AbstractResourceHandler):
         def get_source_directory(self) -> str:
             return os.path.join(config.assets_location, 'peptides', 'pdb')
 
-        def create_resource_artifact(self, output_directory: str, peptide_ids: List[str]) -> None:
-            pdb_output_directory = os.path.join(output_directory, 'pdb')
-            os.mkdir(pdb_output_directory)
-
-            source_directory = self.get_source_directory()
-
-            for peptide_id in peptide_ids:
-                pdb_file = os.path.join(source_directory, f'{peptide_id}.pdb')
-                shutil.copy(pdb_file, pdb_output_directory)
+        def get_assets(self) -> PeptideAssets:
+            return PeptideAssets(self.get_source_directory(), 'pdb')
 
-            print(f'Created PDB output directory with {len(peptide_ids)} entries: {pdb_output_directory}')
+        def get_archive_entries(self, peptide_ids: List[str], export_format: str) -> List[_ArchiveEntry]:
+            read_source = partial(_read_file, self.get_assets().open())
+            return [_ArchiveEntry(f'pdb/{peptide_id}.pdb', [peptide_id], read_source) for peptide_id in peptide_ids]
 
     class HandlerFactory:
         @staticmethod
@@ -141,46 +212,132 @@ class _ResourceHandlers:
             raise ValueError('Invalid resource_name provided to AbstractHandlerFactory.')
 
 
-def _make_zip_archive(source_directory: str, destination_file: str) -> None:
-    shutil.make_archive(
-        base_name=destination_file,
-        format='zip',
-        root_dir=source_directory,
-        base_dir='.'
-    )
+# The assets of an exported resource, embedding searches read the matrices packed from them.
+def get_resource_assets(resource: str) -> PeptideAssets:
+    return _ResourceHandlers.HandlerFactory.get(resource).get_assets()
 
 
-def create_zip_archive(file_name: str, peptide_ids: List[str], form: SearchExportForm, on_resource_complete: Optional[Callable[[str], None]]) -> None:
-    exportable_resources = form.get_exportable_resources()
-    if len(exportable_resources) < 1:
-        raise Exception('At least one resource needs to be exported to create an archive.')
+# Maps the embedding matrices of every embedding resource, for processes that export or search embeddings.
+def preload_embedding_matrices() -> None:
+    EmbeddingMatrixService.get_instance().preload([get_resource_assets(resource).directory for resource in EMBEDDING_RESOURCES])
 
-    if len(peptide_ids) < 1:
-        raise ValueError('At least one peptide needs to be exported.')
 
-    artifact_archive_filename = os.path.join(config.temp_artifacts_location, file_name)
-    artifact_directory = os.path.join(config.temp_artifacts_location, f'{file_name}.d')
-    os.mkdir(artifact_directory)
-    print(f'Created artifact directory: {artifact_directory}')
+def _read_entries(executor: ThreadPoolExecutor, entries: List[_ArchiveEntry], read_ahead: int) -> Iterator[bytes]:
+    # Sources are read ahead on the pool, a bounded number at a time, and handed back in archive order.
+    reads = ((entry, index, source) for entry in entries for index, source in enumerate(entry.sources))
+    pending: Deque[Future] = deque()
+
+    for entry, index, source in reads:
+        pending.append(executor.submit(entry.read_source, index, source))
+
+        if len(pending) >= read_ahead:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+# ZipFile.open only applies a compression level to entries opened by name, so it is set on the entry itself, under
+# the name of the running Python version. It was renamed from _compresslevel to compress_level in Python 3.13.
+_ENTRY_COMPRESSION_LEVEL = 'compress_level' if hasattr(zipfile.ZipInfo, 'compress_level') else '_compresslevel'
+
+
+def _open_entry(archive: zipfile.ZipFile, name: str, resource: str) -> IO[bytes]:
+    level = config.get_export_compression_level(resource)
+
+    entry = zipfile.ZipInfo(name, date_time=_ENTRY_DATE_TIME)
+    entry.compress_type = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+    setattr(entry, _ENTRY_COMPRESSION_LEVEL, level)
 
-    try:
-        for resource in exportable_resources:
-            handler = _ResourceHandlers.HandlerFactory.get(resource)
-            handler.create_resource_artifact(artifact_directory, peptide_ids)
+    return archive.open(entry, 'w')
 
-            if on_resource_complete is not None:
-                on_resource_complete(resource)
 
-        _make_zip_archive(artifact_directory, artifact_archive_filename)
-        print(f'Created artifact archive: {artifact_archive_filename}')
-    except Exception as e:
-        artifact_archive_filename += '.zip'
+def _create_directory_entry(name: str) -> zipfile.ZipInfo:
+    entry = zipfile.ZipInfo(f'{name}/', date_time=_ENTRY_DATE_TIME)
+    entry.external_attr = (0o40777 << 16) | 0x10
+    entry.compress_size, entry.file_size, entry.CRC = 0, 0, 0
 
-        if os.path.exists(artifact_archive_filename):
-            os.remove(artifact_archive_filename)
-            print(f'Removed artifact archive: {artifact_archive_filename}')
+    return entry
+
+
+def _write_entries(archive: zipfile.ZipFile, resource: str, entries: List[_ArchiveEntry], contents: Iterator[bytes]) -> None:
+    for entry in entries:
+        with _open_entry(archive, entry.name, resource) as output:
+            for _ in entry.sources:
+                output.write(next(contents))
+
+
+# Every source file is streamed straight into its entry of the archive. The sources of every resource are read on a
+# thread pool, ahead of the entry being written, so the reads of a resource, such as slicing an embedding matrix,
+# overlap with the writing of the resources before it. Entries are written one at a time, as a ZIP file is
+# sequential. The archive is written under a temporary name and only takes its final name once complete.
+def _write_zip_archive(partial_archive_filename: str, peptide_ids: List[str], form: SearchExportForm, on_resources_complete: Optional[Callable[[List[str]], None]]) -> None:
+    resources = [
+        (resource, _ResourceHandlers.HandlerFactory.get(resource).get_archive_entries(peptide_ids, form.format))
+        for resource in form.get_exportable_resources()
+    ]
+
+    with zipfile.ZipFile(partial_archive_filename, 'w') as archive, ThreadPoolExecutor(config.export_io_workers) as executor:
+        contents = _read_entries(executor, [entry for _, entries in resources for entry in entries], config.export_io_workers * _READ_AHEAD_PER_WORKER)
+
+        for resource, entries in resources:
+            for directory in sorted({os.path.dirname(entry.name) for entry in entries} - {''}):
+                archive.mkdir(_create_directory_entry(directory))
+
+            _write_entries(archive, resource, entries, contents)
+
+            print(f'Added {resource} to artifact archive with {len(peptide_ids)} entries: {partial_archive_filename}')
+
+            if on_resources_complete is not None:
+                on_resources_complete([resource])
+
+
+# Archives are content addressed, peptides are exported in the order given and an archive already built for the
+# same selection is reused. Either way file_name.zip links to the archive, whose name is returned.
+def create_zip_archive(file_name: str, peptide_ids: List[str], form: SearchExportForm, on_resources_complete: Optional[Callable[[List[str]], None]]) -> str:
+    exportable_resources = form.get_exportable_resources()
+    if len(exportable_resources) < 1:
+        raise Exception('At least one resource needs to be exported to create an archive.')
+
+    if len(peptide_ids) < 1:
+        raise ValueError('At least one peptide needs to be exported.')
 
-        raise e
-    finally:
-        shutil.rmtree(artifact_directory)
-        print(f'Removed artifact directory: {artifact_directory}')
+    cache = ExportArtifactCache.get_instance()
+    key = get_artifact_key(peptide_ids, form)
+    artifact_archive_filename = cache.get(key)
+
+    if artifact_archive_filename is not None:
+        print(f'Reused artifact archive: {artifact_archive_filename}')
+
+        if on_resources_complete is not None:
+            on_resources_complete(exportable_resources)
+    else:
+        partial_archive_filename = cache.get_partial_path(key)
+
+        try:
+            _write_zip_archive(partial_archive_filename, peptide_ids, form, on_resources_complete)
+            artifact_archive_filename = cache.add(key, partial_archive_filename)
+            print(f'Created artifact archive: {artifact_archive_filename}')
+        except Exception as e:
+            if os.path.exists(partial_archive_filename):
+                os.remove(partial_archive_filename)
+                print(f'Removed artifact archive: {partial_archive_filename}')
+
+            raise e
+
+    cache.link(key, f'{file_name}.zip')
+    return os.path.basename(artifact_archive_filename)
+
+
+# Packs the asset directory of every exportable resource, see pack_assets.py.
+def pack_resource_assets() -> None:
+    for resource in SearchExportForm.get_resources():
+        handler = _ResourceHandlers.HandlerFactory.get(resource)
+        assets = handler.get_assets()
+        if not os.path.isdir(assets.directory):
+            print(f'Skipped packing {resource}, no directory at: {assets.directory}')
+            continue
+
+        start = time.perf_counter()
+        count = handler.pack_assets()
+        print(f'Packed {count} {resource} files from {assets.directory} in {time.perf_counter() - start:.2f}s.')
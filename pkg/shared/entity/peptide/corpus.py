@@ -0,0 +1,134 @@
+import time
+from fastapi.concurrency import run_in_threadpool
+from threading import Thread, Lock
+from dataclasses import dataclass
+from typing import Optional
+from pkg.config import config
+from pkg.shared.entity.peptide.index import ResidueIndex
+from pkg.shared.entity.peptide.memo import SequenceScoreMemo
+from pkg.shared.entity.peptide.neo4j import get_peptide_store, get_peptides_marker
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.services.redis.client import RedisService
+from pkg.shared.utils.async_task import TASK_EXECUTION_MODE_REDIS
+
+
+# Version of the corpus last loaded by any process, for processes that only enqueue tasks and never load it.
+_CORPUS_VERSION_KEY = 'corpus:version'
+
+
+@dataclass(frozen=True)
+class PeptideCorpus:
+    version: str
+    marker: str
+    loaded_at: float
+    store: PeptideStore
+    index: ResidueIndex
+    scores: SequenceScoreMemo
+
+    def is_expired(self, max_age: int) -> bool:
+        return time.time() - self.loaded_at >= max_age
+
+    @staticmethod
+    def load(marker: str) -> 'PeptideCorpus':
+        return PeptideCorpus.from_store(get_peptide_store().as_mapped_object(), marker)
+
+    @staticmethod
+    def from_store(store: PeptideStore, marker: str) -> 'PeptideCorpus':
+        return PeptideCorpus(
+            version=store.compute_version(),
+            marker=marker,
+            loaded_at=time.time(),
+            store=store,
+            index=ResidueIndex(store),
+            scores=SequenceScoreMemo(store.get_group_count(), config.score_memo_size)
+        )
+
+
+class PeptideCorpusService:
+    instance: 'PeptideCorpusService' = None
+    _instance_lock = Lock()
+
+    def __init__(self, refresh_interval: int, max_age: int):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+
+        self._corpus: Optional[PeptideCorpus] = None
+        self._load_lock = Lock()
+        self._refresh_thread: Optional[Thread] = None
+
+    @staticmethod
+    def get_instance() -> 'PeptideCorpusService':
+        if PeptideCorpusService.instance is None:
+            with PeptideCorpusService._instance_lock:
+                if PeptideCorpusService.instance is None:
+                    PeptideCorpusService.instance = PeptideCorpusService(config.corpus_refresh_interval, config.corpus_max_age)
+
+        return PeptideCorpusService.instance
+
+    def get_corpus(self) -> PeptideCorpus:
+        corpus = self._corpus
+        if corpus is not None:
+            return corpus
+
+        with self._load_lock:
+            if self._corpus is None:
+                self._swap(PeptideCorpus.load(get_peptides_marker().as_mapped_object()))
+
+            return self._corpus
+
+    def get_version(self) -> Optional[str]:
+        if config.task_execution_mode == TASK_EXECUTION_MODE_REDIS:
+            version = RedisService.get_instance().client.get(_CORPUS_VERSION_KEY)
+            return version.decode('utf-8') if version is not None else None
+
+        return self.get_corpus().version
+
+    # The corpus may have to be loaded first, which blocks, so that is left to the thread pool.
+    async def get_version_async(self) -> Optional[str]:
+        if config.task_execution_mode == TASK_EXECUTION_MODE_REDIS:
+            version = await RedisService.get_instance().async_client.get(_CORPUS_VERSION_KEY)
+            return version.decode('utf-8') if version is not None else None
+
+        corpus = await run_in_threadpool(self.get_corpus)
+        return corpus.version
+
+    def refresh(self, force: bool = False) -> bool:
+        marker = get_peptides_marker().as_mapped_object()
+
+        with self._load_lock:
+            current = self._corpus
+            if not force and current is not None and current.marker == marker and not current.is_expired(self.max_age):
+                return False
+
+            self._swap(PeptideCorpus.load(marker))
+            return True
+
+    def start_background_refresh(self) -> None:
+        if self._refresh_thread is not None:
+            return
+
+        self._refresh_thread = Thread(target=self._refresh_loop, name='peptide_corpus_refresh', daemon=True)
+        self._refresh_thread.start()
+
+    def _swap(self, corpus: PeptideCorpus) -> None:
+        previous = self._corpus
+        self._corpus = corpus
+
+        if previous is None or previous.version != corpus.version:
+            print(f'Loaded peptide corpus version {corpus.version} with {len(corpus.store)} entries')
+
+        try:
+            RedisService.get_instance().client.set(_CORPUS_VERSION_KEY, corpus.version)
+        except Exception as e:
+            print('Error publishing peptide corpus version')
+            print(e)
+
+    def _refresh_loop(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print('Error refreshing peptide corpus')
+                print(e)
+
+            time.sleep(self.refresh_interval)
@@ -0,0 +1,62 @@
+import numpy as np
+from typing import List
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.helpers.bio.matrix import get_score_table
+
+
+# Score ratios are rounded to two decimals (twice for multi query criteria) before being compared to a threshold,
+# so a bound ratio is only used to discard a target when it is below the threshold by more than that rounding.
+BOUND_ROUNDING_MARGIN = 0.01 + 1e-9
+
+
+# Inverted index from every residue in the corpus to the sequence groups that contain it, plus the residue counts per group.
+# Alignments are scored with a substitution matrix and zero gap scores, so an alignment pairs each residue at most once
+# and leaves every other residue unpaired at no cost. This gives two upper bounds on the score of any target:
+#   - every query residue paired with the best scoring residue present in the target (or left unpaired),
+#   - every target residue paired with the best scoring residue present in the query (or left unpaired).
+# Only single residues are indexed, as longer k-mers cannot bound a substitution matrix score without enumerating
+# their whole scoring neighbourhood.
+class ResidueIndex:
+    def __init__(self, store: PeptideStore):
+        # Rows sharing a sequence have the same bounds, so only one row per sequence group is indexed.
+        starts = store.offsets[store.group_representatives]
+        lengths = store.alignment_lengths[store.group_representatives]
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        codes = store.alignment_codes[positions]
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+
+        self.size = len(lengths)
+        self.residues = np.unique(codes)
+
+        columns = np.full(256, -1, dtype=np.int64)
+        columns[self.residues] = np.arange(len(self.residues))
+
+        counts = np.bincount(rows * len(self.residues) + columns[codes], minlength=self.size * len(self.residues))
+        self.counts = counts.reshape(self.size, len(self.residues)).astype(np.float32)
+        self.postings: List[np.ndarray] = [np.flatnonzero(self.counts[:, column]) for column in range(len(self.residues))]
+
+    def get_upper_bounds(self, matrix_name: str, query: str) -> np.ndarray:
+        query_residues, query_counts = np.unique(np.frombuffer(query.encode('ascii', errors='replace'), dtype=np.uint8), return_counts=True)
+        scores = get_score_table(matrix_name)[np.ix_(query_residues, self.residues)]
+
+        # Residues outside of the matrix alphabet cannot be bounded, targets containing them are never discarded.
+        unknown = np.isnan(scores).any(axis=0)
+        scores = np.nan_to_num(scores, nan=0.0)
+
+        query_bound = np.zeros(self.size, dtype=np.float64)
+        for query_residue_scores, count in zip(scores, query_counts):
+            best = np.zeros(self.size, dtype=np.float64)
+
+            for column in np.argsort(query_residue_scores, kind='stable'):
+                if query_residue_scores[column] > 0:
+                    best[self.postings[column]] = query_residue_scores[column]
+
+            query_bound += count * best
+
+        target_bound = self.counts @ np.maximum(scores.max(axis=0), 0).astype(np.float32)
+        bounds = np.minimum(query_bound, target_bound.astype(np.float64))
+
+        if unknown.any():
+            bounds[self.counts[:, unknown].sum(axis=1) > 0] = np.inf
+
+        return bounds
@@ -0,0 +1,49 @@
+import numpy as np
+from threading import Lock
+from collections import OrderedDict
+from typing import Tuple
+
+
+_MemoKey = Tuple[str, str, str]
+
+
+# Raw alignment scores of the sequence groups of a corpus snapshot, one array per (matrix, alg, query) with NaN for
+# the groups that were not scored yet. Only the most recently used queries are kept.
+class SequenceScoreMemo:
+    def __init__(self, size: int, max_queries: int):
+        self.size = size
+        self.max_queries = max_queries
+
+        self._scores: OrderedDict[_MemoKey, np.ndarray] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, matrix: str, alg: str, query: str) -> np.ndarray:
+        key = (matrix, alg, query)
+
+        with self._lock:
+            scores = self._scores.get(key)
+            if scores is None:
+                return np.full(self.size, np.nan, dtype=np.float64)
+
+            self._scores.move_to_end(key)
+            return scores.copy()
+
+    def update(self, matrix: str, alg: str, query: str, groups: np.ndarray, scores: np.ndarray) -> None:
+        if self.max_queries <= 0 or len(groups) == 0:
+            return
+
+        key = (matrix, alg, query)
+
+        with self._lock:
+            memo = self._scores.get(key)
+            if memo is None:
+                memo = self._scores[key] = np.full(self.size, np.nan, dtype=np.float64)
+
+            memo[groups] = scores
+            self._scores.move_to_end(key)
+
+            while len(self._scores) > self.max_queries:
+                self._scores.popitem(last=False)
@@ -21,6 +21,10 @@ class BasePeptide(Neo4jModel):
     def format_id(identifier: int) -> str:
         return f'starPep_{identifier:05d}'
 
+    @staticmethod
+    def parse_id(formatted_id: str) -> int:
+        return int(formatted_id.removeprefix('starPep_'))
+
 
 @dataclass
 class PeptideMetadata(Neo4jModel):
@@ -1,21 +1,44 @@
 from typing import Iterable
 from pkg.shared.entity.peptide.models import SearchPeptide
+from pkg.shared.entity.peptide.store import PeptideStore
 from pkg.shared.services.neo4j.client import GraphDatabaseService
 from pkg.shared.services.neo4j.query import QueryWrapper
 
 
+# Streamed by id, see GraphDatabaseService.stream. Batches are cut on peptides rather than on rows and each peptide
+# keeps a single attributes node, so a peptide is never split across batches and never returned twice.
+_PEPTIDES_QUERY = (
+    'MATCH (n:Peptide) WHERE ID(n) > $after AND (n)-->(:Attributes) WITH n ORDER BY ID(n) ASC LIMIT $limit '
+    'MATCH (n)-->(v:Attributes) WITH n, HEAD(COLLECT(v)) as v '
+    'RETURN ID(n) as id, n.seq as seq, SIZE(n.seq) as length, v as attributes ORDER BY id ASC'
+)
+
+
 def get_all_peptides() -> QueryWrapper[Iterable[SearchPeptide]]:
     db = GraphDatabaseService.get_instance()
-    query = 'MATCH (n:Peptide)-[]->(v:Attributes) RETURN ID(n) as id, n.seq as seq, SIZE(n.seq) as length, v as attributes ORDER BY id ASC'
 
     def mapper(wrapper: QueryWrapper[Iterable[SearchPeptide]]) -> Iterable[SearchPeptide]:
-        try:
-            cur = wrapper.cursor.next()
+        for record in wrapper.cursor:
+            yield SearchPeptide.from_neo4j_properties(record)
+
+    return QueryWrapper(db.stream(_PEPTIDES_QUERY, 'id'), mapper)
+
+
+def get_peptide_store() -> QueryWrapper[PeptideStore]:
+    db = GraphDatabaseService.get_instance()
+
+    def mapper(wrapper: QueryWrapper[PeptideStore]) -> PeptideStore:
+        return PeptideStore.from_neo4j_rows(wrapper.cursor)
+
+    return QueryWrapper(db.stream(_PEPTIDES_QUERY, 'id'), mapper)
+
+
+def get_peptides_marker() -> QueryWrapper[str]:
+    db = GraphDatabaseService.get_instance()
+    query = 'MATCH (n:Peptide) WHERE (n)-->(:Attributes) RETURN COUNT(n) as total, MAX(ID(n)) as last'
 
-            while cur is not None:
-                yield SearchPeptide.from_neo4j_properties(cur)
-                cur = wrapper.cursor.next()
-        except StopIteration:
-            return
+    def mapper(wrapper: QueryWrapper[str]) -> str:
+        row = wrapper.as_data()[0]
+        return f'{row["total"]}-{row["last"]}'
 
-    return QueryWrapper(db.client.query(query), mapper)
+    return QueryWrapper(db.query(query), mapper)
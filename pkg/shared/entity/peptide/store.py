@@ -0,0 +1,192 @@
+import hashlib
+import dataclasses
+import numpy as np
+from typing import Dict, Any, Iterable, List, Tuple, Optional
+from pkg.shared.entity.peptide.models import BasePeptide, SearchPeptide, SearchPeptideAttributes
+from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+
+
+# Maps every SearchPeptideAttributes field to the property name used by the Attributes node in Neo4j.
+SEARCH_ATTRIBUTE_PROPERTIES: Dict[str, str] = {
+    'hydropathicity': 'hydropathicity',
+    'charge': 'charge',
+    'isoelectricPoint': 'isoelectric_point',
+    'bomanIndex': 'boman_index',
+    'gaacAlphatic': 'gaac_alphatic',
+    'gaacAromatic': 'gaac_aromatic',
+    'gaacPositiveCharge': 'gaac_positive_charge',
+    'gaacNegativeCharge': 'gaac_negative_charge',
+    'gaacUncharge': 'gaac_uncharge'
+}
+
+# Maps the FullPeptideAttributes fields that are not search attributes to their Attributes property. They are only
+# kept as columns to query peptides by, values missing from Neo4j are NaN.
+FULL_ATTRIBUTE_PROPERTIES: Dict[str, str] = {
+    'hydrophobicity': 'hydrophobicity',
+    'solvation': 'solvation',
+    'amphiphilicity': 'amphiphilicity',
+    'hydrophilicity': 'hydrophilicity',
+    'hemolyticProbScore': 'hemolytic_prob_score',
+    'stericHindrance': 'steric_hindrance',
+    'netHydrogen': 'net_hydrogen',
+    'molWt': 'mol_wt',
+    'aliphaticIndex': 'aliphatic_index'
+}
+
+_INTEGER_ATTRIBUTES = tuple(f.name for f in dataclasses.fields(SearchPeptideAttributes) if f.type is int)
+
+
+# Sequences are kept concatenated and indexed by offsets, attributes as one array per column.
+# Peptide objects are only materialized for the rows that end up in a result.
+class PeptideStore:
+    def __init__(self, ids: np.ndarray, sequence_data: str, offsets: np.ndarray, lengths: np.ndarray, attributes: Dict[str, np.ndarray], full_attributes: Optional[Dict[str, np.ndarray]] = None):
+        self.ids = ids
+        self.sequence_data = sequence_data
+        self.alignment_sequence_data = replace_ambiguous_amino_acids(sequence_data)
+        self.alignment_codes = np.frombuffer(self.alignment_sequence_data.encode('ascii', errors='replace'), dtype=np.uint8)
+        self.offsets = offsets
+        self.alignment_lengths = np.diff(offsets)
+        self.lengths = lengths
+        self.attributes = attributes
+        self.full_attributes = full_attributes or {}
+        self.id_order = np.argsort(ids, kind='stable')
+
+        # Rows with the same alignment sequence form a group that is scored once, groups are numbered by first row.
+        self.group_ids, self.group_representatives, self.group_offsets, self.group_members = self._group_sequences()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # Rows of the given peptide ids, -1 for the ids that are not part of the store.
+    def get_indices(self, ids: np.ndarray) -> np.ndarray:
+        if len(self) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+
+        positions = np.minimum(np.searchsorted(self.ids, ids, sorter=self.id_order), len(self) - 1)
+        rows = self.id_order[positions]
+
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def get_id(self, index: int) -> str:
+        return BasePeptide.format_id(int(self.ids[index]))
+
+    def get_sequence(self, index: int) -> str:
+        return self.sequence_data[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_alignment_sequence(self, index: int) -> str:
+        return self.alignment_sequence_data[self.offsets[index]:self.offsets[index + 1]]
+
+    # Alignment sequences of the given rows as residue codes, right padded with zeros up to width.
+    def get_alignment_codes(self, indices: np.ndarray, width: int) -> np.ndarray:
+        columns = np.arange(width)
+        positions = self.offsets[indices][:, None] + columns
+        padding = columns >= self.alignment_lengths[indices][:, None]
+        positions[padding] = 0
+
+        codes = self.alignment_codes[positions]
+        codes[padding] = 0
+
+        return codes
+
+    def get_group_count(self) -> int:
+        return len(self.group_representatives)
+
+    def get_group_members(self, group: int) -> np.ndarray:
+        return self.group_members[self.group_offsets[group]:self.group_offsets[group + 1]]
+
+    # Every numeric column of the store by the name of its peptide field.
+    def get_columns(self) -> Dict[str, np.ndarray]:
+        return {'length': self.lengths, **self.attributes, **self.full_attributes}
+
+    def get_attributes(self, index: int) -> SearchPeptideAttributes:
+        values = {name: column[index].item() for name, column in self.attributes.items()}
+
+        for name in _INTEGER_ATTRIBUTES:
+            values[name] = int(values[name])
+
+        return SearchPeptideAttributes(**values)
+
+    def get_peptide(self, index: int) -> SearchPeptide:
+        return SearchPeptide(
+            id=self.get_id(index),
+            sequence=self.get_sequence(index),
+            length=int(self.lengths[index]),
+            attributes=self.get_attributes(index)
+        )
+
+    # Same as get_peptide for many rows at once, gathering every column in a single pass.
+    def get_peptides(self, indices: List[int]) -> List[SearchPeptide]:
+        rows = np.array(indices, dtype=np.int64)
+        ids = self.ids[rows].tolist()
+        starts = self.offsets[rows].tolist()
+        ends = self.offsets[rows + 1].tolist()
+        lengths = self.lengths[rows].tolist()
+        attributes = {name: column[rows].tolist() for name, column in self.attributes.items()}
+
+        for name in _INTEGER_ATTRIBUTES:
+            attributes[name] = [int(value) for value in attributes[name]]
+
+        return [
+            SearchPeptide(
+                id=BasePeptide.format_id(ids[position]),
+                sequence=self.sequence_data[starts[position]:ends[position]],
+                length=lengths[position],
+                attributes=SearchPeptideAttributes(**{name: values[position] for name, values in attributes.items()})
+            )
+            for position in range(len(ids))
+        ]
+
+    def compute_version(self) -> str:
+        digest = hashlib.sha1()
+        digest.update(self.ids.tobytes())
+        digest.update(self.sequence_data.encode('utf-8'))
+        digest.update(self.lengths.tobytes())
+
+        for name in SEARCH_ATTRIBUTE_PROPERTIES:
+            digest.update(self.attributes[name].tobytes())
+
+        return digest.hexdigest()[:16]
+
+    def _group_sequences(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        groups: Dict[str, int] = {}
+        group_ids = np.empty(len(self), dtype=np.int64)
+
+        for index in range(len(self)):
+            group_ids[index] = groups.setdefault(self.get_alignment_sequence(index), len(groups))
+
+        group_members = np.argsort(group_ids, kind='stable')
+        group_offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(group_ids, minlength=len(groups)), out=group_offsets[1:])
+
+        return group_ids, group_members[group_offsets[:-1]], group_offsets, group_members
+
+    @staticmethod
+    def from_neo4j_rows(rows: Iterable[Dict[str, Any]]) -> 'PeptideStore':
+        ids: List[int] = []
+        sequences: List[str] = []
+        lengths: List[int] = []
+        attributes: Dict[str, List[float]] = {name: [] for name in SEARCH_ATTRIBUTE_PROPERTIES}
+        full_attributes: Dict[str, List[Optional[float]]] = {name: [] for name in FULL_ATTRIBUTE_PROPERTIES}
+
+        for row in rows:
+            ids.append(row['id'])
+            sequences.append(row['seq'])
+            lengths.append(row['length'])
+
+            for name, prop in SEARCH_ATTRIBUTE_PROPERTIES.items():
+                attributes[name].append(row['attributes'][prop])
+
+            for name, prop in FULL_ATTRIBUTE_PROPERTIES.items():
+                full_attributes[name].append(row['attributes'].get(prop))
+
+        offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+        np.cumsum([len(sequence) for sequence in sequences], out=offsets[1:])
+
+        return PeptideStore(
+            ids=np.array(ids, dtype=np.int64),
+            sequence_data=''.join(sequences),
+            offsets=offsets,
+            lengths=np.array(lengths, dtype=np.int32),
+            attributes={name: np.array(values, dtype=np.float64) for name, values in attributes.items()},
+            full_attributes={name: np.array(values, dtype=np.float64) for name, values in full_attributes.items()}
+        )
@@ -0,0 +1,122 @@
+import numpy as np
+from threading import Lock
+from typing import Dict, List, Tuple, Optional
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.view import SearchResultQuery, SearchResultFilter, get_filter_mask
+from pkg.shared.utils.peptide_set import PeptideSet
+
+
+# Range of the sorted values that a filter keeps, every operator but != keeps a single range. Sorted values leave
+# out NaN, so peptides without a value are never within a range.
+def _get_range(values: np.ndarray, condition: SearchResultFilter) -> Optional[Tuple[int, int]]:
+    if condition.operator == '!=':
+        return None
+
+    left = int(np.searchsorted(values, condition.value, side='left'))
+    right = int(np.searchsorted(values, condition.value, side='right'))
+
+    return {
+        '>=': (left, len(values)),
+        '>': (right, len(values)),
+        '<=': (0, right),
+        '<': (0, left),
+        '=': (left, right)
+    }[condition.operator]
+
+
+# Columns of the corpus peptides with a sorted index per column, built the first time the column is queried.
+# Only the rows within the narrowest range kept by a filter are read, the other filters are checked on those.
+class AttributeIndex:
+    def __init__(self, store: PeptideStore):
+        self.store = store
+        self.columns = store.get_columns()
+
+        # Rows ordered by value, and their values but NaN, which argsort puts last.
+        self._orders: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = Lock()
+
+    def _validate_field(self, parameter: str, name: str) -> None:
+        if name not in self.columns:
+            raise ValueError(f'{parameter} must be one of: {", ".join(self.columns)}')
+
+    def _get_order(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            order = self._orders.get(name)
+
+        if order is None:
+            values = self.columns[name]
+            rows = np.argsort(values, kind='stable')
+            order = (rows, values[rows[:int(np.count_nonzero(~np.isnan(values)))]])
+
+            with self._lock:
+                self._orders[name] = order
+
+        return order
+
+    def _get_candidates(self, filters: List[SearchResultFilter]) -> Tuple[np.ndarray, List[SearchResultFilter]]:
+        narrowest, narrowest_filter = None, None
+
+        for condition in filters:
+            order, values = self._get_order(condition.field)
+
+            kept = _get_range(values, condition)
+            if kept is not None and (narrowest is None or kept[1] - kept[0] < len(narrowest)):
+                narrowest, narrowest_filter = order[kept[0]:kept[1]], condition
+
+        if narrowest is None:
+            return np.arange(len(self.store)), filters
+
+        return np.sort(narrowest), [condition for condition in filters if condition is not narrowest_filter]
+
+    # Store rows of the peptides matching every filter, by peptide id unless sorted. Ties keep the peptide id order.
+    def select(self, query: SearchResultQuery) -> np.ndarray:
+        if query.sort is not None:
+            self._validate_field('sort', query.sort)
+
+        for condition in query.filters:
+            self._validate_field('filter', condition.field)
+
+        rows, remaining = self._get_candidates(query.filters)
+        for condition in remaining:
+            if len(rows) == 0:
+                break
+
+            rows = rows[get_filter_mask(self.columns[condition.field][rows], condition)]
+
+        if query.sort is not None:
+            values = self.columns[query.sort][rows]
+            rows = rows[np.lexsort((self.store.ids[rows], -values if query.descending else values))]
+
+        return rows
+
+    # Bitmap of the peptides of the given rows, sized to the whole corpus so that any two of them line up.
+    def get_bitmap(self, rows: np.ndarray) -> str:
+        size = int(self.store.ids.max()) + 1 if len(self.store) > 0 else 0
+        return PeptideSet.from_numbers(self.store.ids[rows], size).to_base64()
+
+
+# The index of the current corpus, replaced along with it.
+class AttributeIndexService:
+    instance: 'AttributeIndexService' = None
+    _instance_lock = Lock()
+
+    def __init__(self):
+        self._index: Optional[Tuple[PeptideStore, AttributeIndex]] = None
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'AttributeIndexService':
+        if AttributeIndexService.instance is None:
+            with AttributeIndexService._instance_lock:
+                if AttributeIndexService.instance is None:
+                    AttributeIndexService.instance = AttributeIndexService()
+
+        return AttributeIndexService.instance
+
+    def get_index(self, corpus: PeptideCorpus) -> AttributeIndex:
+        with self._lock:
+            if self._index is None or self._index[0] is not corpus.store:
+                self._index = (corpus.store, AttributeIndex(corpus.store))
+
+            return self._index[1]
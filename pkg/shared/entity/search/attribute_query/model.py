@@ -0,0 +1,8 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+# Filters and sort as served results take them, e.g. {"filters": ["charge>=3", "length<=25"], "sort": "-charge"}.
+class AttributeQueryPayload(BaseModel):
+    filters: List[str] = []
+    sort: Optional[str] = None
@@ -0,0 +1,146 @@
+import numpy as np
+from typing import List, Tuple, Optional, Callable
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.index import BOUND_ROUNDING_MARGIN
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.engine import AlignmentEngine, AlignmentStatistics, ProgressCallback, ProgressReporter
+from pkg.shared.entity.search.scoring import get_blocks, score_targets
+from pkg.shared.entity.search.batch_query.model import BatchAlignmentOptions
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions, SingleAlignedPeptide
+from pkg.shared.helpers.bio.matrix import get_query_max_score
+from pkg.shared.utils.selection import TopSelection
+
+
+# Queries aligned in the same pass over the corpus. Bounds and memoized scores are held for every sequence group and
+# query of a pass, so passes are kept small enough for those to stay a few megabytes.
+_PASS_SIZE = 32
+
+_Scored = Tuple[List[np.ndarray], List[np.ndarray]]
+
+RankingCallback = Callable[[int, List[SingleAlignedPeptide]], None]
+
+
+def _get_floor(selection: TopSelection, floor: Optional[float]) -> Optional[float]:
+    floors = [f for f in (selection.get_floor(), floor) if f is not None]
+    return max(floors) if floors else None
+
+
+# Every peptide of a sequence group shares its score, so each group is pushed once per member.
+def _select_groups(selection: TopSelection, store: PeptideStore, groups: np.ndarray, scores: np.ndarray, max_score: float, options: SingleAlignmentOptions) -> None:
+    for group, score in zip(groups.tolist(), scores.tolist()):
+        score_ratio = round(score / float(max_score), 2)
+
+        if score_ratio >= options.threshold:
+            for index in store.get_group_members(group).tolist():
+                selection.push(score_ratio, index, (index, score_ratio))
+
+
+def _align_shard(store: PeptideStore, payload: Tuple[List[str], List[float], List[SingleAlignmentOptions], List[Optional[float]]], groups: np.ndarray, bounds: np.ndarray, pending: np.ndarray) -> List[_Scored]:
+    queries, max_scores, options, floors = payload
+
+    # Groups are visited once, from the highest bound of any query down, and aligned against every query that can
+    # still rank them. Each query stops aligning once its own selection is full and out of reach.
+    selections = [TopSelection(query_options.max_quantity) for query_options in options]
+    scored: List[_Scored] = [([], []) for _ in queries]
+    for block in get_blocks(np.argsort(-bounds.max(axis=1), kind='stable'), options[0]):
+        for column, (query, max_score, query_options) in enumerate(zip(queries, max_scores, options)):
+            positions = block[pending[block, column]]
+
+            block_floor = _get_floor(selections[column], floors[column])
+            if block_floor is not None:
+                positions = positions[bounds[positions, column] + BOUND_ROUNDING_MARGIN >= block_floor]
+
+            if len(positions) == 0:
+                continue
+
+            block_groups = groups[positions]
+            block_scores = score_targets(store, store.group_representatives[block_groups], query, query_options)
+            _select_groups(selections[column], store, block_groups, block_scores, max_score, query_options)
+
+            scored[column][0].append(block_groups)
+            scored[column][1].append(block_scores)
+
+    return scored
+
+
+def _create_peptides(store: PeptideStore, selection: TopSelection) -> List[SingleAlignedPeptide]:
+    hits = selection.get_sorted()
+    return [
+        SingleAlignedPeptide(**peptide.__dict__, score=score)
+        for peptide, (_, score) in zip(store.get_peptides([index for index, _ in hits]), hits)
+    ]
+
+
+def _align_pass(corpus: PeptideCorpus, queries: List[str], options: List[SingleAlignmentOptions], reporter: ProgressReporter) -> Tuple[List[List[SingleAlignedPeptide]], int, int]:
+    store = corpus.store
+    matrix, alg = options[0].matrix, options[0].alg
+    max_scores = [get_query_max_score(matrix, query) for query in queries]
+    thresholds = np.array([query_options.threshold for query_options in options], dtype=np.float64)
+
+    bounds = np.stack([corpus.index.get_upper_bounds(matrix, query) / max_score for query, max_score in zip(queries, max_scores)], axis=1)
+    memoized_scores = np.stack([corpus.scores.get(matrix, alg, query) for query in queries], axis=1)
+    candidates = bounds + BOUND_ROUNDING_MARGIN >= thresholds
+    memoized = candidates & ~np.isnan(memoized_scores)
+    pending = candidates & np.isnan(memoized_scores)
+
+    # Memoized groups are selected first, so their floor already prunes the groups that still have to be aligned.
+    selections = [TopSelection(query_options.max_quantity) for query_options in options]
+    for column, (max_score, query_options) in enumerate(zip(max_scores, options)):
+        groups = np.flatnonzero(memoized[:, column])
+        _select_groups(selections[column], store, groups, memoized_scores[groups, column], max_score, query_options)
+
+    # Progress is counted in peptides, every peptide no query of the pass has to align is done from the start.
+    visited = np.flatnonzero(pending.any(axis=1))
+    group_sizes = np.diff(store.group_offsets)
+    reporter.advance(len(store) - int(group_sizes[visited].sum()), lambda: [])
+
+    payload = (queries, max_scores, options, [selection.get_floor() for selection in selections])
+    aligned = 0
+    for shard_groups, scored in AlignmentEngine.get_instance().map_shards(corpus, _align_shard, payload, visited, bounds[visited], pending[visited]):
+        for column, (scored_groups, scores) in enumerate(scored):
+            if not scored_groups:
+                continue
+
+            scored_groups, scores = np.concatenate(scored_groups), np.concatenate(scores)
+            corpus.scores.update(matrix, alg, queries[column], scored_groups, scores)
+            _select_groups(selections[column], store, scored_groups, scores, max_scores[column], options[column])
+            aligned += len(scored_groups)
+
+        reporter.advance(int(group_sizes[shard_groups].sum()), lambda: [])
+
+    return [_create_peptides(store, selection) for selection in selections], aligned, int(memoized.sum())
+
+
+# Ranks every query on its own, as align_single_query would, with a single pass over the corpus per _PASS_SIZE
+# queries. Rankings are handed to on_ranking with the position of their query as soon as their pass is done.
+# Statistics describe the corpus, then count the pairs of sequence group and query that were aligned, memoized or
+# pruned.
+def align_batch_query(corpus: PeptideCorpus, queries: List[str], options: BatchAlignmentOptions, on_ranking: RankingCallback, on_progress: Optional[ProgressCallback] = None) -> AlignmentStatistics:
+    queries = [str(query) for query in queries]
+    store = corpus.store
+    passes = range(0, len(queries), _PASS_SIZE)
+
+    reporter = ProgressReporter(on_progress, len(store) * len(passes), config.search_progress_interval)
+    aligned, memoized = 0, 0
+
+    for start in passes:
+        pass_queries = queries[start:start + _PASS_SIZE]
+        pass_options = [options.get_query_options(position) for position in range(start, start + len(pass_queries))]
+
+        pass_peptides, pass_aligned, pass_memoized = _align_pass(corpus, pass_queries, pass_options, reporter)
+        for position, peptides in enumerate(pass_peptides, start):
+            on_ranking(position, peptides)
+
+        aligned += pass_aligned
+        memoized += pass_memoized
+
+    statistics = AlignmentStatistics(
+        total=len(store),
+        unique=store.get_group_count(),
+        aligned=aligned,
+        memoized=memoized,
+        pruned=store.get_group_count() * len(queries) - aligned - memoized
+    )
+
+    return statistics
@@ -0,0 +1,146 @@
+import dataclasses
+from typing import List, Optional, Dict, Any
+from Bio import SeqIO
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.cache import release_search_result
+from pkg.shared.entity.search.engine import AlignmentProgress
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.entity.search.result import PackedSearchResult
+from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.helpers.bio.fasta import parse_fasta_string
+from pkg.shared.entity.search.batch_query.alignment import align_batch_query
+from pkg.shared.entity.search.batch_query.model import BatchAlignmentOptions
+from pkg.shared.entity.search.single_query.model import SingleAlignedPeptide
+from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus, refresh_queue_position, refresh_queue_position_async
+
+
+_TContext = Dict[str, Any]
+_TData = None
+
+
+class BatchQueryAsyncTask(AsyncTask[_TContext, _TData, Exception]):
+    TASK_NAME = 'batch_query'
+
+    def __init__(self, query_records: List[SeqIO.SeqRecord], query: str, options: BatchAlignmentOptions, result_key: Optional[str] = None):
+        super().__init__(BatchQueryAsyncTask.TASK_NAME)
+
+        self.query_records = query_records
+        self.query = query
+        self.options = options
+        self.result_key = result_key
+
+        self.totals: List[Optional[int]] = [None] * len(query_records)
+        self.corpus_version = None
+        self.statistics = None
+        self.progress = None
+
+    @staticmethod
+    def get_status(task_id: str) -> Optional[AsyncTaskStatus]:
+        cache = get_async_task_redis_client()
+        cached = cache.get_task(task_id)
+
+        if cached is None or cached['name'] != BatchQueryAsyncTask.TASK_NAME:
+            return None
+
+        return refresh_queue_position(AsyncTaskStatus(**cached))
+
+    @staticmethod
+    async def get_status_async(task_id: str) -> Optional[AsyncTaskStatus]:
+        cache = get_async_task_redis_client()
+        cached = await cache.get_task_async(task_id)
+
+        if cached is None or cached['name'] != BatchQueryAsyncTask.TASK_NAME:
+            return None
+
+        return await refresh_queue_position_async(AsyncTaskStatus(**cached))
+
+    @staticmethod
+    def update_status(status: AsyncTaskStatus) -> None:
+        cache = get_async_task_redis_client()
+        cache.update_task(status.id, dataclasses.asdict(status))
+
+    # Each query of the batch has its own ranking, stored as the result of a single query search.
+    @staticmethod
+    def get_result(task_id: str, position: int) -> PackedSearchResult:
+        return PackedSearchResult(get_async_task_redis_client(), f'{task_id}:{position}', SingleAlignedPeptide, ('score',))
+
+    @staticmethod
+    def from_job(job: Dict[str, Any]) -> 'BatchQueryAsyncTask':
+        # The query is the FASTA the records were parsed from.
+        query_records = parse_fasta_string(job['query'])
+        task = BatchQueryAsyncTask(query_records, job['query'], BatchAlignmentOptions(**job['options']), job['result_key'])
+        task.task_id = job['id']
+
+        return task
+
+    def to_job(self) -> Dict[str, Any]:
+        return {
+            'id': self.task_id,
+            'query': self.query,
+            'options': dataclasses.asdict(self.options),
+            'result_key': self.result_key
+        }
+
+    def handle_queued(self, position: Optional[int]) -> None:
+        super().handle_queued(position)
+
+        cache = get_async_task_redis_client()
+        cache.create_task(self.task_id, dataclasses.asdict(self.get_init_status()))
+
+    def task(self) -> None:
+        corpus = PeptideCorpusService.get_instance().get_corpus()
+        self.corpus_version = corpus.version
+
+        fixed_queries = [replace_ambiguous_amino_acids(record.seq) for record in self.query_records]
+        self.statistics = align_batch_query(corpus, fixed_queries, self.options, self.handle_ranking, self.handle_progress)
+
+    def handle_ranking(self, position: int, peptides: List[SingleAlignedPeptide]) -> None:
+        BatchQueryAsyncTask.get_result(self.task_id, position).save(peptides)
+        self.totals[position] = len(peptides)
+
+    # Rankings are only served once the whole batch is done, progress is published without provisional data.
+    def handle_progress(self, progress: AlignmentProgress) -> None:
+        self.progress = {'processed': progress.processed, 'total': progress.total}
+
+        status = self.create_status(True, False, self._get_context(), None)
+        BatchQueryAsyncTask.update_status(status)
+
+    def pre_run(self) -> None:
+        cache = get_async_task_redis_client()
+        cache.create_task(self.task_id, dataclasses.asdict(self.get_init_status()))
+
+        print(f'Started batch query alignment task {self.task_id}')
+
+    def post_run(self) -> None:
+        total = self.progress['total'] if self.progress else self.statistics.total
+        self.progress = {'processed': total, 'total': total}
+        status = self.create_status(False, True, self._get_context(), None)
+        BatchQueryAsyncTask.update_status(status)
+
+        print(f'Finished batch query alignment task {self.task_id}')
+
+    def handle_error(self, error: Exception) -> None:
+        status = self.create_status(False, False, self._get_context(), str(error))
+        BatchQueryAsyncTask.update_status(status)
+        release_search_result(self.result_key, self.task_id)
+
+        print(f'Error in batch query alignment task {self.task_id}')
+        print(error)
+
+    def _get_context(self) -> dict:
+        statistics = dataclasses.asdict(self.statistics) if self.statistics else None
+        queries = [
+            {'id': record.id, 'threshold': self.options.thresholds[position], 'max_quantity': self.options.max_quantities[position], 'total': self.totals[position]}
+            for position, record in enumerate(self.query_records)
+        ]
+
+        return {
+            'query': self.query,
+            'alg': self.options.alg,
+            'matrix': self.options.matrix,
+            'engine': self.options.engine,
+            'queries': queries,
+            'corpus_version': self.corpus_version,
+            'progress': self.progress,
+            'statistics': statistics
+        }
@@ -0,0 +1,43 @@
+import re
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+from Bio import SeqIO
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+
+
+# Query records may override the threshold and max_quantity of the batch in their FASTA header, such as:
+# >query_1 threshold=0.5 max_quantity=10
+_QUERY_OPTION_PATTERN = re.compile(r'\b(threshold|max_quantity)=(\S+)')
+
+
+@dataclass
+class BatchAlignmentOptions(SingleAlignmentOptions):
+    thresholds: List[float]
+    max_quantities: List[Optional[int]]
+
+    # Every query is ranked on its own, as a single query search with these options.
+    def get_query_options(self, position: int) -> SingleAlignmentOptions:
+        return SingleAlignmentOptions(self.alg, self.matrix, self.thresholds[position], self.max_quantities[position], self.engine)
+
+    def get_query_count(self) -> int:
+        return len(self.thresholds)
+
+    @staticmethod
+    def create_from_params(params: Dict[str, Any], query_records: List[SeqIO.SeqRecord]) -> 'BatchAlignmentOptions':
+        batch_options = SingleAlignmentOptions.create_from_params(params)
+        query_options = []
+
+        for record in query_records:
+            overrides = dict(_QUERY_OPTION_PATTERN.findall(record.description))
+
+            try:
+                query_options.append(SingleAlignmentOptions.create_from_params({**params, **overrides}) if overrides else batch_options)
+            except ValueError as e:
+                raise ValueError(f'Query {record.id}: {e}')
+
+        return BatchAlignmentOptions(
+            **dataclasses.asdict(batch_options),
+            thresholds=[options.threshold for options in query_options],
+            max_quantities=[options.max_quantity for options in query_options]
+        )
@@ -0,0 +1,81 @@
+import json
+import hashlib
+import dataclasses
+from typing import List, Any, Optional
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus
+
+
+# Options that change how a search is computed but never its result.
+_RESULT_INDEPENDENT_OPTIONS = ('engine',)
+
+# Seconds a pointer is trusted before its task stored a status. Past them the task expired or its job was lost.
+_PENDING_POINTER_GRACE_PERIOD = 10
+
+
+def get_search_result_key(task_name: str, queries: List[str], options: Any, corpus_version: str) -> str:
+    result_options = {name: value for name, value in dataclasses.asdict(options).items() if name not in _RESULT_INDEPENDENT_OPTIONS}
+    content = json.dumps({'name': task_name, 'queries': queries, 'options': result_options, 'corpus_version': corpus_version}, sort_keys=True)
+
+    return f'result:{hashlib.sha256(content.encode("utf-8")).hexdigest()}'
+
+
+# Points the result key to a task, reusing the task already pointed to unless it failed or stored no status within
+# the grace period. Identical searches started while that task is still running share it. The pointer expires with
+# the task, so a finished result is reused until its own expiration.
+async def start_cached_search_task_async(task: AsyncTask, result_key: Optional[str]) -> AsyncTaskStatus:
+    # Without a known corpus version there is nothing to key the result on.
+    if result_key is None:
+        await task.start_async()
+        return task.get_init_status()
+
+    cache = get_async_task_redis_client()
+    key = cache.resolve_key(result_key)
+
+    if not await cache.redis.async_client.set(key, task.task_id, nx=True, ex=cache.ttl):
+        cached_task_id = await cache.redis.async_client.get(key)
+
+        if cached_task_id is not None:
+            cached_task_id = cached_task_id.decode('utf-8')
+            cached = await cache.get_task_async(cached_task_id)
+
+            # The pointer is set right before its task is submitted, which then stores its own status.
+            if cached is None:
+                if await cache.redis.async_client.ttl(key) > cache.ttl - _PENDING_POINTER_GRACE_PERIOD:
+                    return AsyncTaskStatus(cached_task_id, task.name, True, False, None, None)
+            elif cached['loading'] or cached['success']:
+                return AsyncTaskStatus(**{**cached, 'data': None})
+
+        await cache.redis.async_client.set(key, task.task_id, ex=cache.ttl)
+
+    try:
+        await task.start_async()
+    except Exception:
+        await release_search_result_async(result_key, task.task_id)
+        raise
+
+    return task.get_init_status()
+
+
+def release_search_result(result_key: Optional[str], task_id: str) -> None:
+    if result_key is None:
+        return
+
+    cache = get_async_task_redis_client()
+    key = cache.resolve_key(result_key)
+
+    cached_task_id = cache.redis.client.get(key)
+    if cached_task_id is not None and cached_task_id.decode('utf-8') == task_id:
+        cache.redis.client.delete(key)
+
+
+async def release_search_result_async(result_key: Optional[str], task_id: str) -> None:
+    if result_key is None:
+        return
+
+    cache = get_async_task_redis_client()
+    key = cache.resolve_key(result_key)
+
+    cached_task_id = await cache.redis.async_client.get(key)
+    if cached_task_id is not None and cached_task_id.decode('utf-8') == task_id:
+        await cache.redis.async_client.delete(key)
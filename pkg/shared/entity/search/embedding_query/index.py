@@ -0,0 +1,173 @@
+import time
+import numpy as np
+from threading import Lock, Thread
+from typing import Dict, List, Tuple, Optional
+from pkg.config import config
+from pkg.shared.entity.export.embeddings import EmbeddingMatrix, EmbeddingMatrixService
+from pkg.shared.entity.export.utils import get_resource_assets
+from pkg.shared.entity.peptide.corpus import PeptideCorpus, PeptideCorpusService
+from pkg.shared.entity.peptide.store import PeptideStore
+
+
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLES_PER_LIST = 64
+
+# Vectors compared against the centroids at a time while assigning them to their list.
+_ASSIGNMENT_CHUNK_SIZE = 8192
+
+
+def _get_norms(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+
+    return norms
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / _get_norms(vectors)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[start:start + _ASSIGNMENT_CHUNK_SIZE] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), _ASSIGNMENT_CHUNK_SIZE)
+    ])
+
+
+# Spherical k-means over a sample of the vectors, every vector then goes to the list of its closest centroid.
+# Lists are kept as the vector rows ordered by list, with the offsets where each list starts.
+def _build_lists(vectors: np.ndarray, lists: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    random = np.random.default_rng(0)
+    sample = vectors[np.sort(random.choice(len(vectors), min(len(vectors), lists * _KMEANS_SAMPLES_PER_LIST), replace=False))]
+    centroids = sample[random.choice(len(sample), lists, replace=False)]
+
+    for _ in range(_KMEANS_ITERATIONS):
+        assignments = _assign(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        assigned, starts = np.unique(assignments[order], return_index=True)
+
+        # Lists left without vectors keep their centroid.
+        centroids = centroids.copy()
+        centroids[assigned] = normalize(np.add.reduceat(sample[order], starts, axis=0))
+
+    assignments = _assign(vectors, centroids)
+    members = np.argsort(assignments, kind='stable')
+    offsets = np.searchsorted(assignments[members], np.arange(lists + 1))
+
+    return centroids, offsets, members
+
+
+# Best count positions by similarity, ties broken by position.
+def _get_top(similarities: np.ndarray, count: int) -> np.ndarray:
+    positions = np.arange(len(similarities))
+    if count < len(similarities):
+        positions = np.argpartition(-similarities, count - 1)[:count]
+
+    return positions[np.lexsort((positions, -similarities[positions]))]
+
+
+# Unit length embeddings of the corpus peptides, one row per peptide the matrix holds, so cosine similarities are
+# plain dot products. Searches are exact by default, comparing the query with every row in a single matrix product.
+# With lists, rows are also grouped around centroids and approximate searches only compare the rows of the probed
+# lists closest to the query.
+class EmbeddingIndex:
+    def __init__(self, matrix: EmbeddingMatrix, store: PeptideStore, lists: int):
+        store_indices = store.get_indices(matrix.numbers)
+        rows = np.flatnonzero(store_indices >= 0)
+
+        self.columns = matrix.columns
+        self.indices = store_indices[rows]
+        # Rows are copied out of the mapped matrix once and normalized in place.
+        self.vectors = np.asarray(matrix.matrix[rows], dtype=np.float32)
+        self.vectors /= _get_norms(self.vectors)
+
+        self.rows = np.full(len(store), -1, dtype=np.int64)
+        self.rows[self.indices] = np.arange(len(self.indices))
+
+        self.centroids, self.list_offsets, self.list_members = None, None, None
+        if 0 < lists < len(self.vectors):
+            self.centroids, self.list_offsets, self.list_members = _build_lists(self.vectors, lists)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def has_lists(self) -> bool:
+        return self.centroids is not None
+
+    # Unit length embedding of a corpus peptide by its store index, None when the matrix does not hold it.
+    def get_vector(self, index: int) -> Optional[np.ndarray]:
+        row = int(self.rows[index]) if 0 <= index < len(self.rows) else -1
+        return self.vectors[row] if row >= 0 else None
+
+    # Store indices of the count peptides most similar to the unit length query, their similarity, and the number
+    # of rows that were compared. Searches are approximate when probes is set and the index has lists.
+    def search(self, query: np.ndarray, count: int, probes: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        query = query.astype(np.float32)
+
+        if probes is not None and self.has_lists():
+            probed = np.argsort(-(self.centroids @ query), kind='stable')[:probes]
+            candidates = np.concatenate([self.list_members[self.list_offsets[probe]:self.list_offsets[probe + 1]] for probe in probed])
+            similarities = self.vectors[candidates] @ query
+        else:
+            candidates = None
+            similarities = self.vectors @ query
+
+        top = _get_top(similarities, count)
+        rows = top if candidates is None else candidates[top]
+
+        return self.indices[rows], similarities[top], len(similarities)
+
+
+# Indexes are built once per embedding and corpus version, then again after the matrix or the corpus changed.
+class EmbeddingIndexService:
+    instance: 'EmbeddingIndexService' = None
+    _instance_lock = Lock()
+
+    def __init__(self, lists: int):
+        self.lists = lists
+
+        self._indexes: Dict[str, Tuple[EmbeddingMatrix, str, EmbeddingIndex]] = {}
+        self._lock = Lock()
+        self._preload_thread: Optional[Thread] = None
+
+    @staticmethod
+    def get_instance() -> 'EmbeddingIndexService':
+        if EmbeddingIndexService.instance is None:
+            with EmbeddingIndexService._instance_lock:
+                if EmbeddingIndexService.instance is None:
+                    EmbeddingIndexService.instance = EmbeddingIndexService(config.embedding_index_lists)
+
+        return EmbeddingIndexService.instance
+
+    # None when the embeddings of the resource were not packed into a matrix, see pack_assets.py.
+    def get_index(self, embedding: str, corpus: PeptideCorpus) -> Optional[EmbeddingIndex]:
+        matrix = EmbeddingMatrixService.get_instance().get_matrix(get_resource_assets(embedding).directory)
+        if matrix is None:
+            return None
+
+        with self._lock:
+            cached = self._indexes.get(embedding)
+            if cached is None or cached[0] is not matrix or cached[1] != corpus.version:
+                start = time.perf_counter()
+                cached = self._indexes[embedding] = (matrix, corpus.version, EmbeddingIndex(matrix, corpus.store, self.lists))
+
+                print(f'Built {embedding} embedding index of {len(cached[2])} peptides in {time.perf_counter() - start:.2f}s')
+
+            return cached[2]
+
+    # Builds the indexes of the given embeddings in the background, so the first searches do not wait for them.
+    def start_preload(self, embeddings: List[str]) -> None:
+        if self._preload_thread is not None or not embeddings:
+            return
+
+        self._preload_thread = Thread(target=self._preload, args=(embeddings,), name='embedding_index_preload', daemon=True)
+        self._preload_thread.start()
+
+    def _preload(self, embeddings: List[str]) -> None:
+        for embedding in embeddings:
+            try:
+                if self.get_index(embedding, PeptideCorpusService.get_instance().get_corpus()) is None:
+                    print(f'Skipped preloading {embedding} embedding index, its embeddings were not packed')
+            except Exception as e:
+                print(f'Error preloading {embedding} embedding index')
+                print(e)
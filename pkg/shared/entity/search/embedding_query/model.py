@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from pkg.shared.entity.peptide.models import SearchPeptide
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+
+
+SUPPORTED_EMBEDDINGS = ('esmMean', 'iFeatureAac', 'iFeatureDpc')
+
+DEFAULT_EMBEDDING = 'esmMean'
+DEFAULT_EMBEDDING_MAX_QUANTITY = 50
+MAX_EMBEDDING_MAX_QUANTITY = 1000
+
+
+@dataclass
+class EmbeddingAlignedPeptide(SearchPeptide):
+    similarity: float
+    score: Optional[float]
+
+
+@dataclass
+class EmbeddingSearchOptions:
+    embedding: str
+    max_quantity: int
+    min_similarity: Optional[float]
+    exact: bool
+    rescore: bool
+    alignment: SingleAlignmentOptions
+
+    @staticmethod
+    def _validate_embedding(embedding: str) -> None:
+        if embedding not in SUPPORTED_EMBEDDINGS:
+            raise ValueError(f'embedding must be one of: {", ".join(SUPPORTED_EMBEDDINGS)}')
+
+    @staticmethod
+    def _validate_max_quantity(max_quantity: int) -> None:
+        if not 0 < max_quantity <= MAX_EMBEDDING_MAX_QUANTITY:
+            raise ValueError(f'max_quantity must be between 1 and {MAX_EMBEDDING_MAX_QUANTITY}.')
+
+    @staticmethod
+    def _validate_min_similarity(min_similarity: Optional[float]) -> None:
+        if min_similarity is not None and not -1.0 <= min_similarity <= 1.0:
+            raise ValueError('min_similarity must be between -1 and 1.')
+
+    @staticmethod
+    def _parse_bool(params: Dict[str, Any], name: str) -> bool:
+        value = params.get(name, 'false').lower()
+        if value not in ('true', 'false'):
+            raise ValueError(f'{name} must be true or false.')
+
+        return value == 'true'
+
+    # alg, matrix and engine only apply to the alignment of the candidates when rescore is true.
+    @staticmethod
+    def create_from_params(params: Dict[str, Any]) -> 'EmbeddingSearchOptions':
+        embedding = params.get('embedding') or DEFAULT_EMBEDDING
+        max_quantity = params.get('max_quantity')
+        max_quantity = int(max_quantity) if max_quantity else DEFAULT_EMBEDDING_MAX_QUANTITY
+        min_similarity = params.get('min_similarity')
+        min_similarity = float(min_similarity) if min_similarity else None
+        exact = EmbeddingSearchOptions._parse_bool(params, 'exact')
+        rescore = EmbeddingSearchOptions._parse_bool(params, 'rescore')
+        alignment = SingleAlignmentOptions.create_from_params({name: params[name] for name in ('alg', 'matrix', 'engine') if name in params})
+
+        EmbeddingSearchOptions._validate_embedding(embedding)
+        EmbeddingSearchOptions._validate_max_quantity(max_quantity)
+        EmbeddingSearchOptions._validate_min_similarity(min_similarity)
+
+        return EmbeddingSearchOptions(embedding, max_quantity, min_similarity, exact, rescore, alignment)
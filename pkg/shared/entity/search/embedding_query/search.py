@@ -0,0 +1,103 @@
+import re
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Tuple, Optional
+from Bio import SeqIO
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.models import BasePeptide
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.scoring import score_targets
+from pkg.shared.entity.search.embedding_query.index import EmbeddingIndex, normalize
+from pkg.shared.entity.search.embedding_query.model import EmbeddingSearchOptions, EmbeddingAlignedPeptide
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.helpers.bio.composition import get_composition
+from pkg.shared.helpers.bio.matrix import get_query_max_score
+
+
+_PEPTIDE_ID_PATTERN = re.compile(r'^starPep_\d+$')
+
+# Candidates taken from the embeddings per peptide of the ranking when they are rescored by alignment.
+_RESCORE_CANDIDATES_FACTOR = 4
+
+
+@dataclass
+class EmbeddingSearchResult:
+    peptides: List[EmbeddingAlignedPeptide]
+    exact: bool
+    compared: int
+    candidates: int
+
+
+def _get_store_index(store: PeptideStore, record: SeqIO.SeqRecord) -> int:
+    if not _PEPTIDE_ID_PATTERN.match(record.id):
+        return -1
+
+    return int(store.get_indices(np.array([BasePeptide.parse_id(record.id)], dtype=np.int64))[0])
+
+
+# Queries named after a corpus peptide use its embedding, others are embedded from their sequence, which is only
+# possible for composition embeddings. Peptides similar to all of the queries are the ones closest to their mean.
+def _get_query_vector(index: EmbeddingIndex, store: PeptideStore, records: List[SeqIO.SeqRecord], options: EmbeddingSearchOptions) -> Tuple[np.ndarray, np.ndarray]:
+    vectors, query_indices = [], []
+
+    for record in records:
+        store_index = _get_store_index(store, record)
+        vector = index.get_vector(store_index)
+
+        if vector is not None:
+            query_indices.append(store_index)
+        else:
+            vector = get_composition(str(record.seq), index.columns)
+            if vector is None:
+                raise ValueError(f'Query {record.id} is not a corpus peptide with {options.embedding} embeddings, which cannot be computed from a sequence.')
+
+        vectors.append(normalize(vector))
+
+    return normalize(np.mean(vectors, axis=0)), np.array(query_indices, dtype=np.int64)
+
+
+# Alignment score ratios of the candidates averaged over the queries, rounded as the ones of a multi query search.
+# Candidates sharing a sequence are aligned once.
+def _rescore(store: PeptideStore, indices: np.ndarray, records: List[SeqIO.SeqRecord], options: SingleAlignmentOptions) -> np.ndarray:
+    groups, inverse = np.unique(store.group_ids[indices], return_inverse=True)
+    ratios = np.zeros(len(groups), dtype=np.float64)
+
+    for record in records:
+        query = replace_ambiguous_amino_acids(str(record.seq))
+        ratios += np.round(score_targets(store, store.group_representatives[groups], query, options) / get_query_max_score(options.matrix, query), 2)
+
+    return np.round(ratios / len(records), 2)[inverse]
+
+
+# Ranks the corpus peptides by cosine similarity to the queries, leaving out the corpus peptides used as queries.
+# With rescore, the best candidates by similarity are aligned against the queries and ranked by alignment score.
+def search_embeddings(corpus: PeptideCorpus, index: EmbeddingIndex, records: List[SeqIO.SeqRecord], options: EmbeddingSearchOptions) -> EmbeddingSearchResult:
+    store = corpus.store
+    query, query_indices = _get_query_vector(index, store, records, options)
+
+    count = options.max_quantity * _RESCORE_CANDIDATES_FACTOR if options.rescore else options.max_quantity
+    exact = options.exact or not index.has_lists()
+    probes: Optional[int] = None if exact else config.embedding_index_probes
+    indices, similarities, compared = index.search(query, min(count + len(query_indices), len(index)), probes)
+
+    kept = ~np.isin(indices, query_indices)
+    if options.min_similarity is not None:
+        kept &= similarities >= options.min_similarity
+
+    indices, similarities = indices[kept][:count], similarities[kept][:count]
+    candidates = len(indices)
+
+    scores = None
+    if options.rescore and candidates > 0:
+        scores = _rescore(store, indices, records, options.alignment)
+        order = np.lexsort((np.arange(candidates), -scores))[:options.max_quantity]
+        indices, similarities, scores = indices[order], similarities[order], scores[order]
+
+    peptides = [
+        EmbeddingAlignedPeptide(**peptide.__dict__, similarity=round(float(similarity), 4), score=float(scores[position]) if scores is not None else None)
+        for position, (peptide, similarity) in enumerate(zip(store.get_peptides(indices.tolist()), similarities.tolist()))
+    ]
+
+    return EmbeddingSearchResult(peptides, exact, compared, candidates)
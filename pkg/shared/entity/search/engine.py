@@ -0,0 +1,142 @@
+import time
+import multiprocessing
+import numpy as np
+from threading import Lock
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, TypeVar, List, Tuple, Optional, Iterator, Generic
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.helpers.bio.matrix import preload_alignment_tables
+
+
+_TPayload = TypeVar('_TPayload')
+_TShardResult = TypeVar('_TShardResult')
+_THit = TypeVar('_THit')
+
+ShardFunction = Callable[..., _TShardResult]
+
+
+# Peptides in the corpus, then sequence groups in it that were aligned, taken from the score memo, or skipped.
+@dataclass
+class AlignmentStatistics:
+    total: int
+    unique: int
+    aligned: int
+    memoized: int
+    pruned: int
+
+
+@dataclass
+class AlignmentProgress(Generic[_THit]):
+    processed: int
+    total: int
+    hits: List[_THit]
+
+
+ProgressCallback = Callable[[AlignmentProgress], None]
+
+
+# Hands the progress of an alignment to a callback at most once per interval, building the provisional hits only then.
+class ProgressReporter:
+    def __init__(self, callback: Optional[ProgressCallback], total: int, interval: float):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.processed = 0
+
+        self._last_report = time.monotonic()
+
+    def advance(self, processed: int, get_hits: Callable[[], List]) -> None:
+        self.processed += processed
+
+        now = time.monotonic()
+        if self.callback is None or self.processed >= self.total or now - self._last_report < self.interval:
+            return
+
+        self._last_report = now
+        self.callback(AlignmentProgress(self.processed, self.total, get_hits()))
+
+
+# Set once per worker process by the pool initializer, so the corpus is only transferred when a pool is created.
+_worker_store: Optional[PeptideStore] = None
+
+
+def _initialize_worker(store: PeptideStore) -> None:
+    global _worker_store
+    _worker_store = store
+
+    preload_alignment_tables()
+
+
+def _run_shard(shard_fn: ShardFunction, payload: _TPayload, *shard: np.ndarray) -> _TShardResult:
+    return shard_fn(_worker_store, payload, *shard)
+
+
+class AlignmentEngine:
+    instance: 'AlignmentEngine' = None
+    _instance_lock = Lock()
+
+    def __init__(self, workers: int, chunk_size: int):
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_corpus: Optional[PeptideCorpus] = None
+        self._pool_lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'AlignmentEngine':
+        if AlignmentEngine.instance is None:
+            with AlignmentEngine._instance_lock:
+                if AlignmentEngine.instance is None:
+                    AlignmentEngine.instance = AlignmentEngine(config.alignment_workers, config.alignment_chunk_size)
+
+        return AlignmentEngine.instance
+
+    def get_shard_ranges(self, total: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.chunk_size, total)) for start in range(0, total, self.chunk_size)]
+
+    # Splits the corpus indices, and any column aligned with them, into chunks that are each handed to shard_fn.
+    # Results are yielded with the indices of their shard, in the order the shards complete.
+    def map_shards(self, corpus: PeptideCorpus, shard_fn: ShardFunction, payload: _TPayload, indices: np.ndarray, *columns: np.ndarray) -> Iterator[Tuple[np.ndarray, _TShardResult]]:
+        shards = [[indices[start:end], *[column[start:end] for column in columns]] for start, end in self.get_shard_ranges(len(indices))]
+        pool = self._get_pool(corpus)
+
+        if pool is None:
+            for shard in shards:
+                yield shard[0], shard_fn(corpus.store, payload, *shard)
+
+            return
+
+        futures = {pool.submit(_run_shard, shard_fn, payload, *shard): shard[0] for shard in shards}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def _get_pool(self, corpus: PeptideCorpus) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            return None
+
+        with self._pool_lock:
+            if self._pool_corpus is not None and self._pool_corpus.version == corpus.version:
+                return self._pool
+
+            # A task that still holds a corpus older than the one loaded in the workers is aligned in-process instead,
+            # rather than tearing down the pool for a snapshot that is about to be discarded.
+            if self._pool_corpus is not None and self._pool_corpus.loaded_at > corpus.loaded_at:
+                return None
+
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_initialize_worker,
+                initargs=(corpus.store,)
+            )
+            self._pool_corpus = corpus
+
+            print(f'Started alignment engine with {self.workers} workers for corpus version {corpus.version}')
+            return self._pool
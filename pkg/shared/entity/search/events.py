@@ -0,0 +1,59 @@
+from typing import Callable, Optional, Tuple, AsyncIterator, Awaitable
+from fastapi.concurrency import run_in_threadpool
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.entity.search.result import PackedSearchResult
+from pkg.shared.entity.search.utils import get_paginated_task_data, has_paginated_task_data
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import ResourceNotFoundException, BadRequestException
+from pkg.shared.helpers.http.events import format_event, KEEPALIVE_EVENT
+from pkg.shared.helpers.http.response import ResponseBuilder
+from pkg.shared.utils.async_task import AsyncTaskStatus
+
+
+_KEEPALIVE_INTERVAL = 15
+
+
+# Same payload as the GET endpoint of the task, and whether the task is done so the stream can end.
+async def _get_event(get_status: Callable[[str], Awaitable[Optional[AsyncTaskStatus]]], get_result: Callable[[str], PackedSearchResult], task_id: str, page_param: Optional[str]) -> Tuple[object, bool]:
+    cached_task_status = await get_status(task_id)
+    if cached_task_status is None:
+        error = ResourceNotFoundException(f'Search task {task_id} does not exist anymore.', ErrorCode.NOT_FOUND)
+        return ResponseBuilder().with_error(error).build(), True
+
+    if not has_paginated_task_data(cached_task_status):
+        return ResponseBuilder().with_data(cached_task_status).build(), not cached_task_status.loading
+
+    try:
+        data = await run_in_threadpool(get_paginated_task_data, cached_task_status, page_param, get_result(task_id))
+    except Exception as e:
+        error = BadRequestException(str(e), ErrorCode.INVALID_QUERY_PROVIDED)
+        return ResponseBuilder().with_error(error).build(), True
+
+    return ResponseBuilder().with_data(data).build(), not cached_task_status.loading
+
+
+# Sends the status of a search task every time it is written, until the task is done.
+async def stream_search_task_events(get_status: Callable[[str], Awaitable[Optional[AsyncTaskStatus]]], get_result: Callable[[str], PackedSearchResult], task_id: str, page_param: Optional[str]) -> AsyncIterator[str]:
+    cache = get_async_task_redis_client()
+    pubsub = cache.redis.async_client.pubsub()
+    await pubsub.subscribe(cache.resolve_events_channel(task_id))
+
+    try:
+        event, finished = await _get_event(get_status, get_result, task_id, page_param)
+        yield format_event(event)
+
+        while not finished:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=_KEEPALIVE_INTERVAL)
+            if message is None:
+                yield KEEPALIVE_EVENT
+                continue
+
+            # Writes made while the last event was sent are all covered by reading the status once.
+            while await pubsub.get_message(ignore_subscribe_messages=True) is not None:
+                pass
+
+            event, finished = await _get_event(get_status, get_result, task_id, page_param)
+            yield format_event(event)
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
@@ -1,55 +1,203 @@
-from typing import Iterable, List
+import numpy as np
+from typing import List, Tuple, Optional
 from statistics import mean
-from Bio.Align import substitution_matrices, PairwiseAligner
-from pkg.shared.entity.peptide.models import SearchPeptide
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.index import BOUND_ROUNDING_MARGIN
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.engine import AlignmentEngine, AlignmentStatistics, ProgressCallback, ProgressReporter
+from pkg.shared.entity.search.scoring import get_blocks, score_targets
 from pkg.shared.entity.search.multi_query.model import MultiAlignmentOptions, MultiAlignedPeptide
-from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.helpers.bio.matrix import get_query_max_score
+from pkg.shared.utils.selection import TopSelection
 
 
-def align_multi_query(database: Iterable[SearchPeptide], queries: List[str], options: MultiAlignmentOptions) -> List[MultiAlignedPeptide]:
-    aligner = PairwiseAligner()
-    aligner.substitution_matrix = substitution_matrices.load(options.matrix)
-    aligner.mode = options.alg
+# Real, average, maximum and minimum score of a target, the sequence group and the peptide holding them, and raw
+# scores per query.
+_Scores = Tuple[float, float, float, float]
+_GroupHit = Tuple[int, _Scores]
+_Hit = Tuple[int, float, float, float, float]
+_Scored = Tuple[List[np.ndarray], List[np.ndarray]]
 
-    result = []
-    for target in database:
-        scores_for_target = []
 
-        for query in queries:
-            max_score = sum([max(aligner.substitution_matrix[a]) for a in query])
-            score = aligner.score(replace_ambiguous_amino_acids(target.sequence), query)
-            score_ratio = round(score / float(max_score), 2)
+def _can_qualify(scores_for_target: List[float], total_queries: int, options: MultiAlignmentOptions, floor: Optional[float]) -> bool:
+    # Score ratios never exceed 1, so the best criterion score a partially aligned target can still reach is known.
+    if options.criterion == 'min':
+        best_score = round(min(scores_for_target), 2)
+    elif options.criterion == 'avg':
+        best_score = round(mean(scores_for_target + [1.0] * (total_queries - len(scores_for_target))), 2)
+    else:
+        return True
 
-            scores_for_target.append(score_ratio)
+    return best_score >= options.threshold and (floor is None or best_score >= floor)
 
-        score_avg = round(mean(scores_for_target), 2)
-        score_max = round(max(scores_for_target), 2)
-        score_min = round(min(scores_for_target), 2)
 
-        if options.criterion == 'avg':
-            real_score = score_avg
+def _get_criterion_bounds(corpus: PeptideCorpus, queries: List[str], max_scores: List[float], options: MultiAlignmentOptions) -> np.ndarray:
+    if options.criterion not in ('avg', 'max', 'min'):
+        return np.zeros(corpus.store.get_group_count(), dtype=np.float64)
+
+    bounds = None
+    for query, max_score in zip(queries, max_scores):
+        query_bounds = corpus.index.get_upper_bounds(options.matrix, query) / max_score
+
+        if bounds is None:
+            bounds = query_bounds
+        elif options.criterion == 'avg':
+            bounds += query_bounds
         elif options.criterion == 'max':
-            real_score = score_max
-        elif options.criterion == 'min':
-            real_score = score_min
+            np.maximum(bounds, query_bounds, out=bounds)
         else:
-            real_score = 0
-
-        if real_score >= options.threshold:
-            result.append(MultiAlignedPeptide(
-                id=target.id,
-                sequence=target.sequence,
-                length=target.length,
-                attributes=target.attributes,
-                score=real_score,
-                avg_score=score_avg,
-                max_score=score_max,
-                min_score=score_min
-            ))
-
-    result.sort(key=lambda n: -n.score)
-
-    if options.max_quantity:
-        result = result[0:options.max_quantity]
-
-    return result
+            np.minimum(bounds, query_bounds, out=bounds)
+
+    if options.criterion == 'avg':
+        bounds /= len(queries)
+
+    return bounds
+
+
+def _get_floor(selection: TopSelection, floor: Optional[float]) -> Optional[float]:
+    floors = [f for f in (selection.get_floor(), floor) if f is not None]
+    return max(floors) if floors else None
+
+
+def _evaluate(scores_for_target: List[float], options: MultiAlignmentOptions) -> Optional[_Scores]:
+    score_avg = round(mean(scores_for_target), 2)
+    score_max = round(max(scores_for_target), 2)
+    score_min = round(min(scores_for_target), 2)
+
+    if options.criterion == 'avg':
+        real_score = score_avg
+    elif options.criterion == 'max':
+        real_score = score_max
+    elif options.criterion == 'min':
+        real_score = score_min
+    else:
+        real_score = 0
+
+    if real_score < options.threshold:
+        return None
+
+    return real_score, score_avg, score_max, score_min
+
+
+# Every peptide of a sequence group shares its scores, so each group is pushed once per member.
+def _select_group(selection: TopSelection, store: PeptideStore, group: int, scores: _Scores) -> None:
+    for index in store.get_group_members(group).tolist():
+        selection.push(scores[0], index, (index, *scores))
+
+
+def _align_shard(store: PeptideStore, payload: Tuple[List[str], List[float], MultiAlignmentOptions, Optional[float]], groups: np.ndarray, bounds: np.ndarray, memoized_scores: np.ndarray) -> Tuple[List[_GroupHit], List[_Scored], int]:
+    queries, max_scores, options, floor = payload
+
+    # Groups are visited from the highest bound down, so once the selection is full the rest can be skipped.
+    selection = TopSelection(options.max_quantity)
+    hits: List[_GroupHit] = []
+    scored: List[_Scored] = [([], []) for _ in queries]
+    aligned = 0
+    for block in get_blocks(np.argsort(-bounds, kind='stable'), options):
+        block_floor = _get_floor(selection, floor)
+        if block_floor is not None and bounds[block[0]] + BOUND_ROUNDING_MARGIN < block_floor:
+            break
+
+        candidates = {position: [] for position in block.tolist()}
+        aligned_positions = set()
+
+        for column, (query, max_score) in enumerate(zip(queries, max_scores)):
+            positions = np.array(list(candidates.keys()), dtype=np.int64)
+            scores = memoized_scores[positions, column]
+
+            missing = np.isnan(scores)
+            if missing.any():
+                missing_groups = groups[positions[missing]]
+                scores[missing] = score_targets(store, store.group_representatives[missing_groups], query, options)
+
+                scored[column][0].append(missing_groups)
+                scored[column][1].append(scores[missing])
+                aligned_positions.update(positions[missing].tolist())
+
+            for position, score in zip(positions.tolist(), scores.tolist()):
+                scores_for_target = candidates[position]
+                scores_for_target.append(round(score / float(max_score), 2))
+
+                if not _can_qualify(scores_for_target, len(queries), options, block_floor):
+                    del candidates[position]
+
+            if not candidates:
+                break
+
+        aligned += len(aligned_positions)
+
+        for position, scores_for_target in candidates.items():
+            group_scores = _evaluate(scores_for_target, options)
+
+            if group_scores is not None:
+                group = int(groups[position])
+                hits.append((group, group_scores))
+                _select_group(selection, store, group, group_scores)
+
+    return hits, scored, aligned
+
+
+def _create_peptides(store: PeptideStore, hits: List[_Hit]) -> List[MultiAlignedPeptide]:
+    return [
+        MultiAlignedPeptide(
+            **peptide.__dict__,
+            score=real_score,
+            avg_score=score_avg,
+            max_score=score_max,
+            min_score=score_min
+        )
+        for peptide, (_, real_score, score_avg, score_max, score_min) in zip(store.get_peptides([hit[0] for hit in hits]), hits)
+    ]
+
+
+def align_multi_query(corpus: PeptideCorpus, queries: List[str], options: MultiAlignmentOptions, on_progress: Optional[ProgressCallback] = None) -> Tuple[List[MultiAlignedPeptide], AlignmentStatistics]:
+    queries = [str(query) for query in queries]
+    max_scores = [get_query_max_score(options.matrix, query) for query in queries]
+    store = corpus.store
+
+    bounds = _get_criterion_bounds(corpus, queries, max_scores, options)
+    memoized_scores = np.stack([corpus.scores.get(options.matrix, options.alg, query) for query in queries], axis=1)
+    candidates = bounds + BOUND_ROUNDING_MARGIN >= options.threshold
+    complete = ~np.isnan(memoized_scores).any(axis=1)
+    memoized = np.flatnonzero(candidates & complete)
+    candidates = np.flatnonzero(candidates & ~complete)
+
+    # Groups scored against every query are selected first, so their floor already prunes the groups left to align.
+    selection = TopSelection(options.max_quantity)
+    for group, scores in zip(memoized.tolist(), memoized_scores[memoized].tolist()):
+        group_scores = _evaluate([round(score / float(max_score), 2) for score, max_score in zip(scores, max_scores)], options)
+
+        if group_scores is not None:
+            _select_group(selection, store, group, group_scores)
+
+    # Progress is counted in peptides, every peptide outside of the candidate groups is done from the start.
+    group_sizes = np.diff(store.group_offsets)
+    reporter = ProgressReporter(on_progress, len(store), config.search_progress_interval)
+    reporter.advance(len(store) - int(group_sizes[candidates].sum()), lambda: [])
+
+    payload = (queries, max_scores, options, selection.get_floor())
+    shard_results = AlignmentEngine.get_instance().map_shards(corpus, _align_shard, payload, candidates, bounds[candidates], memoized_scores[candidates])
+    aligned = 0
+    for shard_groups, (hits, scored, shard_aligned) in shard_results:
+        for query, (scored_groups, scores) in zip(queries, scored):
+            if scored_groups:
+                corpus.scores.update(options.matrix, options.alg, query, np.concatenate(scored_groups), np.concatenate(scores))
+
+        for group, group_scores in hits:
+            _select_group(selection, store, group, group_scores)
+
+        aligned += shard_aligned
+
+        reporter.advance(int(group_sizes[shard_groups].sum()), lambda: _create_peptides(store, selection.get_sorted()[:config.search_partial_result_size]))
+
+    peptides = _create_peptides(store, selection.get_sorted())
+    statistics = AlignmentStatistics(
+        total=len(store),
+        unique=store.get_group_count(),
+        aligned=aligned,
+        memoized=len(memoized),
+        pruned=store.get_group_count() - aligned - len(memoized)
+    )
+
+    return peptides, statistics
@@ -0,0 +1,63 @@
+import dataclasses
+import numpy as np
+from typing import List, Dict, Any, Tuple, Type
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.peptide.models import BasePeptide, SearchPeptide
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.services.redis.async_task import AsyncTaskRedisClientService
+
+
+# Scores are rounded to two decimals by the alignment, so they are kept exactly as integer hundredths.
+SCORE_SCALE = 100
+
+
+# The ranking of a finished search is stored apart from its status as one fixed size record per hit: the peptide
+# id and its scores. A page is then a single range read of the records it covers, and the rest of each peptide is
+# rejoined from the corpus. Peptides the corpus no longer holds, because it changed since the search ran, keep their
+# place in the ranking with their id and scores only, so pages always hold as many peptides as their pagination says.
+class PackedSearchResult:
+    def __init__(self, cache: AsyncTaskRedisClientService, task_id: str, peptide_type: Type[SearchPeptide], score_fields: Tuple[str, ...]):
+        self.cache = cache
+        self.task_id = task_id
+        self.peptide_type = peptide_type
+        self.score_fields = score_fields
+        self.dtype = np.dtype([('id', '<i8')] + [(name, '<i2') for name in score_fields])
+
+    def __len__(self) -> int:
+        return self.cache.get_result_size(self.task_id) // self.dtype.itemsize
+
+    def save(self, peptides: List[SearchPeptide]) -> None:
+        records = np.empty(len(peptides), dtype=self.dtype)
+        records['id'] = [BasePeptide.parse_id(peptide.id) for peptide in peptides]
+
+        for name in self.score_fields:
+            records[name] = np.round(np.array([getattr(peptide, name) for peptide in peptides], dtype=np.float64) * SCORE_SCALE)
+
+        self.cache.set_result(self.task_id, records.tobytes())
+
+    def get_records(self, start: int, stop: int) -> np.ndarray:
+        data = self.cache.get_result_range(self.task_id, start * self.dtype.itemsize, stop * self.dtype.itemsize)
+        return np.frombuffer(data, dtype=self.dtype)
+
+    def get_ids(self) -> List[str]:
+        return [BasePeptide.format_id(identifier) for identifier in self.get_records(0, len(self))['id'].tolist()]
+
+    def get_page(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        return self.create_peptides(PeptideCorpusService.get_instance().get_corpus().store, self.get_records(start, stop))
+
+    def create_peptides(self, store: PeptideStore, records: np.ndarray) -> List[Dict[str, Any]]:
+        indices = store.get_indices(records['id'])
+        found = indices >= 0
+        peptides = iter(store.get_peptides(indices[found].tolist()))
+        ids = records['id'].tolist()
+        scores = {name: (records[name] / SCORE_SCALE).tolist() for name in self.score_fields}
+
+        return [
+            dataclasses.asdict(self.peptide_type(**next(peptides).__dict__, **{name: values[position] for name, values in scores.items()}))
+            if is_found else PackedSearchResult._create_missing_peptide(ids[position], {name: values[position] for name, values in scores.items()})
+            for position, is_found in enumerate(found.tolist())
+        ]
+
+    @staticmethod
+    def _create_missing_peptide(identifier: int, scores: Dict[str, float]) -> Dict[str, Any]:
+        return {'id': BasePeptide.format_id(identifier), 'sequence': None, 'length': None, 'attributes': None, **scores}
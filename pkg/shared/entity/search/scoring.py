@@ -0,0 +1,56 @@
+import numpy as np
+from typing import List
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+from pkg.shared.helpers.bio.kernel import is_vectorized_scoring_exact, get_known_residues, score_encoded_targets
+from pkg.shared.helpers.bio.matrix import get_aligner
+
+
+# Targets of similar length are batched together to keep the padding of the vectorized kernel low.
+_BUCKET_WIDTH = 8
+_MAX_BUCKET_CELLS = 1 << 20
+
+_BLOCK_SIZES = {'vectorized': 4096, 'pairwise': 32}
+
+
+def get_blocks(order: np.ndarray, options: SingleAlignmentOptions) -> List[np.ndarray]:
+    block_size = _BLOCK_SIZES[options.engine]
+    return [order[start:start + block_size] for start in range(0, len(order), block_size)]
+
+
+def _score_pairwise(store: PeptideStore, indices: np.ndarray, query: str, options: SingleAlignmentOptions) -> np.ndarray:
+    aligner = get_aligner(options.matrix, options.alg)
+    return np.array([aligner.score(store.get_alignment_sequence(int(index)), query) for index in indices], dtype=np.float64)
+
+
+def _score_vectorized(store: PeptideStore, indices: np.ndarray, query: str, options: SingleAlignmentOptions) -> np.ndarray:
+    scores = np.empty(len(indices), dtype=np.float64)
+    known_residues = get_known_residues(options.matrix)
+
+    lengths = store.alignment_lengths[indices]
+    order = np.argsort(lengths, kind='stable')
+    buckets = (lengths[order] + _BUCKET_WIDTH - 1) // _BUCKET_WIDTH
+
+    for bucket in np.unique(buckets):
+        width = max(int(bucket) * _BUCKET_WIDTH, 1)
+        positions = order[buckets == bucket]
+        batch_size = max(_MAX_BUCKET_CELLS // width, 1)
+
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            codes = store.get_alignment_codes(indices[batch], width)
+            scores[batch] = score_encoded_targets(options.matrix, query, codes)
+
+            # Targets with residues outside of the matrix alphabet go through PairwiseAligner, which rejects them.
+            unknown = ~known_residues[codes].all(axis=1)
+            if unknown.any():
+                scores[batch[unknown]] = _score_pairwise(store, indices[batch[unknown]], query, options)
+
+    return scores
+
+
+def score_targets(store: PeptideStore, indices: np.ndarray, query: str, options: SingleAlignmentOptions) -> np.ndarray:
+    if options.engine == 'vectorized' and is_vectorized_scoring_exact(get_aligner(options.matrix, options.alg)):
+        return _score_vectorized(store, indices, query, options)
+
+    return _score_pairwise(store, indices, query, options)
@@ -1,34 +1,102 @@
-from typing import Iterable, List
-from Bio.Align import substitution_matrices, PairwiseAligner
-from pkg.shared.entity.peptide.models import SearchPeptide
+import numpy as np
+from typing import List, Tuple, Optional
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpus
+from pkg.shared.entity.peptide.index import BOUND_ROUNDING_MARGIN
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.engine import AlignmentEngine, AlignmentStatistics, ProgressCallback, ProgressReporter
+from pkg.shared.entity.search.scoring import get_blocks, score_targets
 from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions, SingleAlignedPeptide
-from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
+from pkg.shared.helpers.bio.matrix import get_query_max_score
+from pkg.shared.utils.selection import TopSelection
 
 
-def align_single_query(database: Iterable[SearchPeptide], query: str, options: SingleAlignmentOptions) -> List[SingleAlignedPeptide]:
-    aligner = PairwiseAligner()
-    aligner.substitution_matrix = substitution_matrices.load(options.matrix)
-    aligner.mode = options.alg
+_Hit = Tuple[int, float]
 
-    max_score = sum([max(aligner.substitution_matrix[a]) for a in query])
 
-    result = []
-    for target in database:
-        score = aligner.score(replace_ambiguous_amino_acids(target.sequence), query)
+def _get_floor(selection: TopSelection, floor: Optional[float]) -> Optional[float]:
+    floors = [f for f in (selection.get_floor(), floor) if f is not None]
+    return max(floors) if floors else None
+
+
+# Every peptide of a sequence group shares its score, so each group is pushed once per member.
+def _select_groups(selection: TopSelection, store: PeptideStore, groups: np.ndarray, scores: np.ndarray, max_score: float, options: SingleAlignmentOptions) -> None:
+    for group, score in zip(groups.tolist(), scores.tolist()):
         score_ratio = round(score / float(max_score), 2)
 
         if score_ratio >= options.threshold:
-            result.append(SingleAlignedPeptide(
-                id=target.id,
-                sequence=target.sequence,
-                length=target.length,
-                attributes=target.attributes,
-                score=score_ratio
-            ))
+            for index in store.get_group_members(group).tolist():
+                selection.push(score_ratio, index, (index, score_ratio))
+
+
+def _align_shard(store: PeptideStore, payload: Tuple[str, float, SingleAlignmentOptions, Optional[float]], groups: np.ndarray, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    query, max_score, options, floor = payload
+
+    # Groups are visited from the highest bound down, so once the selection is full the rest can be skipped.
+    selection = TopSelection(options.max_quantity)
+    scored_groups = []
+    scores = []
+    for block in get_blocks(np.argsort(-bounds, kind='stable'), options):
+        block_floor = _get_floor(selection, floor)
+        if block_floor is not None and bounds[block[0]] + BOUND_ROUNDING_MARGIN < block_floor:
+            break
+
+        block_groups = groups[block]
+        block_scores = score_targets(store, store.group_representatives[block_groups], query, options)
+        _select_groups(selection, store, block_groups, block_scores, max_score, options)
+
+        scored_groups.append(block_groups)
+        scores.append(block_scores)
+
+    if not scored_groups:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    return np.concatenate(scored_groups), np.concatenate(scores)
+
+
+def _create_peptides(store: PeptideStore, hits: List[_Hit]) -> List[SingleAlignedPeptide]:
+    return [
+        SingleAlignedPeptide(**peptide.__dict__, score=score)
+        for peptide, (_, score) in zip(store.get_peptides([index for index, _ in hits]), hits)
+    ]
+
+
+def align_single_query(corpus: PeptideCorpus, query: str, options: SingleAlignmentOptions, on_progress: Optional[ProgressCallback] = None) -> Tuple[List[SingleAlignedPeptide], AlignmentStatistics]:
+    query = str(query)
+    max_score = get_query_max_score(options.matrix, query)
+    store = corpus.store
+
+    bounds = corpus.index.get_upper_bounds(options.matrix, query) / max_score
+    memoized_scores = corpus.scores.get(options.matrix, options.alg, query)
+    candidates = bounds + BOUND_ROUNDING_MARGIN >= options.threshold
+    memoized = np.flatnonzero(candidates & ~np.isnan(memoized_scores))
+    candidates = np.flatnonzero(candidates & np.isnan(memoized_scores))
+
+    # Memoized groups are selected first, so their floor already prunes the groups that still have to be aligned.
+    selection = TopSelection(options.max_quantity)
+    _select_groups(selection, store, memoized, memoized_scores[memoized], max_score, options)
+
+    # Progress is counted in peptides, every peptide outside of the candidate groups is done from the start.
+    group_sizes = np.diff(store.group_offsets)
+    reporter = ProgressReporter(on_progress, len(store), config.search_progress_interval)
+    reporter.advance(len(store) - int(group_sizes[candidates].sum()), lambda: [])
+
+    payload = (query, max_score, options, selection.get_floor())
+    aligned = 0
+    for shard_groups, (scored_groups, scores) in AlignmentEngine.get_instance().map_shards(corpus, _align_shard, payload, candidates, bounds[candidates]):
+        corpus.scores.update(options.matrix, options.alg, query, scored_groups, scores)
+        _select_groups(selection, store, scored_groups, scores, max_score, options)
+        aligned += len(scored_groups)
 
-    result.sort(key=lambda n: -n.score)
+        reporter.advance(int(group_sizes[shard_groups].sum()), lambda: _create_peptides(store, selection.get_sorted()[:config.search_partial_result_size]))
 
-    if options.max_quantity:
-        result = result[0:options.max_quantity]
+    peptides = _create_peptides(store, selection.get_sorted())
+    statistics = AlignmentStatistics(
+        total=len(store),
+        unique=store.get_group_count(),
+        aligned=aligned,
+        memoized=len(memoized),
+        pruned=store.get_group_count() - aligned - len(memoized)
+    )
 
-    return result
+    return peptides, statistics
@@ -1,12 +1,17 @@
 import dataclasses
 from typing import List, Optional, Dict, Any
 from Bio import SeqIO
-from pkg.shared.entity.peptide.neo4j import get_all_peptides
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.cache import release_search_result
+from pkg.shared.entity.search.engine import AlignmentProgress
 from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.entity.search.result import PackedSearchResult
 from pkg.shared.helpers.bio.alignment import replace_ambiguous_amino_acids
 from pkg.shared.entity.search.single_query.alignment import align_single_query
-from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
-from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions, SingleAlignedPeptide
+from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus, refresh_queue_position, refresh_queue_position_async
 
 
 _TContext = Dict[str, Any]
@@ -16,14 +21,18 @@ _TData = List[Dict[str, Any]]
 class SingleQueryAsyncTask(AsyncTask[_TContext, _TData, Exception]):
     TASK_NAME = 'single_query'
 
-    def __init__(self, query_record: SeqIO.SeqRecord, query: str, options: SingleAlignmentOptions):
+    def __init__(self, query_record: SeqIO.SeqRecord, query: str, options: SingleAlignmentOptions, result_key: Optional[str] = None):
         super().__init__(SingleQueryAsyncTask.TASK_NAME)
 
         self.query_record = query_record
         self.query = query
         self.options = options
+        self.result_key = result_key
 
         self.result = None
+        self.corpus_version = None
+        self.statistics = None
+        self.progress = None
 
     @staticmethod
     def get_status(task_id: str) -> Optional[AsyncTaskStatus]:
@@ -33,18 +42,64 @@ class SingleQueryAsyncTask(AsyncTask[_TContext, _TData, Exception]):
         if cached is None or cached['name'] != SingleQueryAsyncTask.TASK_NAME:
             return None
 
-        return AsyncTaskStatus(**cached)
+        return refresh_queue_position(AsyncTaskStatus(**cached))
+
+    @staticmethod
+    async def get_status_async(task_id: str) -> Optional[AsyncTaskStatus]:
+        cache = get_async_task_redis_client()
+        cached = await cache.get_task_async(task_id)
+
+        if cached is None or cached['name'] != SingleQueryAsyncTask.TASK_NAME:
+            return None
+
+        return await refresh_queue_position_async(AsyncTaskStatus(**cached))
 
     @staticmethod
     def update_status(status: AsyncTaskStatus) -> None:
         cache = get_async_task_redis_client()
         cache.update_task(status.id, dataclasses.asdict(status))
 
+    @staticmethod
+    def get_result(task_id: str) -> PackedSearchResult:
+        return PackedSearchResult(get_async_task_redis_client(), task_id, SingleAlignedPeptide, ('score',))
+
+    @staticmethod
+    def from_job(job: Dict[str, Any]) -> 'SingleQueryAsyncTask':
+        query_record = SeqRecord(Seq(job['sequence']), id=job['record_id'])
+        task = SingleQueryAsyncTask(query_record, job['query'], SingleAlignmentOptions(**job['options']), job['result_key'])
+        task.task_id = job['id']
+
+        return task
+
+    def to_job(self) -> Dict[str, Any]:
+        return {
+            'id': self.task_id,
+            'record_id': self.query_record.id,
+            'sequence': str(self.query_record.seq),
+            'query': self.query,
+            'options': dataclasses.asdict(self.options),
+            'result_key': self.result_key
+        }
+
+    def handle_queued(self, position: Optional[int]) -> None:
+        super().handle_queued(position)
+
+        cache = get_async_task_redis_client()
+        cache.create_task(self.task_id, dataclasses.asdict(self.get_init_status()))
+
     def task(self) -> None:
-        peptides = get_all_peptides().as_mapped_object()
+        corpus = PeptideCorpusService.get_instance().get_corpus()
+        self.corpus_version = corpus.version
 
         fixed_query = replace_ambiguous_amino_acids(self.query_record.seq)
-        self.result = align_single_query(peptides, fixed_query, self.options)
+        self.result, self.statistics = align_single_query(corpus, fixed_query, self.options, self.handle_progress)
+
+    # Publishes how much of the corpus was aligned so far, with the best hits found until then as provisional data.
+    def handle_progress(self, progress: AlignmentProgress) -> None:
+        self.progress = {'processed': progress.processed, 'total': progress.total}
+
+        status = self.create_status(True, False, self._get_context(), [dataclasses.asdict(r) for r in progress.hits])
+        SingleQueryAsyncTask.update_status(status)
 
     def pre_run(self) -> None:
         cache = get_async_task_redis_client()
@@ -53,8 +108,9 @@ class SingleQueryAsyncTask(AsyncTask[_TContext, _TData, Exception]):
         print(f'Started single query alignment task {self.task_id}')
 
     def post_run(self) -> None:
-        parsed_result = [dataclasses.asdict(r) for r in self.result]
-        status = self.create_status(False, True, self._get_context(),  parsed_result)
+        self.progress = {'processed': self.statistics.total, 'total': self.statistics.total}
+        SingleQueryAsyncTask.get_result(self.task_id).save(self.result)
+        status = self.create_status(False, True, self._get_context(), None)
         SingleQueryAsyncTask.update_status(status)
 
         print(f'Finished single query alignment task {self.task_id}')
@@ -62,10 +118,12 @@ class SingleQueryAsyncTask(AsyncTask[_TContext, _TData, Exception]):
     def handle_error(self, error: Exception) -> None:
         status = self.create_status(False, False, self._get_context(), str(error))
         SingleQueryAsyncTask.update_status(status)
+        release_search_result(self.result_key, self.task_id)
 
         print(f'Error in single query alignment task {self.task_id}')
         print(error)
 
     def _get_context(self) -> dict:
-        return {'query': self.query, **dataclasses.asdict(self.options)}
+        statistics = dataclasses.asdict(self.statistics) if self.statistics else None
+        return {'query': self.query, **dataclasses.asdict(self.options), 'corpus_version': self.corpus_version, 'progress': self.progress, 'statistics': statistics}
 
@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from pkg.shared.entity.peptide.models import SearchPeptide
-from pkg.shared.helpers.bio.alignment import SUPPORTED_ALGORITHMS, SUPPORTED_MATRIX_NAMES, DEFAULT_MATRIX_NAME, \
-    DEFAULT_ALGORITHM, DEFAULT_THRESHOLD, DEFAULT_MAX_QUANTITY
+from pkg.shared.helpers.bio.alignment import SUPPORTED_ALGORITHMS, SUPPORTED_MATRIX_NAMES, SUPPORTED_ENGINES, \
+    DEFAULT_MATRIX_NAME, DEFAULT_ALGORITHM, DEFAULT_THRESHOLD, DEFAULT_MAX_QUANTITY, DEFAULT_ENGINE
 
 
 @dataclass
@@ -16,6 +16,7 @@ class SingleAlignmentOptions:
     matrix: str
     threshold: float
     max_quantity: Optional[int]
+    engine: str
 
     @staticmethod
     def _validate_alg(alg: Optional[str]) -> None:
@@ -37,6 +38,11 @@ class SingleAlignmentOptions:
         if max_quantity and not max_quantity > 0:
             raise ValueError('max_quantity must be at least 1.')
 
+    @staticmethod
+    def _validate_engine(engine: Optional[str]) -> None:
+        if engine and engine not in SUPPORTED_ENGINES:
+            raise ValueError(f'engine must be one of: {", ".join(SUPPORTED_ENGINES)}')
+
     @staticmethod
     def create_from_params(params: Dict[str, Any]) -> 'SingleAlignmentOptions':
         alg = params.get('alg', DEFAULT_ALGORITHM)
@@ -45,10 +51,12 @@ class SingleAlignmentOptions:
         threshold = float(threshold) if threshold else DEFAULT_THRESHOLD
         max_quantity = params.get('max_quantity', DEFAULT_MAX_QUANTITY)
         max_quantity = int(max_quantity) if max_quantity else DEFAULT_MAX_QUANTITY
+        engine = params.get('engine') or DEFAULT_ENGINE
 
         SingleAlignmentOptions._validate_alg(alg)
         SingleAlignmentOptions._validate_matrix(matrix)
         SingleAlignmentOptions._validate_threshold(threshold)
         SingleAlignmentOptions._validate_max_quantity(max_quantity)
+        SingleAlignmentOptions._validate_engine(engine)
 
-        return SingleAlignmentOptions(alg, matrix, threshold, max_quantity)
+        return SingleAlignmentOptions(alg, matrix, threshold, max_quantity, engine)
@@ -1,9 +1,28 @@
 from typing import Optional
+from pkg.shared.entity.search.result import PackedSearchResult
+from pkg.shared.entity.search.view import SearchResultQuery, SearchResultViewCache
 from pkg.shared.utils.async_task import AsyncTaskStatus
 from pkg.shared.utils.lang import safe_int
-from pkg.shared.utils.pagination import paginate_list
+from pkg.shared.utils.pagination import paginate_list, paginate_slice
 
 
-def get_paginated_task_data(cached_task_status: AsyncTaskStatus, page_param: Optional[str]) -> object:
+# Running tasks serve their provisional ranking, if they published one yet, the same way as finished ones.
+def has_paginated_task_data(cached_task_status: AsyncTaskStatus) -> bool:
+    return cached_task_status.success or (cached_task_status.loading and cached_task_status.data is not None)
+
+
+# Finished tasks keep their ranking in a packed result, only the records of the requested page are read unless it
+# is sorted or filtered. Provisional rankings are always served in rank order.
+def get_paginated_task_data(cached_task_status: AsyncTaskStatus, page_param: Optional[str], result: PackedSearchResult, query: Optional[SearchResultQuery] = None) -> object:
     page = safe_int(page_param) or 1
-    return {**cached_task_status.__dict__, 'data': paginate_list(cached_task_status.data, page)}
+
+    if not cached_task_status.success:
+        return {**cached_task_status.__dict__, 'data': paginate_list(cached_task_status.data, page)}
+
+    if query is None or query.is_default():
+        return {**cached_task_status.__dict__, 'data': paginate_slice(len(result), result.get_page, page)}
+
+    view = SearchResultViewCache.get_instance().get_view(result)
+    positions = view.select(query)
+
+    return {**cached_task_status.__dict__, 'data': paginate_slice(len(positions), lambda start, stop: view.get_peptides(positions[start:stop]), page)}
@@ -0,0 +1,192 @@
+import re
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Any
+from starlette.datastructures import QueryParams
+from pkg.config import config
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.result import PackedSearchResult, SCORE_SCALE
+
+
+_FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(\S+)\s*$')
+
+FILTER_OPERATORS = {
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '<': np.less,
+    '=': np.equal,
+    '!=': np.not_equal
+}
+
+
+@dataclass
+class SearchResultFilter:
+    field: str
+    operator: str
+    value: float
+
+
+# Missing values are NaN, which != would keep, so they are left out by every filter.
+def get_filter_mask(values: np.ndarray, condition: SearchResultFilter) -> np.ndarray:
+    return FILTER_OPERATORS[condition.operator](values, condition.value) & ~np.isnan(values)
+
+
+@dataclass
+class SearchResultQuery:
+    sort: Optional[str]
+    descending: bool
+    filters: List[SearchResultFilter]
+
+    # Without sort nor filters results are served in rank order, straight from the packed result.
+    def is_default(self) -> bool:
+        return self.sort is None and len(self.filters) == 0
+
+    @staticmethod
+    def _parse_filter(expression: str) -> SearchResultFilter:
+        match = _FILTER_PATTERN.match(expression)
+        if match is None:
+            raise ValueError(f'filter must look like <field><operator><number> with an operator among: {", ".join(FILTER_OPERATORS)}')
+
+        field, operator, value = match.groups()
+        try:
+            return SearchResultFilter(field, operator, float(value))
+        except ValueError:
+            raise ValueError(f'filter {expression} must compare {field} to a number.')
+
+    # Sorts are field names, prefixed with - to sort in descending order.
+    @staticmethod
+    def create_from_expressions(sort: Optional[str], filters: List[str]) -> 'SearchResultQuery':
+        sort = sort or None
+        descending = sort is not None and sort.startswith('-')
+
+        return SearchResultQuery(
+            sort=sort[1:] if descending else sort,
+            descending=descending,
+            filters=[SearchResultQuery._parse_filter(expression) for expression in filters]
+        )
+
+    @staticmethod
+    def create_from_params(params: QueryParams) -> 'SearchResultQuery':
+        return SearchResultQuery.create_from_expressions(params.get('sort'), params.getlist('filter'))
+
+
+def _join_column(column: np.ndarray, indices: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    values = np.full(len(indices), np.nan)
+    values[~missing] = column[indices[~missing]]
+
+    return values
+
+
+# Columnar copy of a finished result joined with the corpus it is served from, so that sorting and filtering are
+# done over whole columns at once. Sorted positions are kept per sort key for the following pages.
+class SearchResultView:
+    def __init__(self, result: PackedSearchResult, store: PeptideStore):
+        self.result = result
+        self.store = store
+
+        self.records = result.get_records(0, len(result))
+        indices = store.get_indices(self.records['id'])
+        missing = indices < 0
+
+        # Peptides the corpus no longer holds keep their place with NaN columns, which no filter keeps and every sort
+        # puts last.
+        self.columns: Dict[str, np.ndarray] = {
+            'length': _join_column(store.lengths, indices, missing),
+            **{name: _join_column(column, indices, missing) for name, column in store.attributes.items()},
+            **{name: self.records[name] / SCORE_SCALE for name in result.score_fields}
+        }
+
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _validate_field(self, parameter: str, name: str) -> None:
+        if name not in self.columns:
+            raise ValueError(f'{parameter} must be one of: {", ".join(self.columns)}')
+
+    # Ties keep their rank order.
+    def get_order(self, sort: str, descending: bool) -> np.ndarray:
+        key = (sort, descending)
+
+        with self._lock:
+            order = self._orders.get(key)
+
+        if order is None:
+            values = self.columns[sort]
+            order = np.argsort(-values if descending else values, kind='stable')
+
+            with self._lock:
+                self._orders[key] = order
+
+        return order
+
+    def select(self, query: SearchResultQuery) -> np.ndarray:
+        if query.sort is not None:
+            self._validate_field('sort', query.sort)
+
+        for condition in query.filters:
+            self._validate_field('filter', condition.field)
+
+        positions = self.get_order(query.sort, query.descending) if query.sort is not None else np.arange(len(self))
+
+        if query.filters:
+            mask = np.ones(len(self), dtype=bool)
+            for condition in query.filters:
+                mask &= get_filter_mask(self.columns[condition.field], condition)
+
+            positions = positions[mask[positions]]
+
+        return positions
+
+    def get_peptides(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        return self.result.create_peptides(self.store, self.records[positions])
+
+
+# Views of the most recently queried results, per task and corpus snapshot.
+class SearchResultViewCache:
+    instance: 'SearchResultViewCache' = None
+    _instance_lock = Lock()
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        self._views: OrderedDict[Tuple[str, str], SearchResultView] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'SearchResultViewCache':
+        if SearchResultViewCache.instance is None:
+            with SearchResultViewCache._instance_lock:
+                if SearchResultViewCache.instance is None:
+                    SearchResultViewCache.instance = SearchResultViewCache(config.search_result_view_cache_size)
+
+        return SearchResultViewCache.instance
+
+    def get_view(self, result: PackedSearchResult) -> SearchResultView:
+        corpus = PeptideCorpusService.get_instance().get_corpus()
+        key = (result.task_id, corpus.version)
+
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view
+
+        view = SearchResultView(result, corpus.store)
+        if self.max_size <= 0:
+            return view
+
+        with self._lock:
+            self._views[key] = view
+            self._views.move_to_end(key)
+
+            while len(self._views) > self.max_size:
+                self._views.popitem(last=False)
+
+        return view
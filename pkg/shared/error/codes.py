@@ -6,3 +6,4 @@ class ErrorCode(Enum):
     NOT_FOUND = 'NOT_FOUND'
     INVALID_QUERY_PROVIDED = 'INVALID_QUERY_PROVIDED'
     INVALID_BODY_PROVIDED = 'INVALID_BODY_PROVIDED'
+    TASK_QUEUE_FULL = 'TASK_QUEUE_FULL'
@@ -1,12 +1,14 @@
 SUPPORTED_MATRIX_NAMES = ('BLOSUM45', 'BLOSUM50', 'BLOSUM62', 'BLOSUM80', 'BLOSUM90', 'PAM30', 'PAM70', 'PAM250')
 SUPPORTED_ALGORITHMS = ('global', 'local')
 SUPPORTED_CRITERIA = ('avg', 'max', 'min')
+SUPPORTED_ENGINES = ('pairwise', 'vectorized')
 
 DEFAULT_ALGORITHM = 'local'
 DEFAULT_MATRIX_NAME = 'BLOSUM62'
 DEFAULT_THRESHOLD = 1.0
 DEFAULT_MAX_QUANTITY = None
 DEFAULT_CRITERION = 'avg'
+DEFAULT_ENGINE = 'pairwise'
 
 
 def replace_ambiguous_amino_acids(seq: str) -> str:
@@ -0,0 +1,47 @@
+import numpy as np
+from typing import List, Optional
+
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+
+_AMINO_ACID_POSITIONS = {amino_acid: position for position, amino_acid in enumerate(AMINO_ACIDS)}
+
+
+# Amino acid (AAC) and dipeptide (DPC) composition of a sequence, as computed by iFeature: the frequency of every
+# residue over the length of the sequence and of every pair of adjacent residues over the number of pairs.
+def get_amino_acid_composition(sequence: str) -> np.ndarray:
+    counts = np.zeros(len(AMINO_ACIDS), dtype=np.float64)
+    for amino_acid in sequence:
+        if amino_acid in _AMINO_ACID_POSITIONS:
+            counts[_AMINO_ACID_POSITIONS[amino_acid]] += 1
+
+    return counts / max(len(sequence), 1)
+
+
+def get_dipeptide_composition(sequence: str) -> np.ndarray:
+    counts = np.zeros((len(AMINO_ACIDS), len(AMINO_ACIDS)), dtype=np.float64)
+    for first, second in zip(sequence, sequence[1:]):
+        if first in _AMINO_ACID_POSITIONS and second in _AMINO_ACID_POSITIONS:
+            counts[_AMINO_ACID_POSITIONS[first], _AMINO_ACID_POSITIONS[second]] += 1
+
+    return counts.ravel() / max(len(sequence) - 1, 1)
+
+
+# The composition of a sequence laid out as the given columns, named after their residue or pair of residues.
+# None when a column is neither, such embeddings cannot be computed from a sequence.
+def get_composition(sequence: str, columns: List[str]) -> Optional[np.ndarray]:
+    sequence = sequence.upper()
+    aac, dpc = None, None
+
+    vector = np.empty(len(columns), dtype=np.float32)
+    for position, column in enumerate(name.strip().upper() for name in columns):
+        if len(column) == 1 and column in _AMINO_ACID_POSITIONS:
+            aac = get_amino_acid_composition(sequence) if aac is None else aac
+            vector[position] = aac[_AMINO_ACID_POSITIONS[column]]
+        elif len(column) == 2 and all(amino_acid in _AMINO_ACID_POSITIONS for amino_acid in column):
+            dpc = get_dipeptide_composition(sequence) if dpc is None else dpc
+            vector[position] = dpc[_AMINO_ACID_POSITIONS[column[0]] * len(AMINO_ACIDS) + _AMINO_ACID_POSITIONS[column[1]]]
+        else:
+            return None
+
+    return vector
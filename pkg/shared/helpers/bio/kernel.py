@@ -0,0 +1,66 @@
+import numpy as np
+from functools import lru_cache
+from Bio.Align import PairwiseAligner
+from pkg.shared.helpers.bio.matrix import get_score_table
+
+
+# Residue code used to right pad targets of different lengths into a single batch.
+PADDING_CODE = 0
+
+# Low enough that a pairing with it never wins over leaving both residues unpaired, high enough not to overflow.
+_UNPAIRABLE_SCORE = -(1 << 24)
+
+_GAP_SCORE_ATTRIBUTES = (
+    'target_internal_open_gap_score', 'target_internal_extend_gap_score',
+    'target_left_open_gap_score', 'target_left_extend_gap_score',
+    'target_right_open_gap_score', 'target_right_extend_gap_score',
+    'query_internal_open_gap_score', 'query_internal_extend_gap_score',
+    'query_left_open_gap_score', 'query_left_extend_gap_score',
+    'query_right_open_gap_score', 'query_right_extend_gap_score'
+)
+
+
+def is_vectorized_scoring_exact(aligner: PairwiseAligner) -> bool:
+    # With every gap free, global and local alignments share the same score and the recurrence below reproduces it.
+    return all(getattr(aligner, attribute) == 0 for attribute in _GAP_SCORE_ATTRIBUTES)
+
+
+@lru_cache(maxsize=None)
+def get_kernel_table(matrix_name: str) -> np.ndarray:
+    # Residues outside of the matrix alphabet (padding included) can never be paired. Integer matrices are scored
+    # with integers, which is both exact and faster than floating point.
+    scores = get_score_table(matrix_name)
+    known = ~np.isnan(scores)
+
+    if np.array_equal(scores[known], np.round(scores[known])):
+        table = np.where(known, scores, _UNPAIRABLE_SCORE).astype(np.int32)
+    else:
+        table = np.where(known, scores, -np.inf).astype(np.float32)
+
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_known_residues(matrix_name: str) -> np.ndarray:
+    known = ~np.isnan(get_score_table(matrix_name)).all(axis=1)
+    known[PADDING_CODE] = True
+
+    return known
+
+
+def score_encoded_targets(matrix_name: str, query: str, codes: np.ndarray) -> np.ndarray:
+    # Scores every row of codes (targets encoded as residue codes, right padded) against the query at once.
+    # With free gaps the best score up to query residue i and target residue j is
+    #   H[i][j] = max(H[i][j - 1], H[i - 1][j], H[i - 1][j - 1] + s(query[i], target[j]))
+    # so each query residue is one vectorised diagonal step followed by a running maximum along the target.
+    query_rows = get_kernel_table(matrix_name)[np.frombuffer(query.encode('ascii'), dtype=np.uint8)]
+    scores = np.zeros((codes.shape[0], codes.shape[1] + 1), dtype=query_rows.dtype)
+
+    for query_row in query_rows:
+        step = scores[:, :-1] + query_row[codes]
+        np.maximum(step, scores[:, 1:], out=step)
+        np.maximum.accumulate(step, axis=1, out=step)
+        scores[:, 1:] = step
+
+    return scores[:, -1].astype(np.float64)
@@ -0,0 +1,59 @@
+import numpy as np
+from functools import lru_cache
+from Bio.Align import substitution_matrices, PairwiseAligner
+from pkg.shared.helpers.bio.alignment import SUPPORTED_MATRIX_NAMES, SUPPORTED_ALGORITHMS
+
+
+@lru_cache(maxsize=None)
+def get_substitution_matrix(name: str) -> substitution_matrices.Array:
+    return substitution_matrices.load(name)
+
+
+@lru_cache(maxsize=None)
+def get_row_maxima_table(name: str) -> np.ndarray:
+    # Indexed by the ASCII code of a residue, NaN for residues that are not part of the matrix alphabet.
+    matrix = get_substitution_matrix(name)
+    table = np.full(256, np.nan, dtype=np.float64)
+
+    for letter, row_max in zip(matrix.alphabet, np.asarray(matrix).max(axis=1)):
+        table[ord(letter)] = row_max
+
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_score_table(name: str) -> np.ndarray:
+    # Indexed by the ASCII codes of both residues, NaN for pairs outside of the matrix alphabet.
+    matrix = get_substitution_matrix(name)
+    codes = np.array([ord(letter) for letter in matrix.alphabet])
+    table = np.full((256, 256), np.nan, dtype=np.float64)
+    table[np.ix_(codes, codes)] = np.asarray(matrix)
+
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_aligner(matrix_name: str, alg: str) -> PairwiseAligner:
+    aligner = PairwiseAligner()
+    aligner.substitution_matrix = get_substitution_matrix(matrix_name)
+    aligner.mode = alg
+
+    return aligner
+
+
+def get_query_max_score(matrix_name: str, query: str) -> float:
+    row_maxima = get_row_maxima_table(matrix_name)[np.frombuffer(query.encode('ascii', errors='replace'), dtype=np.uint8)]
+
+    if np.isnan(row_maxima).any():
+        raise ValueError(f'Query contains residues not supported by the {matrix_name} matrix.')
+
+    return float(row_maxima.sum())
+
+
+def preload_alignment_tables() -> None:
+    for name in SUPPORTED_MATRIX_NAMES:
+        get_row_maxima_table(name)
+        get_score_table(name)
+
+        for alg in SUPPORTED_ALGORITHMS:
+            get_aligner(name, alg)
@@ -39,6 +39,17 @@ class ConflictException(ApiResponseException):
         )
 
 
+class TooManyRequestsException(ApiResponseException):
+    def __init__(self, message: str, code: Optional[ErrorCode] = None):
+        ApiResponseException.__init__(
+            self,
+            message,
+            'The server is handling too many requests of this kind. Please try again later.',
+            HttpStatus.TOO_MANY_REQUESTS,
+            code
+        )
+
+
 class ResourceNotFoundException(ApiResponseException):
     def __init__(self, message: str, code: Optional[ErrorCode] = None):
         ApiResponseException.__init__(
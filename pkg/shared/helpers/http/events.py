@@ -0,0 +1,9 @@
+import json
+from fastapi.encoders import jsonable_encoder
+
+
+KEEPALIVE_EVENT = ': keepalive\n\n'
+
+
+def format_event(data: object) -> str:
+    return f'data: {json.dumps(jsonable_encoder(data))}\n\n'
@@ -0,0 +1,48 @@
+import os
+from typing import Optional, Mapping
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope, Receive, Send
+from pkg.shared.helpers.http.status import HttpStatus
+
+
+def _matches_etag(header: Optional[str], etag: str) -> bool:
+    if header is None:
+        return False
+
+    # If-None-Match compares weakly, a W/ prefix does not prevent a match.
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+# Files served under a strong ETag derived from their name, inode, size and modification time, so that a file rebuilt
+# under the same name gets a new ETag. Range requests, and their If-Range condition, are answered against that ETag:
+# the condition is resolved before the request reaches FileResponse, which then only sees a Range header it should
+# answer, without an If-Range header to check against its own validators.
+class ImmutableFileResponse(FileResponse):
+    def __init__(self, path: str, etag: str, stat_result: os.stat_result, filename: Optional[str] = None, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(path, filename=filename, headers={**(headers or {}), 'etag': etag}, stat_result=stat_result)
+        self.etag = etag
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if_range = Headers(scope=scope).get('if-range')
+
+        if if_range is not None:
+            use_range = if_range.strip() == self.etag
+            scope = {**scope, 'headers': [(name, value) for name, value in scope['headers'] if name != b'if-range' and (use_range or name != b'range')]}
+
+        await super().__call__(scope, receive, send)
+
+    @staticmethod
+    def get_etag(name: str, stat_result: os.stat_result) -> str:
+        return f'"{name}-{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+    @staticmethod
+    def create(path: str, name: str, request_headers: Mapping[str, str], filename: Optional[str] = None, headers: Optional[Mapping[str, str]] = None) -> Response:
+        # The file is stated once, the response is served from the same stat as its ETag.
+        stat_result = os.stat(path)
+        etag = ImmutableFileResponse.get_etag(name, stat_result)
+        if _matches_etag(request_headers.get('if-none-match'), etag):
+            return Response(status_code=HttpStatus.NOT_MODIFIED.value, headers={**(headers or {}), 'etag': etag})
+
+        return ImmutableFileResponse(path, etag, stat_result, filename, headers)
@@ -1 +1,2 @@
 CONTENT_TYPE_FASTA = 'text/x-fasta'
+CONTENT_TYPE_EVENT_STREAM = 'text/event-stream'
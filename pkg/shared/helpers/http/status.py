@@ -4,7 +4,9 @@ from enum import Enum
 class HttpStatus(Enum):
     OK = 200
     CREATED = 201
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     NOT_FOUND = 404
     CONFLICT = 409
+    TOO_MANY_REQUESTS = 429
     INTERNAL_SERVER_ERROR = 500
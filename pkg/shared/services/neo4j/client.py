@@ -1,16 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock, BoundedSemaphore
+from typing import Dict, Any, Optional, Iterator
 from py2neo import Graph
+from py2neo.cypher import Cursor, Record
 from pkg.config import config
 
 
+# Queries hold one of max_connections pooled connections while they run. py2neo fails right away when its pool is
+# full, so callers wait for a slot here instead, for up to the query timeout. py2neo only uses a timeout as a window
+# to retry failed queries in and cannot set one on the transaction, so queries run on a thread of their own and are
+# abandoned after the query timeout. An abandoned query keeps its slot until it returns.
 class GraphDatabaseService:
     instance: 'GraphDatabaseService' = None
-    
-    def __init__(self):
-        self.client = Graph(config.neo4j_db_uri)
-    
+    _instance_lock = Lock()
+
+    def __init__(self, max_connections: int, fetch_size: int, timeout: float):
+        self.fetch_size = fetch_size
+        self.timeout = timeout
+        self.client = Graph(config.neo4j_db_uri, max_size=max_connections)
+
+        self._slots = BoundedSemaphore(max_connections)
+        self._executor = ThreadPoolExecutor(max_connections, thread_name_prefix='neo4j_query')
+
     @staticmethod
     def get_instance() -> 'GraphDatabaseService':
         if GraphDatabaseService.instance is None:
-            GraphDatabaseService.instance = GraphDatabaseService()
-            
+            with GraphDatabaseService._instance_lock:
+                if GraphDatabaseService.instance is None:
+                    GraphDatabaseService.instance = GraphDatabaseService(config.neo4j_max_connections, config.neo4j_fetch_size, config.neo4j_query_timeout)
+
         return GraphDatabaseService.instance
+
+    def query(self, cypher: str, parameters: Optional[Dict[str, Any]] = None) -> Cursor:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f'No Neo4j connection was available within {self.timeout} seconds.')
+
+        future = self._executor.submit(self._run_query, cypher, parameters)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f'Neo4j query did not complete within {self.timeout} seconds.')
+
+    # The records of a query are all fetched before it returns.
+    def _run_query(self, cypher: str, parameters: Optional[Dict[str, Any]]) -> Cursor:
+        try:
+            return self.client.query(cypher, parameters, timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    # Runs the query once per batch of at most fetch_size records, so neither side ever holds the whole result.
+    # The query pages itself by key: it must only return records whose key is greater than $after, ordered by key
+    # and limited to $limit.
+    def stream(self, cypher: str, key: str, parameters: Optional[Dict[str, Any]] = None, after: Any = -1) -> Iterator[Record]:
+        while True:
+            records = list(self.query(cypher, {**(parameters or {}), 'after': after, 'limit': self.fetch_size}))
+            yield from records
+
+            if len(records) < self.fetch_size:
+                return
+
+            after = records[-1][key]
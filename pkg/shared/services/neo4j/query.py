@@ -1,6 +1,6 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Callable, Dict, Any, List, Optional
-from py2neo.cypher import Cursor
+from typing import Generic, TypeVar, Callable, Dict, Any, List, Optional, Union, Iterator
+from py2neo.cypher import Cursor, Record
 import pandas as pd
 import numpy as np
 
@@ -8,23 +8,34 @@ import numpy as np
 _T = TypeVar('_T')
 
 
+# Wraps either the cursor of a single query, or the records of a query streamed in batches, which can only be
+# iterated once.
 class QueryWrapper(Generic[_T]):
-    def __init__(self, cursor: Cursor, mapper_fn: Callable[[QueryWrapper[_T]], _T] = None):
+    def __init__(self, cursor: Union[Cursor, Iterator[Record]], mapper_fn: Callable[[QueryWrapper[_T]], _T] = None):
         self._cursor = cursor
         self.mapper_fn = mapper_fn
 
     @property
-    def cursor(self) -> Cursor:
+    def cursor(self) -> Union[Cursor, Iterator[Record]]:
         return self._cursor
 
     def as_data(self) -> List[Dict[Any, Any]]:
-        return self._cursor.data()
+        if isinstance(self._cursor, Cursor):
+            return self._cursor.data()
+
+        return [dict(record) for record in self._cursor]
 
     def as_df(self) -> pd.DataFrame:
-        return self._cursor.to_data_frame()
+        if isinstance(self._cursor, Cursor):
+            return self._cursor.to_data_frame()
+
+        return pd.DataFrame(self.as_data())
 
     def as_np(self) -> np.array:
-        return self._cursor.to_ndarray()
+        if isinstance(self._cursor, Cursor):
+            return self._cursor.to_ndarray()
+
+        return self.as_df().to_numpy()
 
     def as_mapped_object(self) -> Optional[_T]:
         if not self.mapper_fn:
@@ -13,12 +13,44 @@ class AsyncTaskRedisClientService:
     def resolve_key(self, task_id: str) -> str:
         return f'{self.key_prefix}:{task_id}'
 
+    # Channel notified every time the status of a task is written.
+    def resolve_events_channel(self, task_id: str) -> str:
+        return f'{self.key_prefix}:{task_id}:events'
+
+    # Key holding the result of a task as raw bytes, apart from its status so that it can be read in ranges.
+    def resolve_result_key(self, task_id: str) -> str:
+        return f'{self.key_prefix}:{task_id}:result'
+
+    # The status and its notification are sent in a single round trip.
     def create_task(self, task_id: str, task_data: Any) -> None:
-        self.redis.client.set(self.resolve_key(task_id), json.dumps(task_data), ex=self.ttl)
+        pipeline = self.redis.client.pipeline(transaction=False)
+        pipeline.set(self.resolve_key(task_id), json.dumps(task_data), ex=self.ttl)
+        pipeline.publish(self.resolve_events_channel(task_id), task_id)
+        pipeline.execute()
 
     def update_task(self, task_id: str, task_data: Any) -> None:
-        self.redis.client.set(self.resolve_key(task_id), json.dumps(task_data), keepttl=True, xx=True)
+        pipeline = self.redis.client.pipeline(transaction=False)
+        pipeline.set(self.resolve_key(task_id), json.dumps(task_data), keepttl=True, xx=True)
+        pipeline.publish(self.resolve_events_channel(task_id), task_id)
+        pipeline.execute()
 
     def get_task(self, task_id: str) -> Any:
         cached = self.redis.client.get(self.resolve_key(task_id))
         return safe_json_parse(cached)
+
+    async def get_task_async(self, task_id: str) -> Any:
+        cached = await self.redis.async_client.get(self.resolve_key(task_id))
+        return safe_json_parse(cached)
+
+    def set_result(self, task_id: str, result: bytes) -> None:
+        self.redis.client.set(self.resolve_result_key(task_id), result, ex=self.ttl)
+
+    def get_result_size(self, task_id: str) -> int:
+        return self.redis.client.strlen(self.resolve_result_key(task_id))
+
+    # Bytes of the result from start up to, but excluding, stop.
+    def get_result_range(self, task_id: str, start: int, stop: int) -> bytes:
+        if stop <= start:
+            return b''
+
+        return self.redis.client.getrange(self.resolve_result_key(task_id), start, stop - 1)
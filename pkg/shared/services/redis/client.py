@@ -1,16 +1,115 @@
+import time
 import redis
+from threading import Lock
+import redis.asyncio
+import redis.client
 from pkg.config import config
+from pkg.shared.services.redis.metrics import RedisMetrics
 
 
+_SYNC_POOL_NAME = 'sync'
+_ASYNC_POOL_NAME = 'async'
+
+# Raised by blocking pools when no connection was freed within their timeout.
+_POOL_EXHAUSTED_MESSAGE = 'No connection available.'
+
+
+# Connection pools of a fixed size, callers wait up to REDIS_POOL_TIMEOUT seconds for a free connection.
+class _MeasuredConnectionPool(redis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._measured_connections = set()
+
+    def get_connection(self, command_name, *keys, **options):
+        start = time.perf_counter()
+        try:
+            connection = super().get_connection(command_name, *keys, **options)
+        except redis.ConnectionError as e:
+            if str(e) == _POOL_EXHAUSTED_MESSAGE:
+                RedisMetrics.get_instance().record_timeout(_SYNC_POOL_NAME)
+            raise
+
+        self._measured_connections.add(connection)
+        RedisMetrics.get_instance().record_acquired(_SYNC_POOL_NAME, time.perf_counter() - start)
+        return connection
+
+    # Connections that failed their check are released before being handed out, they were never counted as in use.
+    def release(self, connection):
+        super().release(connection)
+
+        if connection in self._measured_connections:
+            self._measured_connections.discard(connection)
+            RedisMetrics.get_instance().record_released(_SYNC_POOL_NAME)
+
+
+class _MeasuredAsyncConnectionPool(redis.asyncio.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._measured_connections = set()
+
+    async def get_connection(self, command_name, *keys, **options):
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        except redis.ConnectionError as e:
+            if str(e) == _POOL_EXHAUSTED_MESSAGE:
+                RedisMetrics.get_instance().record_timeout(_ASYNC_POOL_NAME)
+            raise
+
+        self._measured_connections.add(connection)
+        RedisMetrics.get_instance().record_acquired(_ASYNC_POOL_NAME, time.perf_counter() - start)
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+
+        if connection in self._measured_connections:
+            self._measured_connections.discard(connection)
+            RedisMetrics.get_instance().record_released(_ASYNC_POOL_NAME)
+
+
+class _MeasuredPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        with RedisMetrics.get_instance().measure_command('PIPELINE'):
+            return super().execute(raise_on_error)
+
+
+class _MeasuredRedis(redis.Redis):
+    def execute_command(self, *args, **options):
+        with RedisMetrics.get_instance().measure_command(str(args[0]).upper()):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return _MeasuredPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class _MeasuredAsyncRedis(redis.asyncio.Redis):
+    async def execute_command(self, *args, **options):
+        with RedisMetrics.get_instance().measure_command(str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+
+
+# The synchronous client serves tasks and workers, the asyncio one the HTTP handlers, each with its own pool.
 class RedisService:
     instance: 'RedisService' = None
+    _instance_lock = Lock()
 
     def __init__(self):
-        self.client = redis.from_url(config.redis_uri)
+        metrics = RedisMetrics.get_instance()
+        metrics.register_pool(_SYNC_POOL_NAME, config.redis_max_connections)
+        metrics.register_pool(_ASYNC_POOL_NAME, config.redis_max_connections)
+
+        pool = _MeasuredConnectionPool.from_url(config.redis_uri, max_connections=config.redis_max_connections, timeout=config.redis_pool_timeout)
+        async_pool = _MeasuredAsyncConnectionPool.from_url(config.redis_uri, max_connections=config.redis_max_connections, timeout=config.redis_pool_timeout)
+
+        self.client = _MeasuredRedis(connection_pool=pool)
+        self.async_client = _MeasuredAsyncRedis(connection_pool=async_pool)
 
     @staticmethod
     def get_instance() -> 'RedisService':
         if RedisService.instance is None:
-            RedisService.instance = RedisService()
+            with RedisService._instance_lock:
+                if RedisService.instance is None:
+                    RedisService.instance = RedisService()
 
         return RedisService.instance
@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterator, Any
+
+
+@dataclass
+class RedisCommandMetrics:
+    calls: int = 0
+    errors: int = 0
+    totalSeconds: float = 0
+    maxSeconds: float = 0
+
+
+@dataclass
+class RedisPoolMetrics:
+    maxConnections: int
+    inUse: int = 0
+    maxInUse: int = 0
+    acquired: int = 0
+    timeouts: int = 0
+    totalWaitSeconds: float = 0
+    maxWaitSeconds: float = 0
+
+
+# Latency of every command sent by this process, per command name, and usage of its connection pools.
+# Waiting for a connection shows up as wait time, and as timeouts once the pool stays saturated for too long.
+class RedisMetrics:
+    instance: 'RedisMetrics' = None
+    _instance_lock = Lock()
+
+    def __init__(self):
+        self.commands: Dict[str, RedisCommandMetrics] = {}
+        self.pools: Dict[str, RedisPoolMetrics] = {}
+
+        self._lock = Lock()
+
+    @staticmethod
+    def get_instance() -> 'RedisMetrics':
+        if RedisMetrics.instance is None:
+            with RedisMetrics._instance_lock:
+                if RedisMetrics.instance is None:
+                    RedisMetrics.instance = RedisMetrics()
+
+        return RedisMetrics.instance
+
+    def register_pool(self, pool_name: str, max_connections: int) -> None:
+        with self._lock:
+            self.pools[pool_name] = RedisPoolMetrics(max_connections)
+
+    @contextmanager
+    def measure_command(self, command_name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        failed = False
+
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                metrics = self.commands.setdefault(command_name, RedisCommandMetrics())
+                metrics.calls += 1
+                metrics.errors += int(failed)
+                metrics.totalSeconds += elapsed
+                metrics.maxSeconds = max(metrics.maxSeconds, elapsed)
+
+    def record_acquired(self, pool_name: str, wait_seconds: float) -> None:
+        with self._lock:
+            metrics = self.pools[pool_name]
+            metrics.inUse += 1
+            metrics.maxInUse = max(metrics.maxInUse, metrics.inUse)
+            metrics.acquired += 1
+            metrics.totalWaitSeconds += wait_seconds
+            metrics.maxWaitSeconds = max(metrics.maxWaitSeconds, wait_seconds)
+
+    def record_released(self, pool_name: str) -> None:
+        with self._lock:
+            self.pools[pool_name].inUse -= 1
+
+    def record_timeout(self, pool_name: str) -> None:
+        with self._lock:
+            self.pools[pool_name].timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'commands': {name: {**metrics.__dict__, 'avgSeconds': metrics.totalSeconds / metrics.calls} for name, metrics in self.commands.items()},
+                'pools': {name: {**metrics.__dict__} for name, metrics in self.pools.items()}
+            }
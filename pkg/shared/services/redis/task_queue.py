@@ -0,0 +1,96 @@
+import json
+from redis.exceptions import WatchError
+from typing import Any, Optional, Dict, Tuple, Protocol
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import TooManyRequestsException
+from pkg.shared.services.redis.client import RedisService
+from pkg.shared.utils.lang import safe_json_parse
+from pkg.shared.utils.task_queue import QueueableTask
+
+
+_JOB_TTL = 60 * 60 * 24
+
+
+class SerializableTask(QueueableTask, Protocol):
+    task_id: str
+
+    def to_job(self) -> Dict[str, Any]:
+        pass
+
+
+# Jobs of a task type wait by id in a pending list, their bodies are kept under their own key. A worker moves the
+# id it takes into its own processing list and removes it once done, so jobs held by a worker that stopped midway
+# are put back in the queue when it starts again under the same id.
+class RedisTaskQueue:
+    def __init__(self, redis: RedisService, name: str, max_size: int):
+        self.redis = redis
+        self.name = name
+        self.max_size = max_size
+
+    def resolve_pending_key(self) -> str:
+        return f'tasks:{self.name}:pending'
+
+    def resolve_processing_key(self, worker_id: str) -> str:
+        return f'tasks:{self.name}:processing:{worker_id}'
+
+    @staticmethod
+    def resolve_job_key(job_id: str) -> str:
+        return f'tasks:job:{job_id}'
+
+    def __len__(self) -> int:
+        return self.redis.client.llen(self.resolve_pending_key())
+
+    # The length of the queue is watched from its check up to the push, a push racing with another submission or a
+    # claim is retried, so the queue never holds more than max_size jobs.
+    def submit(self, task: SerializableTask) -> Optional[int]:
+        pending_key = self.resolve_pending_key()
+        job = json.dumps(task.to_job())
+
+        with self.redis.client.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(pending_key)
+
+                    waiting = pipeline.llen(pending_key)
+                    if waiting >= self.max_size:
+                        raise TooManyRequestsException(f'Too many {self.name} tasks are waiting to run, try again later.', ErrorCode.TASK_QUEUE_FULL)
+
+                    # The status is stored before the job can be taken, so a worker never has it overwritten by the queued one.
+                    position = waiting + 1
+                    task.handle_queued(position)
+
+                    pipeline.multi()
+                    pipeline.set(RedisTaskQueue.resolve_job_key(task.task_id), job, ex=_JOB_TTL)
+                    pipeline.rpush(pending_key, task.task_id)
+                    pipeline.execute()
+
+                    return position
+                except WatchError:
+                    continue
+
+    def get_position(self, job_id: str) -> Optional[int]:
+        index = self.redis.client.lpos(self.resolve_pending_key(), job_id)
+        return index + 1 if index is not None else None
+
+    async def get_position_async(self, job_id: str) -> Optional[int]:
+        index = await self.redis.async_client.lpos(self.resolve_pending_key(), job_id)
+        return index + 1 if index is not None else None
+
+    def claim(self, worker_id: str, timeout: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        job_id = self.redis.client.blmove(self.resolve_pending_key(), self.resolve_processing_key(worker_id), timeout, 'LEFT', 'RIGHT')
+        if job_id is None:
+            return None
+
+        job_id = job_id.decode('utf-8')
+        return job_id, safe_json_parse(self.redis.client.get(RedisTaskQueue.resolve_job_key(job_id)))
+
+    def complete(self, worker_id: str, job_id: str) -> None:
+        self.redis.client.lrem(self.resolve_processing_key(worker_id), 1, job_id)
+        self.redis.client.delete(RedisTaskQueue.resolve_job_key(job_id))
+
+    def recover(self, worker_id: str) -> int:
+        recovered = 0
+        while self.redis.client.lmove(self.resolve_processing_key(worker_id), self.resolve_pending_key(), 'RIGHT', 'LEFT') is not None:
+            recovered += 1
+
+        return recovered
@@ -1,8 +1,19 @@
 import uuid
-from typing import TypeVar, Generic, Union, Optional
-from threading import Thread
+import dataclasses
+from typing import TypeVar, Generic, Union, Optional, Dict, Any
+from threading import Lock
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
+from fastapi.concurrency import run_in_threadpool
+from pkg.config import config
+from pkg.shared.services.redis.client import RedisService
+from pkg.shared.services.redis.task_queue import RedisTaskQueue
+from pkg.shared.utils.task_queue import TaskQueue
+
+
+# Tasks either run on threads of the process that created them, or are queued in Redis for worker processes.
+TASK_EXECUTION_MODE_LOCAL = 'local'
+TASK_EXECUTION_MODE_REDIS = 'redis'
 
 
 _TContext = TypeVar('_TContext')
@@ -18,13 +29,44 @@ class AsyncTaskStatus(Generic[_TContext, _TData, _TException]):
     success: bool
     context: Optional[_TContext]
     data: Optional[Union[_TData, _TException]]
+    queuePosition: Optional[int] = None
+
+
+_task_queues: Dict[str, Union[TaskQueue, RedisTaskQueue]] = {}
+_task_queues_lock = Lock()
+
+
+def get_task_queue(task_name: str) -> Union[TaskQueue, RedisTaskQueue]:
+    with _task_queues_lock:
+        if task_name not in _task_queues:
+            if config.task_execution_mode == TASK_EXECUTION_MODE_REDIS:
+                _task_queues[task_name] = RedisTaskQueue(RedisService.get_instance(), task_name, config.task_queue_size)
+            else:
+                _task_queues[task_name] = TaskQueue(task_name, config.get_task_concurrency(task_name), config.task_queue_size)
+
+        return _task_queues[task_name]
+
+
+# Tasks queued in Redis keep the position they were submitted with, the current one is looked up when read.
+def refresh_queue_position(status: AsyncTaskStatus) -> AsyncTaskStatus:
+    if status.queuePosition is None or config.task_execution_mode != TASK_EXECUTION_MODE_REDIS:
+        return status
+
+    return dataclasses.replace(status, queuePosition=get_task_queue(status.name).get_position(status.id))
+
+
+async def refresh_queue_position_async(status: AsyncTaskStatus) -> AsyncTaskStatus:
+    if status.queuePosition is None or config.task_execution_mode != TASK_EXECUTION_MODE_REDIS:
+        return status
 
+    return dataclasses.replace(status, queuePosition=await get_task_queue(status.name).get_position_async(status.id))
 
-class AsyncTask(ABC, Thread, Generic[_TContext, _TData, _TException]):
+
+class AsyncTask(ABC, Generic[_TContext, _TData, _TException]):
     def __init__(self, name: str):
-        super().__init__()
         self.task_id = str(uuid.uuid4())
         self.name = name
+        self.queue_position: Optional[int] = None
 
     @abstractmethod
     def task(self) -> None:
@@ -40,11 +82,33 @@ class AsyncTask(ABC, Thread, Generic[_TContext, _TData, _TException]):
     def update_status(status: AsyncTaskStatus[_TContext, _TData, Union[_TException, str]]) -> None:
         pass
 
-    def create_status(self, loading: bool, success: bool, context: Optional[_TContext], data: Union[_TData, _TException, str]) -> AsyncTaskStatus[_TContext, _TData, Union[_TException, str]]:
-        return AsyncTaskStatus(self.task_id, self.name, loading, success, context, data)
+    def create_status(self, loading: bool, success: bool, context: Optional[_TContext], data: Union[_TData, _TException, str], queue_position: Optional[int] = None) -> AsyncTaskStatus[_TContext, _TData, Union[_TException, str]]:
+        return AsyncTaskStatus(self.task_id, self.name, loading, success, context, data, queue_position)
 
     def get_init_status(self) -> AsyncTaskStatus[_TContext, _TData, Union[_TException, str]]:
-        return self.create_status(True, False, None, None)
+        return self.create_status(True, False, None, None, self.queue_position)
+
+    # Tasks run on the bounded queue of their type, raising TooManyRequestsException when it is full.
+    def start(self) -> None:
+        get_task_queue(self.name).submit(self)
+
+    # Submitting may wait on the queue and stores the status of the task, so event loop callers leave it to the thread pool.
+    async def start_async(self) -> None:
+        await run_in_threadpool(self.start)
+
+    # Everything a worker process needs to recreate the task with from_job, used when tasks are queued in Redis.
+    @abstractmethod
+    def to_job(self) -> Dict[str, Any]:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def from_job(job: Dict[str, Any]) -> 'AsyncTask':
+        pass
+
+    # Called when the task is submitted and whenever its position in the queue changes.
+    def handle_queued(self, position: Optional[int]) -> None:
+        self.queue_position = position
 
     def handle_error(self, error: Exception) -> None:
         pass
@@ -56,6 +120,8 @@ class AsyncTask(ABC, Thread, Generic[_TContext, _TData, _TException]):
         pass
 
     def run(self) -> None:
+        self.queue_position = None
+
         try:
             self.pre_run()
             self.task()
@@ -1,6 +1,6 @@
 import math
 from dataclasses import dataclass
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Callable
 from fastapi import Request
 from pkg.shared.error.codes import ErrorCode
 from pkg.shared.helpers.http.error import BadRequestException
@@ -105,3 +105,11 @@ def paginate_list(arr: List[_T], page: int, limit: int = _DEFAULT_LIMIT) -> With
     sliced_list = arr[start:start + limit]
 
     return WithPagination(sliced_list, pagination)
+
+
+# Same as paginate_list for sequences that are not held in memory, only the requested slice is fetched.
+def paginate_slice(total: int, get_slice: Callable[[int, int], List[_T]], page: int, limit: int = _DEFAULT_LIMIT) -> WithPagination[_T]:
+    start = (page - 1) * limit
+    pagination = create_pagination(start, total, limit)
+
+    return WithPagination(get_slice(start, start + limit), pagination)
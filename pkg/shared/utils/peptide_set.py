@@ -0,0 +1,150 @@
+import re
+import binascii
+import numpy as np
+from base64 import b64decode, b64encode
+from typing import List, Iterable, Iterator, Tuple, Optional
+from pkg.shared.entity.peptide.models import BasePeptide
+
+
+_RANGE_PATTERN = re.compile(r'^(\d+)(?:-(\d+))?$')
+
+def decode_base64_bitmap(base64string: str) -> np.ndarray:
+    if not len(base64string):
+        raise ValueError('Cannot convert from empty base64 string.')
+
+    try:
+        decoded_bytes = b64decode(base64string, validate=True)
+    except binascii.Error:
+        raise ValueError('Invalid base64 string provided.')
+
+    return np.unpackbits(np.frombuffer(decoded_bytes, dtype=np.uint8)).view(bool)
+
+
+# A set of peptides as a bitmap over peptide numbers, bit n standing for the peptide starPep_n. Bitmaps of the whole
+# corpus are a few kilobytes, so sets are combined and converted with whole array operations. A decoded bitmap is
+# never larger than the base64 string it came from, one built from numbers or ranges is as large as its size or its
+# largest number.
+class PeptideSet:
+    def __init__(self, bits: Optional[np.ndarray] = None):
+        self.bits: np.ndarray = bits if bits is not None else np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.bits))
+
+    def __contains__(self, number: int) -> bool:
+        return 0 <= number < len(self.bits) and bool(self.bits[number])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.get_numbers().tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PeptideSet):
+            return NotImplemented
+
+        bits, other_bits = self._align(other)
+        return bool(np.array_equal(bits, other_bits))
+
+    def __or__(self, other: 'PeptideSet') -> 'PeptideSet':
+        bits, other_bits = self._align(other)
+        return PeptideSet(bits | other_bits)
+
+    def __and__(self, other: 'PeptideSet') -> 'PeptideSet':
+        bits, other_bits = self._align(other)
+        return PeptideSet(bits & other_bits)
+
+    def __sub__(self, other: 'PeptideSet') -> 'PeptideSet':
+        bits, other_bits = self._align(other)
+        return PeptideSet(bits & ~other_bits)
+
+    def union(self, other: 'PeptideSet') -> 'PeptideSet':
+        return self | other
+
+    def intersection(self, other: 'PeptideSet') -> 'PeptideSet':
+        return self & other
+
+    def difference(self, other: 'PeptideSet') -> 'PeptideSet':
+        return self - other
+
+    # Both bitmaps padded with zeros to the longest of them.
+    def _align(self, other: 'PeptideSet') -> Tuple[np.ndarray, np.ndarray]:
+        size = max(len(self.bits), len(other.bits))
+        return PeptideSet._pad(self.bits, size), PeptideSet._pad(other.bits, size)
+
+    @staticmethod
+    def _pad(bits: np.ndarray, size: int) -> np.ndarray:
+        if len(bits) >= size:
+            return bits
+
+        return np.concatenate((bits, np.zeros(size - len(bits), dtype=bool)))
+
+    def get_numbers(self) -> np.ndarray:
+        return np.flatnonzero(self.bits)
+
+    def to_ids(self) -> List[str]:
+        return [BasePeptide.format_id(number) for number in self.get_numbers().tolist()]
+
+    # Bitmaps are padded to whole bytes.
+    def to_base64(self) -> str:
+        return b64encode(np.packbits(self.bits).tobytes()).decode('ascii')
+
+    # Runs of consecutive peptide numbers, such as 1-200,305,400-410, with inclusive bounds.
+    def to_ranges(self) -> str:
+        numbers = self.get_numbers()
+        if len(numbers) == 0:
+            return ''
+
+        breaks = np.flatnonzero(np.diff(numbers) != 1)
+        starts = numbers[np.concatenate(([0], breaks + 1))]
+        ends = numbers[np.concatenate((breaks, [len(numbers) - 1]))]
+
+        return ','.join(str(start) if start == end else f'{start}-{end}' for start, end in zip(starts.tolist(), ends.tolist()))
+
+    # Numbers at or above size are rejected, so a bitmap sized to the corpus lines up with any other one.
+    @staticmethod
+    def from_numbers(numbers: Iterable[int], size: Optional[int] = None) -> 'PeptideSet':
+        numbers = np.fromiter(numbers, dtype=np.int64)
+        if len(numbers) > 0 and numbers.min() < 0:
+            raise ValueError('Peptide numbers cannot be negative.')
+
+        if size is not None and len(numbers) > 0 and numbers.max() >= size:
+            raise ValueError(f'Peptide numbers must be lower than {size}.')
+
+        if size is None:
+            size = int(numbers.max()) + 1 if len(numbers) > 0 else 0
+
+        bits = np.zeros(size, dtype=bool)
+        bits[numbers] = True
+
+        return PeptideSet(bits)
+
+    @staticmethod
+    def from_ids(peptide_ids: Iterable[str], size: Optional[int] = None) -> 'PeptideSet':
+        return PeptideSet.from_numbers((BasePeptide.parse_id(peptide_id) for peptide_id in peptide_ids), size)
+
+    @staticmethod
+    def from_base64(base64string: str) -> 'PeptideSet':
+        return PeptideSet(decode_base64_bitmap(base64string))
+
+    # A few characters of ranges can span any number of peptides, so they are bounded by the size of the bitmap.
+    @staticmethod
+    def from_ranges(ranges: str, size: int) -> 'PeptideSet':
+        bounds = []
+        for expression in (part.strip() for part in ranges.split(',') if part.strip()):
+            match = _RANGE_PATTERN.match(expression)
+            if match is None:
+                raise ValueError(f'Invalid range {expression} provided, ranges must look like 1-200,305.')
+
+            start, end = int(match.group(1)), int(match.group(2) or match.group(1))
+            if end < start:
+                raise ValueError(f'Invalid range {expression} provided, its end is lower than its start.')
+
+            if end >= size:
+                raise ValueError(f'Invalid range {expression} provided, peptide numbers must be lower than {size}.')
+
+            bounds.append((start, end))
+
+        bits = np.zeros(size, dtype=bool)
+        for start, end in bounds:
+            bits[start:end + 1] = True
+
+        return PeptideSet(bits)
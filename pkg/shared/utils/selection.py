@@ -0,0 +1,42 @@
+import heapq
+from typing import TypeVar, Generic, Optional, List, Tuple, Iterable
+
+
+_T = TypeVar('_T')
+
+
+class TopSelection(Generic[_T]):
+    # Keeps the items with the highest scores, ties broken by the lowest index. When a limit is set, only that
+    # many items are held at any time in a min-heap whose root is the weakest item currently selected.
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self._entries: List[Tuple[float, int, _T]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_full(self) -> bool:
+        return self.limit is not None and len(self._entries) >= self.limit
+
+    def get_floor(self) -> Optional[float]:
+        if not self.is_full():
+            return None
+
+        return self._entries[0][0]
+
+    def push(self, score: float, index: int, item: _T) -> None:
+        entry = (score, -index, item)
+
+        if self.limit is None:
+            self._entries.append(entry)
+        elif len(self._entries) < self.limit:
+            heapq.heappush(self._entries, entry)
+        elif entry[:2] > self._entries[0][:2]:
+            heapq.heapreplace(self._entries, entry)
+
+    def extend(self, entries: Iterable[Tuple[float, int, _T]]) -> None:
+        for score, index, item in entries:
+            self.push(score, index, item)
+
+    def get_sorted(self) -> List[_T]:
+        return [item for _, _, item in sorted(self._entries, key=lambda n: (-n[0], -n[1]))]
@@ -0,0 +1,125 @@
+from collections import deque
+from threading import Thread, Condition, Lock
+from typing import Deque, Dict, List, Optional, Protocol, Set, Tuple
+from pkg.shared.error.codes import ErrorCode
+from pkg.shared.helpers.http.error import TooManyRequestsException
+
+
+class QueueableTask(Protocol):
+    def run(self) -> None:
+        pass
+
+    def handle_queued(self, position: Optional[int]) -> None:
+        pass
+
+
+class TaskQueue:
+    # Runs tasks in submission order on a fixed number of worker threads. At most max_size tasks wait for a free
+    # worker, further submissions are rejected. Waiting tasks are told their position, 1 being the next to run,
+    # every time it changes; tasks that will run right away are given None. Positions are worked out under the queue
+    # condition but handed to the tasks after it is released, one publication at a time, so a slow handle_queued
+    # never holds up the queue. A publication made stale by a later one, or by its task starting, is skipped.
+    def __init__(self, name: str, concurrency: int, max_size: int):
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.max_size = max_size
+
+        self._pending: Deque[QueueableTask] = deque()
+        self._running = 0
+        self._condition = Condition()
+        self._publish_lock = Lock()
+        self._version = 0
+        self._queued_versions: Dict[int, int] = {}
+        self._withdrawn: Set[int] = set()
+        self._workers: List[Thread] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def get_running_count(self) -> int:
+        return self._running
+
+    # The publish lock is taken first, so a worker taking the task right away waits for its first position.
+    def submit(self, task: QueueableTask) -> Optional[int]:
+        with self._publish_lock:
+            with self._condition:
+                position = self._get_position(len(self._pending))
+                if position is not None and position > self.max_size:
+                    raise TooManyRequestsException(f'Too many {self.name} tasks are waiting to run, try again later.', ErrorCode.TASK_QUEUE_FULL)
+
+                self._start_workers()
+
+                self._version += 1
+                self._queued_versions[id(task)] = self._version
+                self._pending.append(task)
+                self._condition.notify()
+
+            # A task whose first position could not be handed over is withdrawn, even if a worker already took it.
+            try:
+                task.handle_queued(position)
+            except Exception:
+                with self._condition:
+                    self._queued_versions.pop(id(task), None)
+                    if task in self._pending:
+                        self._pending.remove(task)
+                    else:
+                        self._withdrawn.add(id(task))
+                raise
+
+            return position
+
+    def _get_position(self, index: int) -> Optional[int]:
+        position = index + 1 - (self.concurrency - self._running)
+        return position if position > 0 else None
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.concurrency:
+            worker = Thread(target=self._work, name=f'{self.name}_worker_{len(self._workers)}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _publish(self, updates: List[Tuple[QueueableTask, Optional[int], int]]) -> None:
+        with self._publish_lock:
+            for task, position, version in updates:
+                if self._queued_versions.get(id(task)) != version:
+                    continue
+
+                try:
+                    task.handle_queued(position)
+                except Exception as e:
+                    print(f'Error updating the queue positions of {self.name} tasks')
+                    print(e)
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                task = self._pending.popleft()
+                self._queued_versions.pop(id(task), None)
+                self._running += 1
+
+                self._version += 1
+                updates = []
+                for index, pending_task in enumerate(self._pending):
+                    self._queued_versions[id(pending_task)] = self._version
+                    updates.append((pending_task, self._get_position(index), self._version))
+
+            # Also waits for any publication still in progress, so the task never hears of its position after starting.
+            self._publish(updates)
+
+            with self._condition:
+                if id(task) in self._withdrawn:
+                    self._withdrawn.discard(id(task))
+                    self._running -= 1
+                    continue
+
+            try:
+                task.run()
+            except Exception as e:
+                print(f'Unhandled error in a {self.name} task')
+                print(e)
+            finally:
+                with self._condition:
+                    self._running -= 1
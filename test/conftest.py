@@ -0,0 +1,53 @@
+import random
+import fakeredis
+import pytest
+from typing import List, Dict, Any
+from pkg.shared.entity.peptide.corpus import PeptideCorpus, PeptideCorpusService
+from pkg.shared.entity.peptide.store import PeptideStore, SEARCH_ATTRIBUTE_PROPERTIES
+from pkg.shared.services.redis.client import RedisService
+
+
+_AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+
+
+# Rows as streamed from Neo4j, with odd peptide ids and a fifth of the sequences repeated.
+def create_peptide_rows(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    generator = random.Random(seed)
+    rows, sequences = [], []
+
+    for position in range(count):
+        if sequences and generator.random() < 0.2:
+            sequence = generator.choice(sequences)
+        else:
+            sequence = ''.join(generator.choice(_AMINO_ACIDS) for _ in range(generator.randint(5, 40)))
+            sequences.append(sequence)
+
+        attributes = {prop: round(generator.uniform(-5, 5), 3) for prop in SEARCH_ATTRIBUTE_PROPERTIES.values()}
+        attributes['charge'] = generator.randint(-3, 6)
+        rows.append({'id': position * 2 + 1, 'seq': sequence, 'length': len(sequence), 'attributes': attributes})
+
+    return rows
+
+
+@pytest.fixture
+def redis_service(monkeypatch) -> RedisService:
+    server = fakeredis.FakeServer()
+
+    service = RedisService.__new__(RedisService)
+    service.client = fakeredis.FakeRedis(server=server)
+    service.async_client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(RedisService, 'instance', service)
+
+    return service
+
+
+# The corpus every service of the process is served, without Neo4j.
+@pytest.fixture
+def corpus(monkeypatch, redis_service) -> PeptideCorpus:
+    corpus = PeptideCorpus.from_store(PeptideStore.from_neo4j_rows(create_peptide_rows(600)), 'marker')
+
+    service = PeptideCorpusService(300, 86400)
+    service._corpus = corpus
+    monkeypatch.setattr(PeptideCorpusService, 'instance', service)
+
+    return corpus
@@ -0,0 +1,69 @@
+import os
+from pkg.shared.entity.export.artifacts import ExportArtifactCache, get_artifact_key
+from pkg.shared.entity.export.models import SearchExportForm
+
+
+_PEPTIDE_IDS = ['starPep_00010', 'starPep_00002', 'starPep_00009']
+
+
+def _add_artifact(cache: ExportArtifactCache, key: str, size: int, mtime: int) -> str:
+    partial_path = cache.get_partial_path(key)
+    with open(partial_path, 'wb') as file:
+        file.write(b'0' * size)
+
+    path = cache.add(key, partial_path)
+    os.utime(path, (mtime, mtime))
+
+    return path
+
+
+class TestGetArtifactKey:
+    def test_should_depend_on_the_order_of_peptides(self):
+        form = SearchExportForm(fasta=True)
+        assert get_artifact_key(_PEPTIDE_IDS, form) != get_artifact_key(list(reversed(_PEPTIDE_IDS)), form)
+
+    def test_should_ignore_the_order_of_resources(self):
+        assert get_artifact_key(_PEPTIDE_IDS, SearchExportForm(fasta=True, pdb=True)) == get_artifact_key(_PEPTIDE_IDS, SearchExportForm(pdb=True, fasta=True))
+
+    def test_should_depend_on_peptides_and_resources(self):
+        key = get_artifact_key(_PEPTIDE_IDS, SearchExportForm(fasta=True))
+
+        assert get_artifact_key(_PEPTIDE_IDS[:2], SearchExportForm(fasta=True)) != key
+        assert get_artifact_key(_PEPTIDE_IDS, SearchExportForm(fasta=True, pdb=True)) != key
+
+    def test_should_only_depend_on_format_with_embedding_resources(self):
+        assert get_artifact_key(_PEPTIDE_IDS, SearchExportForm(fasta=True, format='npy')) == get_artifact_key(_PEPTIDE_IDS, SearchExportForm(fasta=True, format='csv'))
+        assert get_artifact_key(_PEPTIDE_IDS, SearchExportForm(esmMean=True, format='npy')) != get_artifact_key(_PEPTIDE_IDS, SearchExportForm(esmMean=True, format='csv'))
+
+
+class TestExportArtifactCache:
+    def test_should_evict_least_recently_used_artifacts(self, tmp_path):
+        cache = ExportArtifactCache(str(tmp_path), 250)
+        _add_artifact(cache, 'first', 100, 1000)
+        _add_artifact(cache, 'second', 100, 2000)
+
+        # Reusing the first artifact makes the second the least recently used.
+        assert cache.get('first') is not None
+        _add_artifact(cache, 'third', 100, 3000)
+
+        assert cache.get('second') is None
+        assert cache.get('first') is not None
+        assert cache.get('third') is not None
+
+    def test_should_keep_the_added_artifact_even_if_too_large(self, tmp_path):
+        cache = ExportArtifactCache(str(tmp_path), 50)
+        _add_artifact(cache, 'first', 10, 1000)
+        path = _add_artifact(cache, 'large', 100, 2000)
+
+        assert cache.get('first') is None
+        assert os.path.exists(path)
+
+    def test_should_remove_links_to_evicted_artifacts(self, tmp_path):
+        cache = ExportArtifactCache(str(tmp_path), 150)
+        _add_artifact(cache, 'first', 100, 1000)
+        cache.link('first', 'export-1.zip')
+        second_link = cache.link('first', 'export-2.zip')
+        _add_artifact(cache, 'second', 100, 2000)
+
+        assert not os.path.lexists(second_link)
+        assert sorted(os.listdir(tmp_path)) == [ExportArtifactCache.get_artifact_name('second')]
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pkg.shared.entity.export.embeddings as module
+from pkg.shared.entity.export.embeddings import EmbeddingMatrix, EmbeddingMatrixService
+
+
+def _save_matrix(directory: str, numbers: list) -> None:
+    np.save(EmbeddingMatrix.get_matrix_path(directory), np.ones((len(numbers), 2), dtype=np.float32))
+    np.save(EmbeddingMatrix.get_columns_path(directory), np.array(['a', 'b']))
+    np.save(EmbeddingMatrix.get_numbers_path(directory), np.array(numbers, dtype=np.int64))
+
+
+class TestEmbeddingMatrixService:
+    def test_should_map_matrices_on_preload_and_serve_them_without_checking_files(self, tmp_path, monkeypatch):
+        directory, missing = str(tmp_path / 'esm-mean'), str(tmp_path / 'ifeature-aac-20')
+        _save_matrix(directory, [1, 3])
+        service = EmbeddingMatrixService()
+
+        service.preload([directory, missing])
+
+        checks = []
+        getmtime = os.path.getmtime
+        monkeypatch.setattr(os.path, 'getmtime', lambda path: checks.append(path) or getmtime(path))
+
+        assert service.get_matrix(directory).numbers.tolist() == [1, 3]
+        assert service.get_matrix(missing) is None
+        assert checks == []
+
+    def test_should_map_rebuilt_matrices_once_checked_again(self, tmp_path, monkeypatch):
+        directory = str(tmp_path / 'esm-mean')
+        _save_matrix(directory, [1, 3])
+        service = EmbeddingMatrixService()
+        matrix = service.get_matrix(directory)
+
+        _save_matrix(directory, [1, 3, 5])
+        os.utime(EmbeddingMatrix.get_numbers_path(directory), (1, 1))
+        assert service.get_matrix(directory) is matrix
+
+        monkeypatch.setattr(module, '_MATRIX_CHECK_INTERVAL', 0)
+        assert service.get_matrix(directory).numbers.tolist() == [1, 3, 5]
+
+    def test_should_keep_the_mapping_of_unchanged_matrices(self, tmp_path, monkeypatch):
+        directory = str(tmp_path / 'esm-mean')
+        _save_matrix(directory, [1, 3])
+        service = EmbeddingMatrixService()
+        monkeypatch.setattr(module, '_MATRIX_CHECK_INTERVAL', 0)
+
+        assert service.get_matrix(directory) is service.get_matrix(directory)
+
+    def test_should_map_matrices_packed_after_start(self, tmp_path, monkeypatch):
+        directory = str(tmp_path / 'esm-mean')
+        service = EmbeddingMatrixService()
+        monkeypatch.setattr(module, '_MATRIX_CHECK_INTERVAL', 0)
+
+        assert service.get_matrix(directory) is None
+
+        _save_matrix(directory, [7])
+        assert service.get_matrix(directory).numbers.tolist() == [7]
@@ -0,0 +1,132 @@
+import os
+import zlib
+import zipfile
+import pytest
+import pkg.shared.entity.export.utils as module
+from pkg.config import config
+from pkg.shared.entity.export.artifacts import ExportArtifactCache
+from pkg.shared.entity.export.models import SearchExportForm
+from pkg.shared.entity.export.packs import AssetPackService
+
+
+_PEPTIDE_IDS = ['starPep_00010', 'starPep_00002', 'starPep_00009', 'starPep_00100']
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    assets_location, artifacts_location = tmp_path / 'assets', tmp_path / 'artifacts'
+    fasta_directory, pdb_directory = assets_location / 'peptides' / 'fasta', assets_location / 'peptides' / 'pdb'
+    for directory in (fasta_directory, pdb_directory, artifacts_location):
+        directory.mkdir(parents=True)
+
+    for number, peptide_id in enumerate(_PEPTIDE_IDS):
+        (fasta_directory / f'{peptide_id}.fasta').write_text(f'>{peptide_id}\n{"ACDEFGHIK"[:number + 3]}\n')
+        (pdb_directory / f'{peptide_id}.pdb').write_text(f'ATOM {number}\n')
+
+    monkeypatch.setattr(config, 'assets_location', str(assets_location))
+    monkeypatch.setattr(config, 'temp_artifacts_location', str(artifacts_location))
+    monkeypatch.setattr(ExportArtifactCache, 'instance', ExportArtifactCache(str(artifacts_location), 1024 * 1024))
+
+    return artifacts_location
+
+
+class TestCreateZipArchive:
+    def test_should_rebuild_evicted_archive_with_same_bytes(self, assets):
+        form = SearchExportForm(fasta=True, pdb=True)
+
+        name = module.create_zip_archive('export-1', _PEPTIDE_IDS, form, None)
+        built = (assets / name).read_bytes()
+
+        os.remove(assets / name)
+        rebuilt_name = module.create_zip_archive('export-2', _PEPTIDE_IDS, form, None)
+
+        assert rebuilt_name == name
+        assert (assets / name).read_bytes() == built
+
+    def test_should_write_peptides_in_the_given_order(self, assets):
+        name = module.create_zip_archive('export-1', _PEPTIDE_IDS, SearchExportForm(fasta=True, pdb=True), None)
+
+        with zipfile.ZipFile(assets / name) as archive:
+            fasta = archive.read([entry for entry in archive.namelist() if entry.endswith('.fasta')][0]).decode('utf-8')
+            pdb_entries = [entry for entry in archive.namelist() if entry.startswith('pdb/') and entry.endswith('.pdb')]
+
+        assert [line[1:] for line in fasta.splitlines() if line.startswith('>')] == _PEPTIDE_IDS
+        assert pdb_entries == [f'pdb/{peptide_id}.pdb' for peptide_id in _PEPTIDE_IDS]
+
+    def test_should_keep_the_order_of_each_export_of_the_same_peptides(self, assets):
+        form = SearchExportForm(fasta=True)
+        names = [module.create_zip_archive('export-1', _PEPTIDE_IDS, form, None), module.create_zip_archive('export-2', list(reversed(_PEPTIDE_IDS)), form, None)]
+
+        orders = []
+        for name in names:
+            with zipfile.ZipFile(assets / name) as archive:
+                fasta = archive.read([entry for entry in archive.namelist() if entry.endswith('.fasta')][0]).decode('utf-8')
+                orders.append([line[1:] for line in fasta.splitlines() if line.startswith('>')])
+
+        assert names[0] != names[1]
+        assert orders == [_PEPTIDE_IDS, list(reversed(_PEPTIDE_IDS))]
+
+    def test_should_look_up_packs_once_per_resource(self, assets, monkeypatch):
+        monkeypatch.setattr(AssetPackService, 'instance', AssetPackService())
+        module.pack_resource_assets()
+
+        lookups = []
+        get_pack = AssetPackService.get_pack
+        monkeypatch.setattr(AssetPackService, 'get_pack', lambda service, directory: lookups.append(directory) or get_pack(service, directory))
+
+        name = module.create_zip_archive('export-1', _PEPTIDE_IDS, SearchExportForm(fasta=True, pdb=True), None)
+
+        assert sorted(os.path.basename(directory) for directory in lookups) == ['fasta', 'pdb']
+        with zipfile.ZipFile(assets / name) as archive:
+            assert archive.read(f'pdb/{_PEPTIDE_IDS[0]}.pdb') == b'ATOM 0\n'
+
+    def test_should_report_resources_as_written_and_all_at_once_when_reused(self, assets):
+        form = SearchExportForm(fasta=True, pdb=True)
+        built, reused = [], []
+
+        module.create_zip_archive('export-1', _PEPTIDE_IDS, form, built.append)
+        module.create_zip_archive('export-2', _PEPTIDE_IDS, form, reused.append)
+
+        assert built == [['fasta'], ['pdb']]
+        assert reused == [['fasta', 'pdb']]
+
+    def test_should_read_the_following_resources_while_writing_one(self, assets, monkeypatch):
+        pdb_reads, pdb_reads_when_fasta_written = [], []
+        read_file = module._read_file
+        monkeypatch.setattr(module, '_read_file', lambda assets, index, peptide_id: pdb_reads.append(peptide_id) or read_file(assets, index, peptide_id))
+
+        def on_resources_complete(resources):
+            if resources == ['fasta']:
+                pdb_reads_when_fasta_written.append(len(pdb_reads))
+
+        name = module.create_zip_archive('export-1', _PEPTIDE_IDS, SearchExportForm(fasta=True, pdb=True), on_resources_complete)
+
+        assert pdb_reads_when_fasta_written[0] > 0
+        with zipfile.ZipFile(assets / name) as archive:
+            assert [archive.read(f'pdb/{peptide_id}.pdb') for peptide_id in _PEPTIDE_IDS] == [f'ATOM {number}\n'.encode('utf-8') for number in range(len(_PEPTIDE_IDS))]
+
+
+class TestOpenEntry:
+    @pytest.mark.parametrize('level', [1, 9])
+    def test_should_compress_with_the_level_of_the_resource(self, tmp_path, monkeypatch, level):
+        monkeypatch.setattr(config, 'export_compression_levels', {'fasta': level})
+        content = b''.join(f'>starPep_{number:05d}\n{"ACDEFGHIKLMNPQRSTVWY" * (number % 7 + 1)}\n'.encode('utf-8') for number in range(5000))
+
+        with zipfile.ZipFile(tmp_path / 'archive.zip', 'w') as archive:
+            with module._open_entry(archive, 'entry.fasta', 'fasta') as output:
+                output.write(content)
+
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        with zipfile.ZipFile(tmp_path / 'archive.zip') as archive:
+            assert archive.getinfo('entry.fasta').compress_size == len(compressor.compress(content) + compressor.flush())
+            assert archive.read('entry.fasta') == content
+
+    def test_should_store_entries_of_resources_without_compression(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, 'export_compression_levels', {'pdb': 0})
+
+        with zipfile.ZipFile(tmp_path / 'archive.zip', 'w') as archive:
+            with module._open_entry(archive, 'entry.pdb', 'pdb') as output:
+                output.write(b'ATOM 0\n')
+
+        with zipfile.ZipFile(tmp_path / 'archive.zip') as archive:
+            assert archive.getinfo('entry.pdb').compress_type == zipfile.ZIP_STORED
@@ -0,0 +1,76 @@
+import pytest
+from statistics import mean
+from pkg.shared.entity.search.engine import AlignmentEngine
+from pkg.shared.entity.search.multi_query.alignment import align_multi_query
+from pkg.shared.entity.search.multi_query.model import MultiAlignmentOptions
+from pkg.shared.entity.search.single_query.alignment import align_single_query
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+from pkg.shared.helpers.bio.matrix import get_aligner, get_query_max_score
+
+
+_QUERIES = ['KWLRRVWKLLGKAV', 'GIGKFLHSAKKF', 'FLPIIAGVAAKV']
+
+
+@pytest.fixture(autouse=True)
+def engine(monkeypatch) -> AlignmentEngine:
+    engine = AlignmentEngine(1, 97)
+    monkeypatch.setattr(AlignmentEngine, 'instance', engine)
+
+    return engine
+
+
+# Every peptide aligned against every query, ranked as the search ranks its hits: highest score, then lowest index.
+def _rank_unpruned(store, queries, options, get_score):
+    aligner = get_aligner(options.matrix, options.alg)
+    max_scores = [get_query_max_score(options.matrix, query) for query in queries]
+
+    hits = []
+    for index in range(len(store)):
+        ratios = [round(aligner.score(store.get_alignment_sequence(index), query) / max_score, 2) for query, max_score in zip(queries, max_scores)]
+        score = get_score(ratios)
+
+        if score >= options.threshold:
+            hits.append((score, index))
+
+    hits.sort(key=lambda hit: (-hit[0], hit[1]))
+    return [(store.get_id(index), score) for score, index in hits[:options.max_quantity]]
+
+
+_CRITERIA = {
+    'avg': lambda ratios: round(mean(ratios), 2),
+    'max': lambda ratios: round(max(ratios), 2),
+    'min': lambda ratios: round(min(ratios), 2)
+}
+
+
+class TestPrunedAlignment:
+    @pytest.mark.parametrize('engine_name', ['pairwise', 'vectorized'])
+    @pytest.mark.parametrize('alg', ['local', 'global'])
+    @pytest.mark.parametrize('threshold, max_quantity', [(0.1, 25), (0.3, None), (0.05, 1)])
+    def test_single_query_should_match_unpruned_ranking(self, corpus, engine_name, alg, threshold, max_quantity):
+        options = SingleAlignmentOptions(alg, 'BLOSUM62', threshold, max_quantity, engine_name)
+
+        for query in _QUERIES:
+            peptides, statistics = align_single_query(corpus, query, options)
+
+            assert [(peptide.id, peptide.score) for peptide in peptides] == _rank_unpruned(corpus.store, [query], options, lambda ratios: ratios[0])
+            assert statistics.aligned + statistics.memoized + statistics.pruned == statistics.unique
+
+    @pytest.mark.parametrize('criterion', ['avg', 'max', 'min'])
+    @pytest.mark.parametrize('threshold, max_quantity', [(0.1, 25), (0.2, None)])
+    def test_multi_query_should_match_unpruned_ranking(self, corpus, criterion, threshold, max_quantity):
+        options = MultiAlignmentOptions('local', 'BLOSUM62', threshold, max_quantity, 'vectorized', criterion)
+
+        peptides, _ = align_multi_query(corpus, _QUERIES, options)
+
+        assert [(peptide.id, peptide.score) for peptide in peptides] == _rank_unpruned(corpus.store, _QUERIES, options, _CRITERIA[criterion])
+
+    def test_should_prune_with_bounds_above_every_score(self, corpus):
+        store = corpus.store
+        aligner = get_aligner('BLOSUM62', 'local')
+
+        for query in _QUERIES:
+            bounds = corpus.index.get_upper_bounds('BLOSUM62', query)
+            scores = [aligner.score(store.get_alignment_sequence(int(index)), query) for index in store.group_representatives]
+
+            assert all(bound >= score for bound, score in zip(bounds.tolist(), scores))
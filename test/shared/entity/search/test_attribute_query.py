@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.attribute_query.index import AttributeIndex
+from pkg.shared.entity.search.view import SearchResultQuery, FILTER_OPERATORS
+from pkg.shared.utils.peptide_set import PeptideSet
+from test.conftest import create_peptide_rows
+
+
+@pytest.fixture
+def index(corpus) -> AttributeIndex:
+    return AttributeIndex(corpus.store)
+
+
+# The corpus with some peptides without a value for hydropathicity, and some with a molecular weight, the other
+# peptides missing it as Neo4j does not always hold it.
+@pytest.fixture
+def partial_store() -> PeptideStore:
+    rows = create_peptide_rows(200)
+    for position, row in enumerate(rows):
+        if position % 5 == 0:
+            row['attributes']['hydropathicity'] = None
+
+        if position % 3 == 0:
+            row['attributes']['mol_wt'] = float(position % 4)
+
+    return PeptideStore.from_neo4j_rows(rows)
+
+
+# Every peptide checked against every filter, by peptide id unless sorted, ties in peptide id order. Peptides without
+# a value for a filtered field are left out.
+def _select_brute_force(store, query):
+    columns = store.get_columns()
+    rows = [
+        row for row in range(len(store))
+        if all(
+            not np.isnan(columns[condition.field][row]) and FILTER_OPERATORS[condition.operator](columns[condition.field][row], condition.value)
+            for condition in query.filters
+        )
+    ]
+
+    if query.sort is None:
+        return sorted(rows, key=lambda row: store.ids[row])
+
+    sign = -1 if query.descending else 1
+    return sorted(rows, key=lambda row: (sign * columns[query.sort][row], store.ids[row]))
+
+
+def _select(index, sort, filters):
+    return index.select(SearchResultQuery.create_from_expressions(sort, filters)).tolist()
+
+
+class TestAttributeIndex:
+    @pytest.mark.parametrize('operator', ['>=', '>', '<=', '<', '=', '!='])
+    @pytest.mark.parametrize('value', [-4, -3, 2, 2.5, 6, 7])
+    def test_charge_filter_should_match_brute_force(self, corpus, index, operator, value):
+        query = SearchResultQuery.create_from_expressions(None, [f'charge{operator}{value}'])
+
+        assert index.select(query).tolist() == _select_brute_force(corpus.store, query)
+
+    def test_inclusive_bounds_should_keep_their_edges(self, corpus, index):
+        charges = corpus.store.get_columns()['charge']
+        lowest, highest = int(charges.min()), int(charges.max())
+
+        at_lowest = _select(index, None, [f'charge<={lowest}'])
+        at_highest = _select(index, None, [f'charge>={highest}'])
+
+        assert len(at_lowest) > 0 and all(charges[row] == lowest for row in at_lowest)
+        assert len(at_highest) > 0 and all(charges[row] == highest for row in at_highest)
+        assert _select(index, None, [f'charge>={lowest}', f'charge<={highest}']) == list(range(len(corpus.store)))
+        assert _select(index, None, ['charge>=2', 'charge<=2']) == _select(index, None, ['charge=2'])
+
+    def test_exclusive_bounds_should_leave_their_edges_out(self, corpus, index):
+        charges = corpus.store.get_columns()['charge']
+        lowest, highest = int(charges.min()), int(charges.max())
+
+        assert _select(index, None, [f'charge<{lowest}']) == []
+        assert _select(index, None, [f'charge>{highest}']) == []
+        assert all(lowest < charges[row] < highest for row in _select(index, None, [f'charge>{lowest}', f'charge<{highest}']))
+
+    @pytest.mark.parametrize('filters', [
+        ['charge>3', 'charge<3'],
+        ['charge>=4', 'charge<=3'],
+        ['length>40'],
+        ['length<5'],
+        ['charge=2.5'],
+        ['molWt>=0'],
+        ['molWt<0']
+    ])
+    def test_filters_without_matches_should_select_nothing(self, index, filters):
+        assert _select(index, None, filters) == []
+        assert _select(index, '-charge', filters) == []
+
+    def test_missing_values_should_match_no_filter(self, index):
+        assert _select(index, None, ['molWt!=0']) == []
+
+    @pytest.mark.parametrize('filters', [
+        ['hydropathicity!=0'],
+        ['hydropathicity>=-5', 'hydropathicity<=5'],
+        ['molWt!=1'],
+        ['molWt>=0'],
+        ['molWt<=1', 'molWt!=0'],
+        ['molWt=2', 'hydropathicity!=0'],
+        ['charge!=2', 'hydropathicity!=1']
+    ])
+    def test_partially_missing_values_should_match_brute_force(self, partial_store, filters):
+        query = SearchResultQuery.create_from_expressions(None, filters)
+        rows = AttributeIndex(partial_store).select(query).tolist()
+        columns = partial_store.get_columns()
+
+        assert rows == _select_brute_force(partial_store, query)
+        assert all(not np.isnan(columns[condition.field][row]) for row in rows for condition in query.filters)
+        assert 0 < len(rows) < len(partial_store)
+
+    @pytest.mark.parametrize('sort', ['charge', '-charge', 'length', '-hydropathicity'])
+    @pytest.mark.parametrize('filters', [[], ['charge>=0', 'length<=20'], ['length>=10', 'length<=10', 'charge!=1']])
+    def test_sorted_ranges_should_match_brute_force(self, corpus, index, sort, filters):
+        query = SearchResultQuery.create_from_expressions(sort, filters)
+
+        assert index.select(query).tolist() == _select_brute_force(corpus.store, query)
+
+    def test_bitmap_should_hold_selected_peptides(self, corpus, index):
+        rows = index.select(SearchResultQuery.create_from_expressions(None, ['charge>=5', 'length<=30']))
+        peptide_set = PeptideSet.from_base64(index.get_bitmap(rows))
+
+        assert peptide_set.to_ids() == [corpus.store.get_id(row) for row in rows.tolist()]
+        assert PeptideSet.from_base64(index.get_bitmap(np.array([], dtype=np.int64))).to_ids() == []
+
+    @pytest.mark.parametrize('sort, filters', [('unknown', []), (None, ['unknown>=1'])])
+    def test_should_reject_unknown_fields(self, index, sort, filters):
+        with pytest.raises(ValueError):
+            _select(index, sort, filters)
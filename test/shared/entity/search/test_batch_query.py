@@ -0,0 +1,98 @@
+import pytest
+from pkg.shared.entity.search.engine import AlignmentEngine
+from pkg.shared.entity.search.batch_query import alignment
+from pkg.shared.entity.search.batch_query.alignment import align_batch_query
+from pkg.shared.entity.search.batch_query.model import BatchAlignmentOptions
+from pkg.shared.entity.search.single_query.alignment import align_single_query
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+from pkg.shared.helpers.bio.fasta import parse_fasta_string
+
+
+_FASTA = '\n'.join([
+    '>plain',
+    'KWLRRVWKLLGKAV',
+    '>strict threshold=0.4',
+    'GIGKFLHSAKKF',
+    '>short max_quantity=3',
+    'FLPIIAGVAAKV',
+    '>both some description threshold=0.05 max_quantity=7',
+    'KWLRRVWKLLGKAV',
+    '>loose threshold=0.01',
+    'ILGKIWEGIKSLF'
+])
+
+_PARAMS = {'alg': 'local', 'matrix': 'BLOSUM62', 'threshold': '0.1', 'max_quantity': '20'}
+
+
+@pytest.fixture(autouse=True)
+def engine(monkeypatch) -> AlignmentEngine:
+    engine = AlignmentEngine(1, 97)
+    monkeypatch.setattr(AlignmentEngine, 'instance', engine)
+
+    return engine
+
+
+def _align_batch(corpus, records, options):
+    rankings = {}
+    statistics = align_batch_query(corpus, [record.seq for record in records], options, lambda position, peptides: rankings.setdefault(position, peptides))
+
+    return rankings, statistics
+
+
+class TestBatchAlignmentOptions:
+    def test_headers_should_override_batch_options(self):
+        records = parse_fasta_string(_FASTA)
+        options = BatchAlignmentOptions.create_from_params(_PARAMS, records)
+
+        assert options.get_query_count() == 5
+        assert options.thresholds == [0.1, 0.4, 0.1, 0.05, 0.01]
+        assert options.max_quantities == [20, 20, 3, 7, 20]
+        assert options.get_query_options(3) == SingleAlignmentOptions('local', 'BLOSUM62', 0.05, 7, options.engine)
+
+    def test_invalid_override_should_name_its_query(self):
+        records = parse_fasta_string('>fine\nKWLRRVWKLLGKAV\n>broken threshold=2\nGIGKFLHSAKKF')
+
+        with pytest.raises(ValueError, match='^Query broken: '):
+            BatchAlignmentOptions.create_from_params(_PARAMS, records)
+
+
+class TestBatchAlignment:
+    @pytest.mark.parametrize('engine_name', ['pairwise', 'vectorized'])
+    @pytest.mark.parametrize('alg', ['local', 'global'])
+    @pytest.mark.parametrize('pass_size', [2, 32])
+    def test_rankings_should_match_single_query_per_record(self, corpus, monkeypatch, engine_name, alg, pass_size):
+        monkeypatch.setattr(alignment, '_PASS_SIZE', pass_size)
+        records = parse_fasta_string(_FASTA)
+        options = BatchAlignmentOptions.create_from_params({**_PARAMS, 'alg': alg, 'engine': engine_name}, records)
+
+        rankings, statistics = _align_batch(corpus, records, options)
+
+        assert sorted(rankings) == list(range(len(records)))
+        for position, record in enumerate(records):
+            overrides = dict(word.split('=') for word in record.description.split() if '=' in word)
+            single_options = SingleAlignmentOptions.create_from_params({**_PARAMS, 'alg': alg, 'engine': engine_name, **overrides})
+            peptides, _ = align_single_query(corpus, str(record.seq), single_options)
+
+            assert [(peptide.id, peptide.score) for peptide in rankings[position]] == [(peptide.id, peptide.score) for peptide in peptides]
+
+        assert statistics.total == len(corpus.store)
+        assert statistics.aligned + statistics.memoized + statistics.pruned == statistics.unique * len(records)
+
+    def test_overrides_should_bound_their_own_ranking(self, corpus):
+        records = parse_fasta_string(_FASTA)
+        options = BatchAlignmentOptions.create_from_params(_PARAMS, records)
+
+        rankings, _ = _align_batch(corpus, records, options)
+
+        for position in range(len(records)):
+            query_options = options.get_query_options(position)
+            scores = [peptide.score for peptide in rankings[position]]
+
+            assert len(scores) <= query_options.max_quantity
+            assert all(score >= query_options.threshold for score in scores)
+            assert scores == sorted(scores, reverse=True)
+
+        # The same sequence ranked with a lower threshold and a smaller limit starts with the hits of the batch options.
+        shared = min(7, len(rankings[0]))
+        assert shared > 0
+        assert [peptide.id for peptide in rankings[3][:shared]] == [peptide.id for peptide in rankings[0][:shared]]
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from dataclasses import asdict
+from pkg.shared.entity.search.cache import start_cached_search_task_async
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.utils.async_task import AsyncTaskStatus
+
+
+class _Task:
+    name = 'test'
+
+    def __init__(self, task_id: str, error: Exception = None):
+        self.task_id = task_id
+        self.error = error
+        self.started = False
+
+    def start(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+        self.started = True
+        get_async_task_redis_client().create_task(self.task_id, asdict(self.get_init_status()))
+
+    async def start_async(self) -> None:
+        self.start()
+
+    def get_init_status(self) -> AsyncTaskStatus:
+        return AsyncTaskStatus(self.task_id, self.name, True, False, None, None)
+
+
+class TestStartCachedSearchTaskAsync:
+    def test_should_share_a_running_task(self, redis_service):
+        first, second = _Task('first'), _Task('second')
+
+        asyncio.run(start_cached_search_task_async(first, 'result:key'))
+        status = asyncio.run(start_cached_search_task_async(second, 'result:key'))
+
+        assert first.started and not second.started
+        assert status.id == 'first'
+
+    def test_should_restart_a_failed_task(self, redis_service):
+        first, second = _Task('first'), _Task('second')
+        cache = get_async_task_redis_client()
+
+        asyncio.run(start_cached_search_task_async(first, 'result:key'))
+        cache.update_task('first', asdict(AsyncTaskStatus('first', 'test', False, False, None, None)))
+        status = asyncio.run(start_cached_search_task_async(second, 'result:key'))
+
+        assert second.started
+        assert status.id == 'second'
+
+    def test_should_share_a_task_that_was_just_pointed_to(self, redis_service):
+        cache = get_async_task_redis_client()
+        redis_service.client.set(cache.resolve_key('result:key'), 'submitting', ex=cache.ttl)
+        task = _Task('second')
+
+        status = asyncio.run(start_cached_search_task_async(task, 'result:key'))
+
+        assert not task.started
+        assert status.id == 'submitting' and status.loading
+
+    def test_should_restart_a_task_whose_status_is_gone(self, redis_service):
+        cache = get_async_task_redis_client()
+        redis_service.client.set(cache.resolve_key('result:key'), 'lost', ex=cache.ttl - 60)
+        task = _Task('second')
+
+        status = asyncio.run(start_cached_search_task_async(task, 'result:key'))
+
+        assert task.started
+        assert status.id == 'second'
+        assert redis_service.client.get(cache.resolve_key('result:key')) == b'second'
+
+    def test_should_release_the_result_key_if_the_task_cannot_start(self, redis_service):
+        failing = _Task('failing', RuntimeError('The queue is unavailable'))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(start_cached_search_task_async(failing, 'result:key'))
+
+        cache = get_async_task_redis_client()
+        assert redis_service.client.get(cache.resolve_key('result:key')) is None
+
+    def test_should_start_tasks_without_a_result_key(self, redis_service):
+        task = _Task('uncached')
+
+        assert asyncio.run(start_cached_search_task_async(task, None)).id == 'uncached'
+        assert task.started
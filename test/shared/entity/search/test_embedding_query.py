@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from pkg.config import config
+from pkg.shared.entity.export.embeddings import EmbeddingMatrix
+from pkg.shared.entity.search.embedding_query.index import EmbeddingIndex
+from pkg.shared.entity.search.embedding_query.model import EmbeddingSearchOptions
+from pkg.shared.entity.search.embedding_query.search import search_embeddings
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+from pkg.shared.helpers.bio.composition import AMINO_ACIDS, get_composition
+
+
+_LISTS = 6
+
+
+# Random embeddings named after the amino acids, so queries can also be embedded from their sequence. Every seventh
+# peptide is left out, a peptide outside the corpus is added, and two peptides share the same embedding.
+@pytest.fixture
+def matrix(tmp_path, corpus) -> EmbeddingMatrix:
+    store = corpus.store
+    numbers = np.array([int(store.ids[index]) for index in range(len(store)) if index % 7 != 3] + [100000], dtype=np.int64)
+
+    vectors = np.random.default_rng(3).normal(size=(len(numbers), len(AMINO_ACIDS))).astype(np.float32)
+    vectors[10] = vectors[20]
+    vectors[30] = 0
+
+    directory = str(tmp_path / 'esmMean')
+    np.save(EmbeddingMatrix.get_matrix_path(directory), vectors)
+    np.save(EmbeddingMatrix.get_columns_path(directory), np.array(list(AMINO_ACIDS)))
+    np.save(EmbeddingMatrix.get_numbers_path(directory), numbers)
+
+    return EmbeddingMatrix(directory)
+
+
+def _normalize(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# Cosine similarity of every corpus peptide with an embedding, ranked by similarity, then store index.
+def _rank_brute_force(matrix, store, query):
+    query = _normalize(np.asarray(query, dtype=np.float64))
+    hits = []
+
+    for number, vector in zip(matrix.numbers.tolist(), np.asarray(matrix.matrix, dtype=np.float64)):
+        index = int(store.get_indices(np.array([number], dtype=np.int64))[0])
+        if index >= 0:
+            hits.append((float(_normalize(vector) @ query), index))
+
+    hits.sort(key=lambda hit: (-hit[0], hit[1]))
+    return hits
+
+
+def _get_options(max_quantity, min_similarity=None, exact=True):
+    return EmbeddingSearchOptions('esmMean', max_quantity, min_similarity, exact, False, SingleAlignmentOptions.create_from_params({}))
+
+
+def _get_record(store, index, sequence=None):
+    return SeqRecord(Seq(sequence or store.get_alignment_sequence(index)), id=store.get_id(index))
+
+
+def _get_matrix_vector(matrix, store, index):
+    return np.asarray(matrix.matrix[int(matrix.get_rows(store.ids[[index]])[0])], dtype=np.float64)
+
+
+class TestEmbeddingIndex:
+    @pytest.mark.parametrize('count', [1, 10, 100])
+    def test_exact_search_should_match_brute_force_ranking(self, corpus, matrix, count):
+        index = EmbeddingIndex(matrix, corpus.store, 0)
+        query = np.random.default_rng(5).normal(size=len(AMINO_ACIDS))
+
+        indices, similarities, compared = index.search(_normalize(query), count)
+        expected = _rank_brute_force(matrix, corpus.store, query)[:count]
+
+        assert indices.tolist() == [hit_index for _, hit_index in expected]
+        np.testing.assert_allclose(similarities, [similarity for similarity, _ in expected], atol=1e-5)
+        assert compared == len(index) == len(matrix.numbers) - 1
+
+    def test_equal_embeddings_should_rank_by_store_index(self, corpus, matrix):
+        index = EmbeddingIndex(matrix, corpus.store, 0)
+        query = _get_matrix_vector(matrix, corpus.store, index.indices[10])
+
+        indices, similarities, _ = index.search(_normalize(query), 2)
+
+        assert indices.tolist() == sorted([int(index.indices[10]), int(index.indices[20])])
+        assert similarities[0] == similarities[1]
+
+    def test_probing_every_list_should_match_exact_search(self, corpus, matrix):
+        index = EmbeddingIndex(matrix, corpus.store, _LISTS)
+        query = _normalize(np.random.default_rng(7).normal(size=len(AMINO_ACIDS)))
+
+        exact_indices, exact_similarities, _ = index.search(query, 25)
+        indices, similarities, compared = index.search(query, 25, _LISTS)
+
+        assert index.has_lists()
+        assert indices.tolist() == exact_indices.tolist()
+        assert similarities.tolist() == exact_similarities.tolist()
+        assert compared == len(index)
+
+    def test_peptides_without_embeddings_should_have_no_vector(self, corpus, matrix):
+        index = EmbeddingIndex(matrix, corpus.store, 0)
+
+        assert index.get_vector(3) is None
+        assert index.get_vector(len(corpus.store)) is None
+        np.testing.assert_allclose(index.get_vector(4), _normalize(_get_matrix_vector(matrix, corpus.store, 4)), atol=1e-6)
+
+
+class TestEmbeddingSearch:
+    @pytest.mark.parametrize('max_quantity', [1, 15])
+    def test_corpus_peptide_query_should_match_brute_force_ranking_without_itself(self, corpus, matrix, max_quantity):
+        store = corpus.store
+        index = EmbeddingIndex(matrix, store, 0)
+
+        result = search_embeddings(corpus, index, [_get_record(store, 4)], _get_options(max_quantity))
+        expected = [hit for hit in _rank_brute_force(matrix, store, _get_matrix_vector(matrix, store, 4)) if hit[1] != 4][:max_quantity]
+
+        assert [peptide.id for peptide in result.peptides] == [store.get_id(hit_index) for _, hit_index in expected]
+        assert [peptide.similarity for peptide in result.peptides] == pytest.approx([round(similarity, 4) for similarity, _ in expected], abs=1e-4)
+        assert all(peptide.score is None for peptide in result.peptides)
+        assert result.exact and result.candidates == max_quantity
+
+    def test_queries_should_rank_by_their_mean_embedding(self, corpus, matrix):
+        store = corpus.store
+        index = EmbeddingIndex(matrix, store, 0)
+        sequence = 'KWLRRVWKLLGKAV'
+        records = [_get_record(store, 4), SeqRecord(Seq(sequence), id='query')]
+
+        result = search_embeddings(corpus, index, records, _get_options(20))
+        query = _normalize(_get_matrix_vector(matrix, store, 4)) + _normalize(get_composition(sequence, list(AMINO_ACIDS)).astype(np.float64))
+        expected = [hit for hit in _rank_brute_force(matrix, store, query) if hit[1] != 4][:20]
+
+        assert [peptide.id for peptide in result.peptides] == [store.get_id(hit_index) for _, hit_index in expected]
+
+    def test_min_similarity_should_cut_the_ranking(self, corpus, matrix):
+        store = corpus.store
+        index = EmbeddingIndex(matrix, store, 0)
+
+        expected = [hit for hit in _rank_brute_force(matrix, store, _get_matrix_vector(matrix, store, 4)) if hit[1] != 4 and hit[0] >= 0.5]
+        result = search_embeddings(corpus, index, [_get_record(store, 4)], _get_options(1000, 0.5))
+
+        assert 0 < len(expected) < 100
+        assert [peptide.id for peptide in result.peptides] == [store.get_id(hit_index) for _, hit_index in expected]
+
+    def test_approximate_search_should_probe_configured_lists(self, corpus, matrix, monkeypatch):
+        store = corpus.store
+        index = EmbeddingIndex(matrix, store, _LISTS)
+        records = [_get_record(store, 4)]
+
+        monkeypatch.setattr(config, 'embedding_index_probes', _LISTS)
+        exact = search_embeddings(corpus, index, records, _get_options(30))
+        approximate = search_embeddings(corpus, index, records, _get_options(30, exact=False))
+
+        assert not approximate.exact
+        assert [peptide.id for peptide in approximate.peptides] == [peptide.id for peptide in exact.peptides]
+
+        monkeypatch.setattr(config, 'embedding_index_probes', 1)
+        probed = search_embeddings(corpus, index, records, _get_options(30, exact=False))
+
+        assert probed.compared < len(index)
+        assert [peptide.similarity for peptide in probed.peptides] == sorted([peptide.similarity for peptide in probed.peptides], reverse=True)
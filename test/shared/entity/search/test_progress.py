@@ -0,0 +1,99 @@
+import pytest
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from pkg.config import config
+from pkg.shared.entity.search.engine import AlignmentEngine, ProgressReporter
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.entity.search.single_query.alignment import align_single_query
+from pkg.shared.entity.search.single_query.async_task import SingleQueryAsyncTask
+from pkg.shared.entity.search.single_query.model import SingleAlignmentOptions
+
+
+_QUERY = 'KWLRRVWKLLGKAV'
+_PARTIAL_RESULT_SIZE = 5
+
+
+@pytest.fixture(autouse=True)
+def progress_config(monkeypatch):
+    monkeypatch.setattr(config, 'search_progress_interval', 0)
+    monkeypatch.setattr(config, 'search_partial_result_size', _PARTIAL_RESULT_SIZE)
+    monkeypatch.setattr(AlignmentEngine, 'instance', AlignmentEngine(1, 40))
+
+
+class TestProgressReporter:
+    def test_should_report_at_most_once_per_interval(self, monkeypatch):
+        reports, built = [], []
+        reporter = ProgressReporter(reports.append, 10, 60)
+
+        reporter.advance(3, lambda: built.append(True) or [])
+        assert reports == [] and built == []
+
+        monkeypatch.setattr(reporter, '_last_report', reporter._last_report - 60)
+        reporter.advance(3, lambda: built.append(True) or ['hit'])
+        reporter.advance(2, lambda: built.append(True) or [])
+
+        assert [(report.processed, report.total, report.hits) for report in reports] == [(6, 10, ['hit'])]
+        assert built == [True]
+
+    def test_should_leave_completion_to_the_caller(self):
+        reports = []
+        reporter = ProgressReporter(reports.append, 10, 0)
+
+        reporter.advance(4, lambda: [])
+        reporter.advance(6, lambda: [])
+
+        assert [report.processed for report in reports] == [4]
+
+
+class TestProvisionalRanking:
+    def test_should_report_the_best_hits_found_so_far(self, corpus):
+        options = SingleAlignmentOptions('local', 'BLOSUM62', 0.1, None, 'pairwise')
+        reports = []
+
+        peptides, _ = align_single_query(corpus, _QUERY, options, reports.append)
+        final_scores = [peptide.score for peptide in peptides]
+
+        assert len(reports) > 1
+        assert [report.processed for report in reports] == sorted({report.processed for report in reports})
+        assert all(report.processed < report.total == len(corpus.store) for report in reports)
+
+        for report in reports:
+            scores = [hit.score for hit in report.hits]
+
+            assert len(scores) <= _PARTIAL_RESULT_SIZE
+            assert scores == sorted(scores, reverse=True)
+            # Later shards can only push better hits in, never outrank the final ranking.
+            assert all(score <= final_score for score, final_score in zip(scores, final_scores))
+
+    def test_should_publish_provisional_rankings_in_task_status(self, corpus, redis_service, monkeypatch):
+        statuses = []
+        update_status = SingleQueryAsyncTask.update_status
+        monkeypatch.setattr(SingleQueryAsyncTask, 'update_status', staticmethod(lambda status: statuses.append(status) or update_status(status)))
+
+        task = SingleQueryAsyncTask(SeqRecord(Seq(_QUERY), id='query'), _QUERY, SingleAlignmentOptions('local', 'BLOSUM62', 0.1, None, 'pairwise'))
+        cache = get_async_task_redis_client()
+        events = redis_service.client.pubsub()
+        events.subscribe(cache.resolve_events_channel(task.task_id))
+
+        task.run()
+
+        provisional, final = statuses[:-1], statuses[-1]
+        assert len(provisional) > 0
+        for status in provisional:
+            assert status.loading and not status.success
+            assert status.context['progress']['processed'] < status.context['progress']['total']
+            assert len(status.data) <= _PARTIAL_RESULT_SIZE
+
+        # Peptides pruned up front are reported as processed before any hit is found.
+        assert len(provisional[-1].data) == _PARTIAL_RESULT_SIZE
+        assert final.success and final.data is None
+        assert final.context['progress'] == {'processed': len(corpus.store), 'total': len(corpus.store)}
+        assert SingleQueryAsyncTask.get_status(task.task_id).success
+
+        messages = []
+        while (message := events.get_message(timeout=0.1)) is not None:
+            if message['type'] == 'message':
+                messages.append(message['data'])
+
+        # The status stored when the task started, then every update.
+        assert messages == [task.task_id.encode('utf-8')] * (len(statuses) + 1)
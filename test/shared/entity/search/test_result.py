@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from pkg.shared.entity.peptide.store import PeptideStore
+from pkg.shared.entity.search.redis import get_async_task_redis_client
+from pkg.shared.entity.search.result import PackedSearchResult
+from pkg.shared.entity.search.single_query.model import SingleAlignedPeptide
+from pkg.shared.entity.search.view import SearchResultView, SearchResultQuery
+from test.conftest import create_peptide_rows
+
+
+def _create_result(corpus, task_id: str, indices: list) -> PackedSearchResult:
+    result = PackedSearchResult(get_async_task_redis_client(), task_id, SingleAlignedPeptide, ('score',))
+    peptides = corpus.store.get_peptides(indices)
+    result.save([SingleAlignedPeptide(**peptide.__dict__, score=round(1 - position / 100, 2)) for position, peptide in enumerate(peptides)])
+
+    return result
+
+
+# The same corpus without the peptides of the given rows, as it would be after they were removed from Neo4j.
+def _remove_rows(rows: list) -> PeptideStore:
+    return PeptideStore.from_neo4j_rows([row for position, row in enumerate(create_peptide_rows(600)) if position not in rows])
+
+
+class TestPackedSearchResult:
+    def test_should_serve_pages_in_rank_order(self, corpus):
+        result = _create_result(corpus, 'task', [5, 3, 80, 1])
+
+        page = result.get_page(1, 3)
+
+        assert len(result) == 4
+        assert [peptide['id'] for peptide in page] == [corpus.store.get_id(3), corpus.store.get_id(80)]
+        assert [peptide['score'] for peptide in page] == [0.99, 0.98]
+        assert page[0]['sequence'] == corpus.store.get_sequence(3)
+
+    def test_should_keep_peptides_missing_from_corpus_in_place(self, corpus):
+        result = _create_result(corpus, 'task', [5, 3, 80, 1])
+
+        peptides = result.create_peptides(_remove_rows([3]), result.get_records(0, len(result)))
+
+        assert [peptide['id'] for peptide in peptides] == [corpus.store.get_id(index) for index in (5, 3, 80, 1)]
+        assert peptides[1] == {'id': corpus.store.get_id(3), 'sequence': None, 'length': None, 'attributes': None, 'score': 0.99}
+        assert peptides[2]['sequence'] == corpus.store.get_sequence(80)
+
+
+class TestSearchResultView:
+    def test_should_keep_peptides_missing_from_corpus_last_and_unfiltered(self, corpus):
+        result = _create_result(corpus, 'task', [5, 3, 80, 1])
+        view = SearchResultView(result, _remove_rows([3]))
+
+        by_length = view.select(SearchResultQuery.create_from_expressions('-length', []))
+        filtered = view.select(SearchResultQuery.create_from_expressions(None, ['length>=0']))
+
+        assert len(view) == 4
+        assert by_length[-1] == 1
+        assert filtered.tolist() == [0, 2, 3]
+        assert view.get_peptides(np.array([1]))[0]['sequence'] is None
+
+    @pytest.mark.parametrize('expression', ['charge!=2', 'length!=-1', 'charge!=2.5'])
+    def test_should_leave_peptides_missing_from_corpus_out_of_not_equal_filters(self, corpus, expression):
+        result = _create_result(corpus, 'task', [5, 3, 80, 1])
+        view = SearchResultView(result, _remove_rows([3]))
+        charges = [corpus.store.attributes['charge'][index] for index in (5, 80, 1)]
+
+        filtered = view.select(SearchResultQuery.create_from_expressions(None, [expression])).tolist()
+
+        assert 1 not in filtered
+        assert filtered == [position for position, charge in zip([0, 2, 3], charges) if expression != 'charge!=2' or charge != 2]
+
+    @pytest.mark.parametrize('sort', ['charge', '-charge', 'hydropathicity', '-length', 'score'])
+    def test_should_sort_with_ties_in_rank_order(self, corpus, sort):
+        indices = list(range(0, 120, 3))
+        view = SearchResultView(_create_result(corpus, 'task', indices), corpus.store)
+        field, descending = sort.lstrip('-'), sort.startswith('-')
+
+        values = [peptide['attributes'][field] if field in peptide['attributes'] else peptide[field] for peptide in view.get_peptides(np.arange(len(view)))]
+        expected = sorted(range(len(values)), key=lambda position: (-values[position] if descending else values[position], position))
+
+        assert view.select(SearchResultQuery.create_from_expressions(sort, [])).tolist() == expected
+
+    def test_should_keep_rows_matching_every_filter_in_sort_order(self, corpus):
+        view = SearchResultView(_create_result(corpus, 'task', list(range(0, 120, 3))), corpus.store)
+        peptides = view.get_peptides(np.arange(len(view)))
+
+        positions = view.select(SearchResultQuery.create_from_expressions('-hydropathicity', ['charge>=0', 'charge!=3', 'score<0.9']))
+        expected = [
+            position for position in view.select(SearchResultQuery.create_from_expressions('-hydropathicity', [])).tolist()
+            if peptides[position]['attributes']['charge'] >= 0 and peptides[position]['attributes']['charge'] != 3 and peptides[position]['score'] < 0.9
+        ]
+
+        assert 0 < len(positions) < len(view)
+        assert positions.tolist() == expected
+
+    def test_should_serve_rank_order_without_sort(self, corpus):
+        view = SearchResultView(_create_result(corpus, 'task', [5, 3, 80, 1]), corpus.store)
+
+        assert view.select(SearchResultQuery.create_from_expressions(None, [])).tolist() == [0, 1, 2, 3]
+        assert view.select(SearchResultQuery.create_from_expressions('-score', [])).tolist() == [0, 1, 2, 3]
+        assert view.select(SearchResultQuery.create_from_expressions(None, ['score>0.98'])).tolist() == [0, 1]
+
+    def test_should_reject_unknown_fields_and_invalid_filters(self, corpus):
+        view = SearchResultView(_create_result(corpus, 'task', [5, 3]), corpus.store)
+
+        with pytest.raises(ValueError, match='sort must be one of'):
+            view.select(SearchResultQuery.create_from_expressions('unknown', []))
+
+        with pytest.raises(ValueError, match='filter must be one of'):
+            view.select(SearchResultQuery.create_from_expressions(None, ['unknown>1']))
+
+        with pytest.raises(ValueError, match='must compare charge to a number'):
+            SearchResultQuery.create_from_expressions(None, ['charge>high'])
+
+        with pytest.raises(ValueError, match='filter must look like'):
+            SearchResultQuery.create_from_expressions(None, ['charge~1'])
@@ -0,0 +1,43 @@
+import random
+import numpy as np
+import pytest
+from Bio.Align import PairwiseAligner
+from pkg.shared.helpers.bio.alignment import SUPPORTED_MATRIX_NAMES, SUPPORTED_ALGORITHMS
+from pkg.shared.helpers.bio.kernel import PADDING_CODE, is_vectorized_scoring_exact, score_encoded_targets
+from pkg.shared.helpers.bio.matrix import get_aligner
+
+
+_AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+
+
+def _create_sequences(generator: random.Random, count: int, max_length: int):
+    return [''.join(generator.choice(_AMINO_ACIDS) for _ in range(generator.randint(1, max_length))) for _ in range(count)]
+
+
+def _encode(targets):
+    codes = np.full((len(targets), max(len(target) for target in targets)), PADDING_CODE, dtype=np.uint8)
+    for row, target in enumerate(targets):
+        codes[row, :len(target)] = np.frombuffer(target.encode('ascii'), dtype=np.uint8)
+
+    return codes
+
+
+class TestScoreEncodedTargets:
+    @pytest.mark.parametrize('alg', SUPPORTED_ALGORITHMS)
+    @pytest.mark.parametrize('matrix_name', SUPPORTED_MATRIX_NAMES)
+    def test_should_match_pairwise_aligner(self, matrix_name, alg):
+        generator = random.Random(f'{matrix_name}-{alg}')
+        aligner = get_aligner(matrix_name, alg)
+        targets = _create_sequences(generator, 60, 40)
+
+        for query in _create_sequences(generator, 5, 30):
+            expected = [aligner.score(target, query) for target in targets]
+            assert score_encoded_targets(matrix_name, query, _encode(targets)).tolist() == pytest.approx(expected)
+
+    def test_should_only_be_exact_with_free_gaps(self):
+        aligner = get_aligner('BLOSUM62', 'local')
+        assert is_vectorized_scoring_exact(aligner)
+
+        aligner = PairwiseAligner()
+        aligner.open_gap_score = -1
+        assert not is_vectorized_scoring_exact(aligner)
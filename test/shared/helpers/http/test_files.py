@@ -0,0 +1,91 @@
+import os
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from pkg.shared.helpers.http.files import ImmutableFileResponse
+
+
+_CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / 'artifact-key.zip'
+    path.write_bytes(_CONTENT)
+    return path
+
+
+@pytest.fixture
+def client(artifact):
+    def serve(req: Request):
+        return ImmutableFileResponse.create(str(artifact), artifact.name, req.headers, filename='export.zip')
+
+    return TestClient(Starlette(routes=[Route('/artifact', serve)]))
+
+
+class TestImmutableFileResponse:
+    def test_should_serve_whole_file_with_etag(self, client, artifact):
+        response = client.get('/artifact')
+
+        assert response.status_code == 200
+        assert response.content == _CONTENT
+        assert response.headers['etag'] == ImmutableFileResponse.get_etag(artifact.name, os.stat(artifact))
+        assert response.headers['accept-ranges'] == 'bytes'
+
+    def test_should_serve_range(self, client):
+        response = client.get('/artifact', headers={'range': 'bytes=10-19'})
+
+        assert response.status_code == 206
+        assert response.content == _CONTENT[10:20]
+        assert response.headers['content-range'] == f'bytes 10-19/{len(_CONTENT)}'
+
+    def test_should_serve_range_if_range_matches(self, client):
+        etag = client.get('/artifact').headers['etag']
+        response = client.get('/artifact', headers={'range': 'bytes=100-', 'if-range': etag})
+
+        assert response.status_code == 206
+        assert response.content == _CONTENT[100:]
+
+    def test_should_serve_whole_file_if_range_does_not_match(self, client):
+        response = client.get('/artifact', headers={'range': 'bytes=100-', 'if-range': '"artifact-key.zip"'})
+
+        assert response.status_code == 200
+        assert response.content == _CONTENT
+
+    def test_should_serve_whole_file_if_range_is_a_date(self, client, artifact):
+        last_modified = client.get('/artifact').headers['last-modified']
+        response = client.get('/artifact', headers={'range': 'bytes=100-', 'if-range': last_modified})
+
+        assert response.status_code == 200
+        assert response.content == _CONTENT
+
+    def test_should_not_resume_rebuilt_file(self, client, artifact):
+        etag = client.get('/artifact').headers['etag']
+
+        rebuilt = artifact.with_suffix('.part')
+        rebuilt.write_bytes(_CONTENT[::-1])
+        os.replace(rebuilt, artifact)
+
+        response = client.get('/artifact', headers={'range': 'bytes=100-', 'if-range': etag})
+
+        assert response.status_code == 200
+        assert response.content == _CONTENT[::-1]
+        assert response.headers['etag'] != etag
+
+    def test_should_answer_not_modified_if_none_match(self, client):
+        etag = client.get('/artifact').headers['etag']
+
+        for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            response = client.get('/artifact', headers={'if-none-match': header})
+
+            assert response.status_code == 304
+            assert response.content == b''
+            assert response.headers['etag'] == etag
+
+    def test_should_serve_file_if_none_match_differs(self, client):
+        response = client.get('/artifact', headers={'if-none-match': '"other"'})
+
+        assert response.status_code == 200
+        assert response.content == _CONTENT
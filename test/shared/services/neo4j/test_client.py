@@ -0,0 +1,53 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Event
+from pkg.shared.services.neo4j.client import GraphDatabaseService
+
+
+class _Graph:
+    def __init__(self, rows, release: Event = None):
+        self.rows = rows
+        self.release = release
+        self.queries = []
+
+    def query(self, cypher, parameters, timeout=None):
+        self.queries.append(parameters)
+        if self.release is not None:
+            self.release.wait(5)
+
+        after, limit = parameters['after'], parameters['limit']
+        return [row for row in self.rows if row['id'] > after][:limit]
+
+
+def _create_service(graph: _Graph, max_connections: int = 1, fetch_size: int = 2, timeout: float = 0.2) -> GraphDatabaseService:
+    service = GraphDatabaseService.__new__(GraphDatabaseService)
+    service.fetch_size = fetch_size
+    service.timeout = timeout
+    service.client = graph
+    service._slots = BoundedSemaphore(max_connections)
+    service._executor = ThreadPoolExecutor(max_connections)
+
+    return service
+
+
+class TestGraphDatabaseService:
+    def test_should_stream_records_in_batches(self):
+        graph = _Graph([{'id': number} for number in range(5)])
+        service = _create_service(graph)
+
+        assert [record['id'] for record in service.stream('query', 'id')] == [0, 1, 2, 3, 4]
+        assert [parameters['after'] for parameters in graph.queries] == [-1, 1, 3]
+
+    def test_should_abandon_queries_after_the_timeout(self):
+        release = Event()
+        service = _create_service(_Graph([{'id': 0}], release))
+
+        with pytest.raises(TimeoutError, match='did not complete'):
+            service.query('query', {'after': -1, 'limit': 1})
+
+        # The abandoned query holds its connection until it returns.
+        with pytest.raises(TimeoutError, match='No Neo4j connection'):
+            service.query('query', {'after': -1, 'limit': 1})
+
+        release.set()
+        assert service.query('query', {'after': -1, 'limit': 1}) == [{'id': 0}]
@@ -0,0 +1,63 @@
+import json
+import pytest
+from pkg.shared.helpers.http.error import TooManyRequestsException
+from pkg.shared.services.redis.task_queue import RedisTaskQueue
+
+
+class _Task:
+    def __init__(self, task_id: str, on_queued=None):
+        self.task_id = task_id
+        self.on_queued = on_queued
+        self.positions = []
+
+    def to_job(self):
+        return {'taskId': self.task_id}
+
+    def run(self) -> None:
+        pass
+
+    def handle_queued(self, position):
+        self.positions.append(position)
+        if self.on_queued is not None:
+            on_queued, self.on_queued = self.on_queued, None
+            on_queued()
+
+
+class TestRedisTaskQueue:
+    def test_should_queue_jobs_in_submission_order(self, redis_service):
+        queue = RedisTaskQueue(redis_service, 'test', 2)
+
+        assert queue.submit(_Task('first')) == 1
+        assert queue.submit(_Task('second')) == 2
+        assert len(queue) == 2
+        assert queue.get_position('second') == 2
+        assert json.loads(redis_service.client.get(RedisTaskQueue.resolve_job_key('first'))) == {'taskId': 'first'}
+
+    def test_should_reject_jobs_if_queue_is_full(self, redis_service):
+        queue = RedisTaskQueue(redis_service, 'test', 1)
+        queue.submit(_Task('first'))
+
+        with pytest.raises(TooManyRequestsException):
+            queue.submit(_Task('second'))
+
+        assert len(queue) == 1
+        assert redis_service.client.get(RedisTaskQueue.resolve_job_key('second')) is None
+
+    def test_should_recheck_the_bound_if_another_job_is_pushed_meanwhile(self, redis_service):
+        queue = RedisTaskQueue(redis_service, 'test', 1)
+        racing = _Task('racing', lambda: redis_service.client.rpush(queue.resolve_pending_key(), 'other'))
+
+        with pytest.raises(TooManyRequestsException):
+            queue.submit(racing)
+
+        assert racing.positions == [1]
+        assert redis_service.client.lrange(queue.resolve_pending_key(), 0, -1) == [b'other']
+
+    def test_should_retry_if_a_job_is_claimed_meanwhile(self, redis_service):
+        queue = RedisTaskQueue(redis_service, 'test', 2)
+        queue.submit(_Task('first'))
+        racing = _Task('racing', lambda: queue.claim('worker', 1))
+
+        assert queue.submit(racing) == 1
+        assert racing.positions == [2, 1]
+        assert redis_service.client.lrange(queue.resolve_pending_key(), 0, -1) == [b'racing']
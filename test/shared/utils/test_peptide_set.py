@@ -0,0 +1,98 @@
+import pkg.shared.utils.peptide_set as module
+import pytest
+
+
+class TestPeptideSet:
+    def test_should_decode_base64_bitmap(self):
+        peptide_set = module.PeptideSet.from_base64('aAaA')
+
+        assert list(peptide_set) == [1, 2, 4, 13, 14, 16]
+        assert len(peptide_set) == 6
+
+    def test_should_decode_bits_in_order(self):
+        assert module.PeptideSet.from_base64('aAaA').bits.astype(int).tolist() == [
+            0, 1, 1, 0, 1, 0, 0, 0,
+            0, 0, 0, 0, 0, 1, 1, 0,
+            1, 0, 0, 0, 0, 0, 0, 0
+        ]
+        assert module.PeptideSet.from_base64('zMA=').bits.astype(int).tolist() == [
+            1, 1, 0, 0, 1, 1, 0, 0,
+            1, 1, 0, 0, 0, 0, 0, 0
+        ]
+        assert module.PeptideSet.from_base64('aA==').bits.astype(int).tolist() == [0, 1, 1, 0, 1, 0, 0, 0]
+        assert len(module.PeptideSet.from_base64('/' * 7520)) == 45120
+
+    def test_should_throw_if_empty_base64(self):
+        with pytest.raises(ValueError, match='Cannot convert from empty base64 string.'):
+            module.PeptideSet.from_base64('')
+
+    def test_should_throw_if_invalid_base64(self):
+        with pytest.raises(ValueError, match='Invalid base64 string provided.'):
+            module.PeptideSet.from_base64('__ sad')
+
+    def test_should_encode_back_to_same_base64(self):
+        assert module.PeptideSet.from_base64('/' * 7520).to_base64() == '/' * 7520
+        assert module.PeptideSet.from_base64('zMA=').to_base64() == 'zMA='
+
+    def test_should_size_bitmap_to_given_size(self):
+        peptide_set = module.PeptideSet.from_numbers([1])
+
+        assert peptide_set.to_base64() == 'QA=='
+        assert module.PeptideSet.from_numbers([1], 16).to_base64() == 'QAA='
+
+    def test_should_throw_if_numbers_out_of_range(self):
+        with pytest.raises(ValueError, match='Peptide numbers must be lower than 16.'):
+            module.PeptideSet.from_numbers([1, 16], 16)
+
+        with pytest.raises(ValueError, match='Peptide numbers cannot be negative.'):
+            module.PeptideSet.from_numbers([-1])
+
+    def test_should_convert_from_and_to_ids(self):
+        peptide_set = module.PeptideSet.from_ids(['starPep_00003', 'starPep_00001'])
+
+        assert peptide_set.to_ids() == ['starPep_00001', 'starPep_00003']
+        assert 3 in peptide_set
+        assert 2 not in peptide_set
+        assert 100 not in peptide_set
+
+    def test_should_size_ids_to_given_size(self):
+        assert len(module.PeptideSet.from_ids(['starPep_00003'], 16).bits) == 16
+
+        with pytest.raises(ValueError, match='Peptide numbers must be lower than 16.'):
+            module.PeptideSet.from_ids(['starPep_00016'], 16)
+
+    def test_should_combine_sets_of_different_sizes(self):
+        a = module.PeptideSet.from_numbers([1, 2, 3])
+        b = module.PeptideSet.from_numbers([3, 4, 50])
+
+        assert list(a | b) == list(a.union(b)) == [1, 2, 3, 4, 50]
+        assert list(a & b) == list(a.intersection(b)) == [3]
+        assert list(a - b) == list(a.difference(b)) == [1, 2]
+        assert list(b - a) == [4, 50]
+
+    def test_should_compare_regardless_of_padding(self):
+        assert module.PeptideSet.from_numbers([1]) == module.PeptideSet.from_base64('QAA=')
+        assert module.PeptideSet.from_numbers([1]) != module.PeptideSet.from_numbers([2])
+
+    def test_should_convert_to_and_from_ranges(self):
+        peptide_set = module.PeptideSet.from_numbers([1, 2, 3, 7, 9, 10])
+
+        assert peptide_set.to_ranges() == '1-3,7,9-10'
+        assert module.PeptideSet.from_ranges('1-3, 7,9-10', 16) == peptide_set
+        assert len(module.PeptideSet.from_ranges('1-3', 16).bits) == 16
+        assert module.PeptideSet().to_ranges() == ''
+        assert len(module.PeptideSet.from_ranges('', 16)) == 0
+
+    def test_should_throw_if_invalid_range(self):
+        with pytest.raises(ValueError, match='Invalid range 3-1 provided'):
+            module.PeptideSet.from_ranges('3-1', 16)
+
+        with pytest.raises(ValueError, match='Invalid range a provided'):
+            module.PeptideSet.from_ranges('1,a', 16)
+
+    def test_should_throw_if_range_out_of_size(self):
+        with pytest.raises(ValueError, match='Invalid range 10-16 provided, peptide numbers must be lower than 16.'):
+            module.PeptideSet.from_ranges('1,10-16', 16)
+
+        with pytest.raises(ValueError, match='Invalid range 0-999999999999 provided'):
+            module.PeptideSet.from_ranges('0-999999999999', 16)
@@ -0,0 +1,41 @@
+import pkg.shared.utils.selection as module
+
+
+class TestTopSelection:
+    def test_should_return_all_sorted_if_no_limit(self):
+        selection = module.TopSelection()
+        selection.extend([(0.5, 0, 'a'), (0.9, 1, 'b'), (0.7, 2, 'c')])
+
+        assert selection.get_sorted() == ['b', 'c', 'a']
+
+    def test_should_keep_only_best_if_limit(self):
+        selection = module.TopSelection(2)
+        selection.extend([(0.5, 0, 'a'), (0.9, 1, 'b'), (0.7, 2, 'c'), (0.1, 3, 'd')])
+
+        assert len(selection) == 2
+        assert selection.get_sorted() == ['b', 'c']
+
+    def test_should_break_ties_by_lowest_index(self):
+        selection = module.TopSelection(2)
+        selection.extend([(0.5, 3, 'd'), (0.5, 1, 'b'), (0.5, 2, 'c'), (0.5, 0, 'a')])
+
+        assert selection.get_sorted() == ['a', 'b']
+
+    def test_should_match_full_sort_and_slice(self):
+        entries = [((i * 37) % 11 / 10, i, i) for i in range(200)]
+        selection = module.TopSelection(25)
+        selection.extend(entries)
+
+        expected = [i for _, i, _ in sorted(entries, key=lambda n: -n[0])][0:25]
+        assert selection.get_sorted() == expected
+
+    def test_should_return_floor_only_when_full(self):
+        selection = module.TopSelection(2)
+        selection.push(0.5, 0, 'a')
+
+        assert selection.get_floor() is None
+
+        selection.push(0.8, 1, 'b')
+        selection.push(0.6, 2, 'c')
+
+        assert selection.get_floor() == 0.6
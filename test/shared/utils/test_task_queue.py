@@ -0,0 +1,123 @@
+import pytest
+from threading import Event, Thread
+import pkg.shared.utils.task_queue as module
+from pkg.shared.helpers.http.error import TooManyRequestsException
+
+
+class _BlockingTask:
+    def __init__(self, release: Event):
+        self.release = release
+        self.started = Event()
+        self.finished = Event()
+        self.positions = []
+
+    def run(self) -> None:
+        self.started.set()
+        self.release.wait(5)
+        self.finished.set()
+
+    def handle_queued(self, position):
+        self.positions.append(position)
+
+
+class _FailingTask(_BlockingTask):
+    def handle_queued(self, position):
+        raise RuntimeError('The status could not be stored')
+
+
+# Reports whether another thread can take the queue condition while the task is told its position.
+class _ProbingTask(_BlockingTask):
+    def __init__(self, release: Event, queue: module.TaskQueue):
+        super().__init__(release)
+        self.queue = queue
+        self.condition_free = []
+
+    def handle_queued(self, position):
+        super().handle_queued(position)
+
+        probe = Thread(target=self._probe)
+        probe.start()
+        probe.join()
+
+    def _probe(self):
+        acquired = self.queue._condition.acquire(timeout=1)
+        if acquired:
+            self.queue._condition.release()
+        self.condition_free.append(acquired)
+
+
+class TestTaskQueue:
+    def test_should_run_tasks_right_away_if_workers_are_free(self):
+        release = Event()
+        queue = module.TaskQueue('test', 2, 1)
+        tasks = [_BlockingTask(release), _BlockingTask(release)]
+
+        assert [queue.submit(task) for task in tasks] == [None, None]
+        assert all(task.started.wait(5) for task in tasks)
+
+        release.set()
+        assert all(task.finished.wait(5) for task in tasks)
+
+    def test_should_report_and_update_queue_positions(self):
+        release = Event()
+        queue = module.TaskQueue('test', 1, 2)
+        running, first, second = _BlockingTask(release), _BlockingTask(release), _BlockingTask(release)
+
+        queue.submit(running)
+        assert running.started.wait(5)
+        assert queue.submit(first) == 1
+        assert queue.submit(second) == 2
+
+        release.set()
+        assert second.finished.wait(5)
+        assert first.positions == [1]
+        assert second.positions == [2, 1]
+
+    def test_should_reject_tasks_if_queue_is_full(self):
+        release = Event()
+        queue = module.TaskQueue('test', 1, 1)
+        running, waiting = _BlockingTask(release), _BlockingTask(release)
+
+        queue.submit(running)
+        assert running.started.wait(5)
+        queue.submit(waiting)
+
+        with pytest.raises(TooManyRequestsException):
+            queue.submit(_BlockingTask(release))
+
+        release.set()
+        assert waiting.finished.wait(5)
+
+    def test_should_publish_positions_outside_the_queue_condition(self):
+        release = Event()
+        queue = module.TaskQueue('test', 1, 2)
+        running = _BlockingTask(release)
+        first, second = _ProbingTask(release, queue), _ProbingTask(release, queue)
+
+        queue.submit(running)
+        assert running.started.wait(5)
+        queue.submit(first)
+        queue.submit(second)
+
+        release.set()
+        assert second.finished.wait(5)
+        assert second.positions == [2, 1]
+        assert first.condition_free + second.condition_free == [True, True, True]
+
+    def test_should_withdraw_tasks_whose_position_cannot_be_published(self):
+        release = Event()
+        queue = module.TaskQueue('test', 1, 1)
+        failing = _FailingTask(release)
+
+        with pytest.raises(RuntimeError):
+            queue.submit(failing)
+
+        # The worker is given a following task, so the failed one has been dealt with by the time it runs.
+        following = _BlockingTask(release)
+        queue.submit(following)
+        assert following.started.wait(5)
+        release.set()
+
+        assert following.finished.wait(5)
+        assert not failing.started.is_set()
+        assert len(queue) == 0
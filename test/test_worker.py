@@ -0,0 +1,88 @@
+import pytest
+import worker
+from pkg.shared.services.redis.task_queue import RedisTaskQueue
+
+
+class _Task:
+    TASK_NAME = 'test'
+    runs = []
+    statuses = []
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+
+    def to_job(self):
+        return {'taskId': self.task_id}
+
+    @staticmethod
+    def from_job(job):
+        return _Task(job['taskId'])
+
+    @staticmethod
+    def update_status(status) -> None:
+        _Task.statuses.append(status)
+
+    def run(self) -> None:
+        _Task.runs.append(self.task_id)
+
+    def handle_queued(self, position) -> None:
+        pass
+
+
+@pytest.fixture
+def queue(redis_service) -> RedisTaskQueue:
+    _Task.runs, _Task.statuses = [], []
+    return RedisTaskQueue(redis_service, _Task.TASK_NAME, 10)
+
+
+def _claim_and_run(queue: RedisTaskQueue, worker_id: str) -> str:
+    job_id, job = queue.claim(worker_id, 1)
+    worker.run_job(_Task, job_id, job)
+    queue.complete(worker_id, job_id)
+
+    return job_id
+
+
+class TestWorker:
+    def test_should_run_and_complete_claimed_tasks(self, queue, redis_service):
+        queue.submit(_Task('first'))
+        queue.submit(_Task('second'))
+
+        assert [_claim_and_run(queue, 'worker'), _claim_and_run(queue, 'worker')] == ['first', 'second']
+        assert _Task.runs == ['first', 'second']
+        assert len(queue) == 0
+        assert redis_service.client.llen(queue.resolve_processing_key('worker')) == 0
+        assert redis_service.client.get(RedisTaskQueue.resolve_job_key('first')) is None
+
+    def test_should_recover_tasks_of_a_crashed_worker(self, queue, redis_service):
+        queue.submit(_Task('first'))
+        queue.submit(_Task('second'))
+
+        # The worker stops after taking the first job, without running or completing it.
+        assert queue.claim('crashed', 1)[0] == 'first'
+
+        assert queue.recover('crashed') == 1
+        assert redis_service.client.llen(queue.resolve_processing_key('crashed')) == 0
+        assert queue.get_position('first') == 1
+
+        assert _claim_and_run(queue, 'crashed') == 'first'
+        assert _Task.runs == ['first']
+
+    def test_should_hand_each_task_to_a_single_worker(self, queue, redis_service):
+        queue.submit(_Task('first'))
+
+        assert queue.claim('worker-a', 1)[0] == 'first'
+        assert queue.claim('worker-b', 1) is None
+
+        # Recovering a worker that holds nothing leaves the task claimed by the other untouched.
+        assert queue.recover('worker-b') == 0
+        assert redis_service.client.lrange(queue.resolve_processing_key('worker-a'), 0, -1) == [b'first']
+
+    def test_should_fail_tasks_whose_job_expired(self, queue, redis_service):
+        queue.submit(_Task('expired'))
+        redis_service.client.delete(RedisTaskQueue.resolve_job_key('expired'))
+
+        _claim_and_run(queue, 'worker')
+
+        assert _Task.runs == []
+        assert [(status.id, status.loading, status.success) for status in _Task.statuses] == [('expired', False, False)]
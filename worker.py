@@ -0,0 +1,101 @@
+import time
+from threading import Thread
+from typing import Dict, Type
+from pkg.config import config
+from pkg.shared.entity.export.multi_query.async_task import MultiQueryExportAsyncTask
+from pkg.shared.entity.export.single_query.async_task import SingleQueryExportAsyncTask
+from pkg.shared.entity.export.text_query.async_task import TextQueryExportAsyncTask
+from pkg.shared.entity.export.utils import preload_embedding_matrices
+from pkg.shared.entity.peptide.corpus import PeptideCorpusService
+from pkg.shared.entity.search.batch_query.async_task import BatchQueryAsyncTask
+from pkg.shared.entity.search.multi_query.async_task import MultiQueryAsyncTask
+from pkg.shared.entity.search.single_query.async_task import SingleQueryAsyncTask
+from pkg.shared.services.redis.client import RedisService
+from pkg.shared.services.redis.task_queue import RedisTaskQueue
+from pkg.shared.utils.async_task import AsyncTask, AsyncTaskStatus
+
+
+_CLAIM_TIMEOUT = 5
+
+TASK_TYPES: Dict[str, Type[AsyncTask]] = {
+    SingleQueryAsyncTask.TASK_NAME: SingleQueryAsyncTask,
+    MultiQueryAsyncTask.TASK_NAME: MultiQueryAsyncTask,
+    BatchQueryAsyncTask.TASK_NAME: BatchQueryAsyncTask,
+    SingleQueryExportAsyncTask.TASK_NAME: SingleQueryExportAsyncTask,
+    MultiQueryExportAsyncTask.TASK_NAME: MultiQueryExportAsyncTask,
+    TextQueryExportAsyncTask.TASK_NAME: TextQueryExportAsyncTask
+}
+
+
+def get_queue(task_name: str) -> RedisTaskQueue:
+    return RedisTaskQueue(RedisService.get_instance(), task_name, config.task_queue_size)
+
+
+def run_job(task_type: Type[AsyncTask], job_id: str, job: Dict) -> None:
+    try:
+        if job is None:
+            raise ValueError('The job of this task expired before it could run.')
+
+        task = task_type.from_job(job)
+    except Exception as e:
+        task_type.update_status(AsyncTaskStatus(job_id, task_type.TASK_NAME, False, False, None, str(e)))
+
+        print(f'Error restoring {task_type.TASK_NAME} task {job_id}')
+        print(e)
+        return
+
+    task.run()
+
+
+def consume(task_name: str) -> None:
+    task_type = TASK_TYPES[task_name]
+    queue = get_queue(task_name)
+
+    while True:
+        try:
+            claimed = queue.claim(config.worker_id, _CLAIM_TIMEOUT)
+        except Exception as e:
+            print(f'Error claiming a {task_name} task')
+            print(e)
+
+            time.sleep(_CLAIM_TIMEOUT)
+            continue
+
+        if claimed is None:
+            continue
+
+        job_id, job = claimed
+        try:
+            run_job(task_type, job_id, job)
+        finally:
+            queue.complete(config.worker_id, job_id)
+
+
+def start_worker() -> None:
+    task_names = config.worker_tasks or list(TASK_TYPES.keys())
+
+    if {SingleQueryAsyncTask.TASK_NAME, MultiQueryAsyncTask.TASK_NAME, BatchQueryAsyncTask.TASK_NAME} & set(task_names):
+        PeptideCorpusService.get_instance().start_background_refresh()
+
+    if {SingleQueryExportAsyncTask.TASK_NAME, MultiQueryExportAsyncTask.TASK_NAME, TextQueryExportAsyncTask.TASK_NAME} & set(task_names):
+        preload_embedding_matrices()
+
+    consumers = []
+    for task_name in task_names:
+        recovered = get_queue(task_name).recover(config.worker_id)
+        if recovered:
+            print(f'Requeued {recovered} unfinished {task_name} tasks of worker {config.worker_id}')
+
+        for index in range(max(config.get_task_concurrency(task_name), 1)):
+            consumer = Thread(target=consume, args=(task_name,), name=f'{task_name}_consumer_{index}', daemon=True)
+            consumer.start()
+            consumers.append(consumer)
+
+    print(f'Started worker {config.worker_id} for tasks: {", ".join(task_names)}')
+
+    for consumer in consumers:
+        consumer.join()
+
+
+if __name__ == '__main__':
+    start_worker()